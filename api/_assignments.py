@@ -0,0 +1,102 @@
+"""
+Shared helper: match_assignments rows
+Every path that creates assignments - POST /api/pairings (fresh or a
+committed preview), the monthly cron and rematches after a decline -
+builds its rows here, so each gets the same extras:
+
+- suggested_courts: the pair's best approved courts (api/_courts.py)
+- suggested_slot: one (court, day, time) both players can make, within
+  COURT_SLOT_CAPACITY counting the slots this period has already booked
+  (api/_scheduling.py)
+- notes: up to three overlapping (day, time) slots
+
+Preferences, availability and booked slots load concurrently, once per
+batch.
+"""
+import json
+
+from api._courts import PLAYER_ID_BATCH, league_court_vectors, suggest_courts
+from api._db import gather
+from api._scheduling import load_booked_slots, schedule_pairs
+
+
+def load_availability(supabase, player_ids):
+    """
+    {player_id: [{'day', 'time'}]} of available slots for player_ids.
+    player_availability has no league_id, so it is always filtered to
+    the players at hand: PLAYER_ID_BATCH ids per query (they go in the
+    URL), each paged past PostgREST's max rows.
+    """
+    player_ids = sorted(player_ids)
+    batches = [player_ids[i:i + PLAYER_ID_BATCH] for i in range(0, len(player_ids), PLAYER_ID_BATCH)]
+    queries = [
+        supabase.table('player_availability')
+        .select('player_id, day_of_week, time_slot')
+        .eq('is_available', True)
+        .in_('player_id', batch)
+        .order('player_id')
+        .order('day_of_week')
+        .order('time_slot')  # the UNIQUE (player_id, day_of_week, time_slot) index
+        for batch in batches
+    ]
+
+    # Build availability lookup
+    availability = {}
+    for page in gather(*[q.execute_all for q in queries]):
+        for a in page.data:
+            availability.setdefault(a['player_id'], []).append({
+                'day': a['day_of_week'],
+                'time': a['time_slot']
+            })
+    return availability
+
+
+def overlapping_times(availability1, availability2):
+    """(day, time) slots both players marked available, as [{'day', 'time'}]"""
+    return [
+        {'day': a1['day'], 'time': a1['time']}
+        for a1 in availability1
+        for a2 in availability2
+        if a1['day'] == a2['day'] and a1['time'] == a2['time']
+    ]
+
+
+def build_assignments(supabase, pairs, period, period_type='month', availability=None, extras=None):
+    """
+    Pending match_assignments rows for (player1_id, player2_id) pairs, in
+    order. period: period_fields() of the period. availability: as from
+    load_availability(), loaded for the pairs' players when None.
+    extras: per pair, a dict merged into its row (rematch lineage).
+    """
+    if not pairs:
+        return []
+
+    player_ids = sorted({pid for pair in pairs for pid in pair})
+    loads = [
+        lambda: league_court_vectors(supabase, pairs),
+        lambda: load_booked_slots(supabase, period['period_start']),
+    ]
+    if availability is None:
+        loads.append(lambda: load_availability(supabase, player_ids))
+    (courts, court_vectors), booked, *loaded = gather(*loads)
+    if loaded:
+        availability = loaded[0]
+
+    suggested_courts = suggest_courts(pairs, court_vectors, courts)
+    suggested_slots = schedule_pairs(pairs, availability, court_vectors, courts, used=booked)
+
+    assignments = []
+    for i, ((player1_id, player2_id), pair_courts, slot) in enumerate(zip(pairs, suggested_courts, suggested_slots)):
+        suggested_times = overlapping_times(availability.get(player1_id, []), availability.get(player2_id, []))
+        assignments.append({
+            'player1_id': player1_id,
+            'player2_id': player2_id,
+            'period_type': period_type,
+            **period,
+            'status': 'pending',
+            'notes': json.dumps({'suggested_times': suggested_times[:3]}) if suggested_times else None,
+            'suggested_courts': pair_courts,
+            'suggested_slot': slot,
+            **(extras[i] if extras else {}),
+        })
+    return assignments
@@ -0,0 +1,70 @@
+"""
+Shared helper: base request handler
+CORS preflight, JSON body parsing, bearer-token auth and the
+success/error envelopes that every serverless function in api/ responds
+with.
+
+Files starting with an underscore are bundled but not deployed as
+functions by Vercel.
+"""
+from http.server import BaseHTTPRequestHandler
+import json
+from urllib.parse import parse_qs, urlparse
+
+
+def get_user_from_token(supabase, auth_header):
+    """Extract and verify user from Authorization header"""
+    if not auth_header or not auth_header.startswith('Bearer '):
+        return None
+
+    token = auth_header.replace('Bearer ', '')
+    try:
+        user = supabase.auth.get_user(token)
+        if user and user.user:
+            return user.user
+    except Exception:
+        pass
+    return None
+
+
+class BaseHandler(BaseHTTPRequestHandler):
+    """Subclass as `class handler(BaseHandler)` in each endpoint module"""
+
+    allowed_methods = 'GET, POST, OPTIONS'
+    allowed_headers = 'Content-Type, Authorization, X-League'
+
+    def do_OPTIONS(self):
+        self.send_response(200)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Allow-Methods', self.allowed_methods)
+        self.send_header('Access-Control-Allow-Headers', self.allowed_headers)
+        self.end_headers()
+
+    def _query(self):
+        """Query string as a dict of first values"""
+        return {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+
+    def _league(self):
+        """League slug from the X-League header or ?league=, else None (default league)"""
+        return self.headers.get('X-League') or self._query().get('league') or None
+
+    def _read_json(self):
+        """Parse the request body as JSON (empty body -> {})"""
+        content_length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(content_length).decode('utf-8')
+        return json.loads(body) if body else {}
+
+    def _send_json(self, status, payload, headers=None):
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(json.dumps(payload).encode())
+
+    def _send_success(self, data, status=200, headers=None):
+        self._send_json(status, {"success": True, **data}, headers)
+
+    def _send_error(self, status, message):
+        self._send_json(status, {"success": False, "error": message})
@@ -0,0 +1,203 @@
+"""
+Shared helper: shared cache tier
+Per-instance caches (api/_lkg.py, api/_singleflight.py) vanish on every
+cold start and aren't shared between instances. With REDIS_URL set,
+the ladder, standings, this period's pairings and player-id lookups
+are also cached in Redis, so a fresh instance starts warm.
+
+Without REDIS_URL (or the optional `redis` package) the same code runs
+against MemoryRedis, an in-process stand-in for the handful of Redis
+commands used (GET, SET EX, MGET, INCR). fakeredis.FakeRedis() works
+too: Cache(fakeredis.FakeRedis()). An in-process backend is private to
+its instance - another instance's invalidate() never reaches it - so
+its entries live at most MICRO_TTL_SECONDS, the same bound as the
+single-flight micro-cache (api/_singleflight.py).
+
+Invalidation is by tag. Each entry is stored under its key plus the
+current version of each of its tags; invalidate() bumps the versions,
+so every entry carrying a tag stops matching at once without scanning
+for keys. Keys and tags are scoped to the league. Handlers invalidate
+after their own writes; edits made anywhere else (the Supabase
+dashboard, scripts) are picked up from the change feed (api/_changes.py).
+
+The cache is never required: if the backend errors or times out it is
+skipped for RETRY_SECONDS and reads go straight to the database. An
+invalidation lost that way is bounded by the entry's TTL.
+"""
+import json
+import os
+import threading
+import time
+
+from api._singleflight import MICRO_TTL_SECONDS
+
+REDIS_URL = os.environ.get('REDIS_URL')
+KEY_PREFIX = 'networth:'
+SOCKET_TIMEOUT_SECONDS = 0.25
+RETRY_SECONDS = 30
+
+# Tags
+LADDER = 'ladder'
+STANDINGS = 'standings'
+PAIRINGS = 'pairings'
+PLAYERS = 'players'
+TAGS = (LADDER, STANDINGS, PAIRINGS, PLAYERS)
+
+LADDER_TTL_SECONDS = 300
+STANDINGS_TTL_SECONDS = 300
+PAST_STANDINGS_TTL_SECONDS = 86400
+PAIRINGS_TTL_SECONDS = 300
+PLAYER_ID_TTL_SECONDS = 3600
+
+
+class MemoryRedis:
+    """GET, SET (with EX), MGET and INCR in process memory, returning bytes like redis-py"""
+
+    MAX_KEYS = 1024
+
+    def __init__(self):
+        self._data = {}  # key -> (value bytes, expires_at or None)
+        self._lock = threading.Lock()
+
+    def _live(self, key):
+        """Unexpired (value, expires_at) or None; caller holds _lock"""
+        item = self._data.get(key)
+        if item and item[1] is not None and item[1] <= time.monotonic():
+            del self._data[key]
+            return None
+        return item
+
+    def get(self, key):
+        with self._lock:
+            item = self._live(key)
+            return item[0] if item else None
+
+    def mget(self, keys):
+        with self._lock:
+            return [item[0] if item else None for item in map(self._live, keys)]
+
+    def set(self, key, value, ex=None):
+        if not isinstance(value, bytes):
+            value = str(value).encode()
+        with self._lock:
+            if len(self._data) >= self.MAX_KEYS:
+                now = time.monotonic()
+                for k in [k for k, (_, expires_at) in self._data.items() if expires_at is not None and expires_at <= now]:
+                    del self._data[k]
+            self._data[key] = (value, time.monotonic() + ex if ex else None)
+        return True
+
+    def incr(self, key):
+        with self._lock:
+            item = self._live(key)
+            value = int(item[0]) + 1 if item else 1
+            self._data[key] = (str(value).encode(), item[1] if item else None)
+            return value
+
+
+class Cache:
+    """
+    Tag-versioned JSON cache over a redis-py style client. max_ttl caps
+    every cached() entry (for backends not shared between instances).
+    """
+
+    def __init__(self, client, max_ttl=None):
+        self.client = client
+        self.max_ttl = max_ttl
+        self._down_until = 0
+
+    def _call(self, method, *args, **kwargs):
+        """Run a backend command; (ok, result), with the backend skipped for a while after an error"""
+        if time.monotonic() < self._down_until:
+            return False, None
+        try:
+            return True, getattr(self.client, method)(*args, **kwargs)
+        except Exception:
+            self._down_until = time.monotonic() + RETRY_SECONDS
+            return False, None
+
+    def _entry_key(self, key, tags):
+        """Key plus the current version of each tag; None if the backend is down"""
+        if not tags:
+            return f'{KEY_PREFIX}{key}'
+        ok, versions = self._call('mget', [f'{KEY_PREFIX}tag:{tag}' for tag in tags])
+        if not ok:
+            return None
+        return f'{KEY_PREFIX}{key}@' + '.'.join((v or b'0').decode() for v in versions)
+
+    def cached(self, key, load, ttl, tags=()):
+        """Cached value for key, else load() stored for ttl seconds (None is never stored)"""
+        entry_key = self._entry_key(key, tags)
+        if entry_key is not None:
+            ok, raw = self._call('get', entry_key)
+            if ok and raw is not None:
+                return json.loads(raw)['value']
+
+        value = load()
+        if entry_key is not None and value is not None:
+            if self.max_ttl is not None:
+                ttl = min(ttl, self.max_ttl)
+            self._call('set', entry_key, json.dumps({'value': value}, separators=(',', ':'), default=str), ex=ttl)
+        return value
+
+    def get(self, key):
+        """Plain (untagged) value, or None"""
+        ok, raw = self._call('get', f'{KEY_PREFIX}{key}')
+        return json.loads(raw)['value'] if ok and raw is not None else None
+
+    def set(self, key, value, ttl=None):
+        """Store a plain value, kept until ttl (or evicted)"""
+        self._call('set', f'{KEY_PREFIX}{key}', json.dumps({'value': value}, separators=(',', ':'), default=str), ex=ttl)
+
+    def invalidate(self, *tags):
+        """Retire every entry carrying any of the tags"""
+        for tag in tags:
+            self._call('incr', f'{KEY_PREFIX}tag:{tag}')
+
+
+def _connect():
+    """Cache over a redis-py client for REDIS_URL, else over the in-memory stand-in"""
+    if REDIS_URL:
+        try:
+            import redis
+        except ImportError:
+            redis = None
+        if redis is not None:
+            return Cache(redis.Redis.from_url(REDIS_URL, socket_timeout=SOCKET_TIMEOUT_SECONDS,
+                                              socket_connect_timeout=SOCKET_TIMEOUT_SECONDS))
+    return Cache(MemoryRedis(), max_ttl=MICRO_TTL_SECONDS)
+
+
+_cache = None
+
+
+def get_cache():
+    """The instance's Cache, connected on first use"""
+    global _cache
+    if _cache is None:
+        _cache = _connect()
+    return _cache
+
+
+def _scoped(supabase, name):
+    return f"{supabase.league or '-'}:{name}"
+
+
+def cached(supabase, key, load, ttl, tags=()):
+    """get_cache().cached() with the key and tags scoped to the client's league"""
+    return get_cache().cached(_scoped(supabase, key), load, ttl, [_scoped(supabase, t) for t in tags])
+
+
+def get_value(supabase, key):
+    """get_cache().get() scoped to the client's league"""
+    return get_cache().get(_scoped(supabase, key))
+
+
+def set_value(supabase, key, value, ttl=None):
+    """get_cache().set() scoped to the client's league"""
+    get_cache().set(_scoped(supabase, key), value, ttl)
+
+
+def invalidate(supabase, *tags):
+    """get_cache().invalidate() for the client's league"""
+    get_cache().invalidate(*[_scoped(supabase, t) for t in tags])
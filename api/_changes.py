@@ -0,0 +1,131 @@
+"""
+Shared helper: change feed
+Reads change_events (migrations/016), the append-only log of inserts,
+updates and deletes on players, matches and match_assignments - made
+by the API, the cron jobs or directly in the Supabase dashboard.
+Consumers keep the last seq they handled and ask for what came after:
+
+- sync_cache(): retires the cache tags (api/_cache.py) the new events
+  touch; called before cached reads, at most every SYNC_INTERVAL_SECONDS
+- scripts/build_snapshot.py: skips the rebuild when no ladder column
+  changed since the snapshot's cursor
+- scripts/backup.py: records deleted rows, skips unchanged tables
+- /api/changes: the same page for anything outside this repo
+
+A page with reset=True means events after the cursor were pruned
+(prune_change_events()); the consumer must refresh everything.
+
+Since migrations/023 only the service role can read the feed: pass a
+get_service_client() / service-key client. LEAGUE_FEED is the request
+league's events; backup.py reads ALL_LEAGUES_FEED.
+"""
+import time
+
+from api._cache import LADDER, PAIRINGS, PLAYERS, STANDINGS, TAGS, get_value, invalidate, set_value
+from api._db import gather, get_service_client
+
+
+CHANGES_PAGE = 500
+LEAGUE_FEED = 'league_change_events'
+ALL_LEAGUES_FEED = 'change_events'
+SYNC_INTERVAL_SECONDS = 15
+
+# Columns shown on the public ladder (api/_snapshot.py) or deciding who is on it
+LADDER_COLUMNS = {'rank', 'name', 'skill_level', 'total_games', 'matches_played', 'trend', 'is_active', 'is_admin'}
+
+_last_sync = {}  # league slug ('' = default) -> monotonic time of the last sync
+
+
+def fetch_changes(supabase, after=0, limit=CHANGES_PAGE, feed=LEAGUE_FEED):
+    """
+    Events with seq > after, oldest first:
+    {'events', 'cursor' (last seq returned, else after), 'has_more', 'reset'}
+    """
+    events_query = supabase.table(feed)\
+        .select('seq, table_name, op, row_id, changed_columns, created_at')\
+        .gt('seq', after)\
+        .order('seq')\
+        .limit(limit + 1)
+    state_query = supabase.table('change_feed_state').select('pruned_through').limit(1)
+    events, state = gather(events_query.execute, state_query.execute)
+
+    rows = events.data[:limit]
+    pruned_through = state.data[0]['pruned_through'] if state.data else 0
+    return {
+        'events': rows,
+        'cursor': rows[-1]['seq'] if rows else after,
+        'has_more': len(events.data) > limit,
+        'reset': after < pruned_through,
+    }
+
+
+def latest_cursor(supabase, feed=LEAGUE_FEED):
+    """seq of the newest event (0 if there are none yet)"""
+    rows = supabase.table(feed)\
+        .select('seq')\
+        .order('seq', desc=True)\
+        .limit(1)\
+        .execute().data
+    return rows[0]['seq'] if rows else 0
+
+
+def touches_ladder(event):
+    """Whether an event can change the public ladder"""
+    if event['table_name'] != 'players':
+        return False
+    return event['op'] != 'U' or bool(LADDER_COLUMNS.intersection(event.get('changed_columns') or []))
+
+
+def tags_for(events):
+    """Cache tags made stale by these events"""
+    tags = set()
+    for e in events:
+        table, changed = e['table_name'], set(e.get('changed_columns') or [])
+        if table == 'players':
+            # Every column is on /api/players and the pairing embeds
+            tags.update([LADDER, PAIRINGS])
+            if e['op'] != 'U' or 'email' in changed:
+                tags.add(PLAYERS)
+            if e['op'] != 'U' or changed & {'name', 'skill_level'}:
+                tags.add(STANDINGS)
+        elif table == 'matches':
+            tags.update([LADDER, STANDINGS])
+        elif table == 'match_assignments':
+            tags.add(PAIRINGS)
+    return tags
+
+
+def sync_cache(supabase):
+    """
+    Retire the cache tags touched since this league's stored cursor.
+    Never raises: without migration 016, SUPABASE_SERVICE_ROLE_KEY (or
+    with the database down) entries still expire by TTL.
+    """
+    league = supabase.league or ''
+    feed = get_service_client(supabase.league)
+    if not feed:
+        return
+    now = time.monotonic()
+    if now - _last_sync.get(league, float('-inf')) < SYNC_INTERVAL_SECONDS:
+        return
+    _last_sync[league] = now
+
+    try:
+        cursor = get_value(supabase, 'change-cursor')
+        if cursor is None:
+            # No cursor (first run, or the cache lost it): start over
+            invalidate(supabase, *TAGS)
+            set_value(supabase, 'change-cursor', latest_cursor(feed))
+            return
+
+        page = fetch_changes(feed, cursor)
+        if page['reset'] or page['has_more']:
+            # Missed events or a burst (e.g. a restore): retire everything, skip ahead
+            invalidate(supabase, *TAGS)
+            set_value(supabase, 'change-cursor', latest_cursor(feed))
+            return
+        if page['events']:
+            invalidate(supabase, *tags_for(page['events']))
+            set_value(supabase, 'change-cursor', page['cursor'])
+    except Exception:
+        pass
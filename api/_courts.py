@@ -0,0 +1,94 @@
+"""
+Shared helper: court suggestions
+Suggests where each pair could play from player_court_preferences
+(preference_level 1=love, 2=like, 3=neutral, 4=avoid, 5=never).
+
+The paired players' preferences are loaded in a few id-filtered, paged
+queries and turned into a weight vector per player, indexed over the
+league's approved courts; a pair's court scores are the element-wise sum
+of the two vectors. Courts either player marked "never" are left out.
+The monthly run stores the top SUGGESTED_COURTS on each assignment
+(match_assignments.suggested_courts, migrations/013) - no per-pair
+queries.
+"""
+from api._db import gather
+from api._league import get_league_settings
+
+
+SUGGESTED_COURTS = 3
+
+NEUTRAL = 3
+NEVER = 5
+
+# Player ids per preferences query (they go in the URL)
+PLAYER_ID_BATCH = 100
+
+
+def court_weight(level):
+    """Preference level -> weight (love +2 ... avoid -1); None for never"""
+    if level is None:
+        level = NEUTRAL
+    if level >= NEVER:
+        return None
+    return NEUTRAL - level
+
+
+def load_court_vectors(supabase, courts, player_ids):
+    """
+    {player_id: [weight per court]} for those of player_ids with
+    preferences; players without any are neutral on every court. Court
+    names match case-insensitively; preferences for courts not in
+    `courts` are ignored.
+    """
+    index = {name.strip().lower(): i for i, name in enumerate(courts)}
+    player_ids = sorted(player_ids)
+    batches = [player_ids[i:i + PLAYER_ID_BATCH] for i in range(0, len(player_ids), PLAYER_ID_BATCH)]
+    queries = [
+        supabase.table('player_court_preferences')
+        .select('player_id, court_name, preference_level')
+        .in_('player_id', batch)
+        .order('player_id')
+        .order('court_name')  # the UNIQUE (player_id, court_name) index
+        for batch in batches
+    ]
+    rows = [r for page in gather(*[q.execute_all for q in queries]) for r in page.data]
+
+    vectors = {}
+    for r in rows:
+        i = index.get((r.get('court_name') or '').strip().lower())
+        if i is None:
+            continue
+        vector = vectors.setdefault(r['player_id'], [0] * len(courts))
+        vector[i] = court_weight(r.get('preference_level'))
+    return vectors
+
+
+def rank_courts(vector1, vector2, courts, limit=SUGGESTED_COURTS):
+    """
+    Best courts for one pair: highest combined weight, then the court
+    the less keen player likes more, then league order.
+    """
+    ranked = []
+    for i, (w1, w2) in enumerate(zip(vector1, vector2)):
+        if w1 is None or w2 is None:
+            continue
+        ranked.append((-(w1 + w2), -min(w1, w2), i))
+    ranked.sort()
+    return [courts[i] for _, _, i in ranked[:limit]]
+
+
+def suggest_courts(pairs, vectors, courts, limit=SUGGESTED_COURTS):
+    """Court suggestions for each (player1_id, player2_id) pair, in order"""
+    neutral = [0] * len(courts)
+    return [
+        rank_courts(vectors.get(player1_id, neutral), vectors.get(player2_id, neutral), courts, limit)
+        for player1_id, player2_id in pairs
+    ]
+
+
+def league_court_vectors(supabase, pairs):
+    """(courts, vectors) for the league's approved courts; only the paired players' preferences load"""
+    courts = get_league_settings(supabase).get('approved_courts') or []
+    if not pairs or not courts:
+        return courts, {}
+    return courts, load_court_vectors(supabase, courts, {pid for pair in pairs for pid in pair})
@@ -0,0 +1,415 @@
+"""
+Shared helper: thin Supabase client
+Speaks just enough of the supabase-py query builder API for our handlers
+(table/select/filters/order/limit/single/insert/update/upsert, rpc, and
+auth.get_user / sign_in_with_otp) on top of one pooled httpx.Client.
+execute_all() pages through results longer than PostgREST's max rows.
+
+gather() runs independent queries concurrently on that pool.
+
+Importing this does NOT pull in the realtime, storage, functions or
+postgrest sub-packages that supabase.create_client() loads, which keeps
+cold starts cheap. The client is created once per warm instance.
+"""
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import httpx
+
+
+TIMEOUT = httpx.Timeout(10.0, connect=5.0)
+
+# PostgREST truncates every response at db-max-rows (1000 on Supabase)
+MAX_ROWS = 1000
+
+# SQLSTATE in APIError.code when a write breaks a unique index or the
+# one-open-assignment trigger (migrations/022)
+UNIQUE_VIOLATION = '23505'
+
+
+class APIError(Exception):
+    """Raised when PostgREST or GoTrue returns an error response"""
+
+    def __init__(self, message, status=None, code=None, details=None):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+        self.code = code
+        self.details = details
+
+
+class APIResponse:
+    """Mirrors supabase-py's response: rows in .data, optional .count"""
+
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+
+def _raise_for_status(response):
+    if response.status_code < 400:
+        return
+    try:
+        body = response.json()
+    except ValueError:
+        body = {'message': response.text}
+    if not isinstance(body, dict):
+        body = {'message': str(body)}
+    raise APIError(
+        body.get('message') or body.get('msg') or body.get('error_description') or response.text,
+        status=response.status_code,
+        code=body.get('code'),
+        details=body.get('details'),
+    )
+
+
+def _format_value(value):
+    """Format a Python value for a PostgREST filter"""
+    if value is None:
+        return 'null'
+    if value is True:
+        return 'true'
+    if value is False:
+        return 'false'
+    return str(value)
+
+
+def _strip_whitespace(columns):
+    """PostgREST select lists must not contain unquoted whitespace"""
+    out = []
+    quoted = False
+    for c in columns:
+        if c == '"':
+            quoted = not quoted
+        if c.isspace() and not quoted:
+            continue
+        out.append(c)
+    return ''.join(out)
+
+
+class QueryBuilder:
+    """Chainable PostgREST request, executed with .execute()"""
+
+    def __init__(self, client, table):
+        self._client = client
+        self._path = f'/{table}'
+        self._method = 'GET'
+        self._params = []
+        self._headers = {}
+        self._json = None
+        self._single = False
+        self._maybe_single = False
+
+    # -- Verbs ---------------------------------------------------------------
+
+    def select(self, columns='*', count=None):
+        self._method = 'GET'
+        self._params.append(('select', _strip_whitespace(columns)))
+        if count:
+            self._headers['Prefer'] = f'count={count}'
+        return self
+
+    def insert(self, rows, returning='representation'):
+        self._method = 'POST'
+        self._json = rows
+        self._headers['Prefer'] = f'return={returning}'
+        return self
+
+    def upsert(self, rows, on_conflict=None, ignore_duplicates=False, returning='representation'):
+        self._method = 'POST'
+        self._json = rows
+        resolution = 'ignore-duplicates' if ignore_duplicates else 'merge-duplicates'
+        self._headers['Prefer'] = f'resolution={resolution},return={returning}'
+        if on_conflict:
+            self._params.append(('on_conflict', on_conflict))
+        return self
+
+    def update(self, values, returning='representation'):
+        self._method = 'PATCH'
+        self._json = values
+        self._headers['Prefer'] = f'return={returning}'
+        return self
+
+    def delete(self, returning='representation'):
+        self._method = 'DELETE'
+        self._headers['Prefer'] = f'return={returning}'
+        return self
+
+    # -- Filters -------------------------------------------------------------
+
+    def filter(self, column, operator, value):
+        self._params.append((column, f'{operator}.{value}'))
+        return self
+
+    def eq(self, column, value):
+        return self.filter(column, 'eq', _format_value(value))
+
+    def neq(self, column, value):
+        return self.filter(column, 'neq', _format_value(value))
+
+    def gt(self, column, value):
+        return self.filter(column, 'gt', _format_value(value))
+
+    def gte(self, column, value):
+        return self.filter(column, 'gte', _format_value(value))
+
+    def lt(self, column, value):
+        return self.filter(column, 'lt', _format_value(value))
+
+    def lte(self, column, value):
+        return self.filter(column, 'lte', _format_value(value))
+
+    def is_(self, column, value):
+        return self.filter(column, 'is', _format_value(value))
+
+    def in_(self, column, values):
+        joined = ','.join(_format_value(v) for v in values)
+        return self.filter(column, 'in', f'({joined})')
+
+    def or_(self, filters):
+        self._params.append(('or', f'({filters})'))
+        return self
+
+    # -- Modifiers -----------------------------------------------------------
+
+    def order(self, column, desc=False, nullsfirst=False):
+        direction = 'desc' if desc else 'asc'
+        term = f'{column}.{direction}' + ('.nullsfirst' if nullsfirst else '')
+        # Repeated .order() calls add tie-breakers, like supabase-py
+        for i, (name, value) in enumerate(self._params):
+            if name == 'order':
+                self._params[i] = ('order', f'{value},{term}')
+                return self
+        self._params.append(('order', term))
+        return self
+
+    def limit(self, count):
+        self._params.append(('limit', str(count)))
+        return self
+
+    def offset(self, count):
+        self._params.append(('offset', str(count)))
+        return self
+
+    def range(self, start, end):
+        return self.offset(start).limit(end - start + 1)
+
+    def single(self):
+        self._single = True
+        return self
+
+    def maybe_single(self):
+        self._maybe_single = True
+        return self
+
+    # -- Execution -----------------------------------------------------------
+
+    def build_request(self):
+        """Return (method, path, params, headers, json) for this query"""
+        headers = dict(self._headers)
+        if self._single or self._maybe_single:
+            headers['Accept'] = 'application/vnd.pgrst.object+json'
+        return self._method, self._path, list(self._params), headers, self._json
+
+    def cache_key(self):
+        """
+        Normalized identity of this request: the same key means the same
+        rows (filter order doesn't matter to PostgREST, the league does)
+        """
+        method, path, params, headers, body = self.build_request()
+        return (
+            self._client.league or '', method, path,
+            tuple(sorted(params)), tuple(sorted(headers.items())),
+            json.dumps(body, sort_keys=True, default=str) if body is not None else None,
+        )
+
+    def parse_response(self, response):
+        """Turn an httpx.Response for this query into an APIResponse"""
+        if self._maybe_single and response.status_code == 406:
+            return APIResponse(None)
+        _raise_for_status(response)
+
+        count = None
+        content_range = response.headers.get('Content-Range', '')
+        if '/' in content_range:
+            total = content_range.split('/')[-1]
+            if total.isdigit():
+                count = int(total)
+
+        data = response.json() if response.content else []
+        return APIResponse(data, count)
+
+    def execute(self):
+        method, path, params, headers, body = self.build_request()
+        response = self._client.request(method, path, params, headers, body)
+        return self.parse_response(response)
+
+    def execute_all(self, page_size=MAX_ROWS):
+        """
+        execute() every page of a result that may be longer than MAX_ROWS.
+        Needs an order() that makes the rows' order stable.
+        """
+        method, path, params, headers, body = self.build_request()
+        rows = []
+        while True:
+            page_params = params + [('offset', str(len(rows))), ('limit', str(page_size))]
+            page = self.parse_response(self._client.request(method, path, page_params, headers, body)).data
+            rows.extend(page)
+            if len(page) < page_size:
+                return APIResponse(rows, len(rows))
+
+
+class RPCBuilder(QueryBuilder):
+    """POST /rpc/<fn> with JSON arguments; supports the same modifiers"""
+
+    def __init__(self, client, fn, params=None):
+        super().__init__(client, f'rpc/{fn}')
+        self._method = 'POST'
+        self._json = params or {}
+
+
+class AuthClient:
+    """The two GoTrue calls the handlers need (plus a no-op sign_out)"""
+
+    def __init__(self, client):
+        self._client = client
+
+    def get_user(self, jwt):
+        response = self._client.http.get(
+            f'{self._client.url}/auth/v1/user',
+            headers={**self._client.base_headers, 'Authorization': f'Bearer {jwt}'},
+        )
+        _raise_for_status(response)
+        return SimpleNamespace(user=SimpleNamespace(**response.json()))
+
+    def sign_in_with_otp(self, credentials):
+        options = credentials.get('options', {})
+        params = {}
+        if options.get('email_redirect_to'):
+            params['redirect_to'] = options['email_redirect_to']
+        response = self._client.http.post(
+            f'{self._client.url}/auth/v1/otp',
+            params=params,
+            headers=self._client.base_headers,
+            json={
+                'email': credentials['email'],
+                'create_user': options.get('should_create_user', True),
+                'data': options.get('data', {}),
+            },
+        )
+        _raise_for_status(response)
+        return SimpleNamespace(user=None, session=None)
+
+    def sign_out(self):
+        # Sessions live in the browser; there is nothing to revoke server-side
+        return None
+
+
+class Client:
+    """Minimal stand-in for supabase.Client"""
+
+    def __init__(self, url, key, http=None, league=None):
+        self.url = url.rstrip('/')
+        self.rest_url = f'{self.url}/rest/v1'
+        self.key = key
+        self.league = league
+        self.base_headers = {
+            'apikey': key,
+            'Authorization': f'Bearer {key}',
+        }
+        if league:
+            # Read by current_league_id() in SQL (migrations/003)
+            self.base_headers['X-League'] = league
+        self.http = http or httpx.Client(timeout=TIMEOUT)
+        self.auth = AuthClient(self)
+
+    def for_league(self, league):
+        """Same connection pool, scoped to one league's rows"""
+        return Client(self.url, self.key, http=self.http, league=league)
+
+    def table(self, name):
+        return QueryBuilder(self, name)
+
+    def from_(self, name):
+        return self.table(name)
+
+    def rpc(self, fn, params=None):
+        return RPCBuilder(self, fn, params)
+
+    def request(self, method, path, params=None, headers=None, json=None):
+        return self.http.request(
+            method,
+            f'{self.rest_url}{path}',
+            params=params,
+            headers={**self.base_headers, **(headers or {})},
+            json=json,
+        )
+
+
+def gather(*calls):
+    """
+    Run independent loads concurrently and return their results in order,
+    so a load phase takes as long as its slowest query instead of the sum.
+    Each call is a zero-argument callable (e.g. `query.execute` or a
+    lambda around a helper). All share the client's pooled connections;
+    the first exception is re-raised.
+    """
+    if len(calls) < 2:
+        return [call() for call in calls]
+    with ThreadPoolExecutor(max_workers=len(calls)) as pool:
+        futures = [pool.submit(call) for call in calls]
+        return [future.result() for future in futures]
+
+
+_client = None
+_league_clients = {}
+_service_clients = {}
+
+
+def get_supabase_client(league=None):
+    """
+    Lazy initialization of the Supabase client (reused while warm).
+    Pass a league slug to scope every query to that league; without one
+    the database falls back to the default league.
+    """
+    global _client
+    if _client is None:
+        url = os.environ.get('SUPABASE_URL')
+        key = os.environ.get('SUPABASE_ANON_KEY')
+        if url and key:
+            _client = Client(url, key)
+    if _client is None or not league:
+        return _client
+    if league not in _league_clients:
+        _league_clients[league] = _client.for_league(league)
+    return _league_clients[league]
+
+
+def get_service_client(league=None):
+    """
+    Service-role client for the few handler writes the anon key may not
+    make (reused while warm). None without SUPABASE_SERVICE_ROLE_KEY.
+    """
+    url = os.environ.get('SUPABASE_URL')
+    key = os.environ.get('SUPABASE_SERVICE_ROLE_KEY')
+    if not url or not key:
+        return None
+    if None not in _service_clients:
+        _service_clients[None] = Client(url, key)
+    if league and league not in _service_clients:
+        _service_clients[league] = _service_clients[None].for_league(league)
+    return _service_clients[league or None]
+
+
+def get_admin_client(league=None):
+    """
+    Client for scripts: uses SUPABASE_SERVICE_ROLE_KEY when set, which
+    bypasses RLS (all leagues, full write access). Not cached.
+    """
+    url = os.environ.get('SUPABASE_URL')
+    key = os.environ.get('SUPABASE_SERVICE_ROLE_KEY') or os.environ.get('SUPABASE_ANON_KEY')
+    if not url or not key:
+        return None
+    return Client(url, key, league=league)
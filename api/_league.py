@@ -0,0 +1,93 @@
+"""
+Shared helper: per-league settings and fan-out
+Each league's row in league_settings overrides the defaults in
+api/config.py. Settings are cached per warm instance for
+SETTINGS_TTL_SECONDS.
+
+Batch jobs (pairing, emails) call for_each_league() so every league is
+processed in its own thread - one big league doesn't hold up the rest.
+
+The league comes from the client-supplied X-League header, so it scopes
+data but doesn't isolate it: any anon-key caller can name any league.
+"""
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from api.config import APPROVED_COURTS, LEAGUE_NAME, LEAGUE_TAGLINE, SKILL_LEVELS
+
+
+SETTINGS_TTL_SECONDS = 300
+MAX_PARALLEL_LEAGUES = int(os.environ.get('MAX_PARALLEL_LEAGUES', '8'))
+
+_settings_cache = {}  # league slug ('' = default) -> (loaded_at, settings)
+
+
+def default_settings():
+    """Settings for a league with no overrides (api/config.py values)"""
+    return {
+        'slug': None,
+        'league_name': LEAGUE_NAME,
+        'tagline': LEAGUE_TAGLINE,
+        'approved_courts': list(APPROVED_COURTS),
+        'skill_levels': [list(level) for level in SKILL_LEVELS],
+    }
+
+
+def get_league_settings(supabase):
+    """Settings for the league the client is scoped to, cached while warm"""
+    key = supabase.league or ''
+    cached = _settings_cache.get(key)
+    if cached and time.monotonic() - cached[0] < SETTINGS_TTL_SECONDS:
+        return cached[1]
+
+    settings = default_settings()
+    try:
+        query = supabase.table('league_settings').select('*')
+        if supabase.league:
+            query = query.eq('slug', supabase.league)
+        else:
+            query = query.order('created_at')
+        rows = query.limit(1).execute().data
+        if rows:
+            settings.update({k: v for k, v in rows[0].items() if v is not None})
+    except Exception:
+        # Pre-migration schema or transient error: config.py defaults
+        pass
+
+    _settings_cache[key] = (time.monotonic(), settings)
+    return settings
+
+
+def list_leagues(supabase):
+    """Slugs of all active leagues ([None] if the schema has no leagues yet)"""
+    try:
+        rows = supabase.table('league_settings')\
+            .select('slug')\
+            .eq('is_active', True)\
+            .order('created_at')\
+            .execute().data
+        return [r['slug'] for r in rows] or [None]
+    except Exception:
+        return [None]
+
+
+def for_each_league(supabase, job, leagues=None):
+    """
+    Run job(league_client) for every league in parallel.
+    Returns {slug: result}; a failing league reports {'error': ...}
+    without affecting the others.
+    """
+    leagues = leagues or list_leagues(supabase)
+
+    def run(league):
+        try:
+            client = supabase.for_league(league) if league else supabase
+            return job(client)
+        except Exception as e:
+            return {'error': str(e)}
+
+    workers = max(1, min(MAX_PARALLEL_LEAGUES, len(leagues)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(run, leagues))
+    return {league or 'default': result for league, result in zip(leagues, results)}
@@ -0,0 +1,143 @@
+"""
+Shared helper: last-known-good snapshots
+Public reads (the ladder, recent matches) remember their last successful
+result. When the database errors, or takes longer than DEADLINE_SECONDS,
+the endpoint serves that snapshot - real data, with its age in the
+X-Data-Age header - instead of failing. The slow read keeps running and
+refreshes the snapshot when it lands.
+
+Stale-while-revalidate is opt-in (LKG_REVALIDATE_SECONDS, default off):
+a snapshot younger than that is returned at once as a live result and
+refreshed on a background thread. The window is capped at the
+single-flight micro-TTL (api/_singleflight.py), because Vercel freezes
+an instance between requests - a background refresh may not land until
+the next request - and a write elsewhere must not stay hidden longer
+than the micro-cache already allows. Handlers call mark_stale() after
+their own writes so the instance that wrote never serves its older
+snapshot as fresh.
+
+Snapshots are kept in memory and as compact JSON in LKG_DIR (default:
+the temp dir, which on Vercel lasts as long as the instance). Only a
+read with no snapshot yet surfaces the error.
+"""
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from api._singleflight import MICRO_TTL_SECONDS
+
+
+LKG_DIR = os.environ.get('LKG_DIR') or os.path.join(tempfile.gettempdir(), 'networth-lkg')
+DEADLINE_SECONDS = float(os.environ.get('LKG_DEADLINE_SECONDS', '3'))
+REVALIDATE_SECONDS = min(float(os.environ.get('LKG_REVALIDATE_SECONDS', '0')), MICRO_TTL_SECONDS)
+
+_snapshots = {}  # key -> (saved_at, payload)
+_refreshing = set()
+_stale = set()  # keys written since their snapshot: never served as fresh
+_lock = threading.Lock()
+
+
+def _path(key):
+    safe = ''.join(c if c.isalnum() or c in '-_' else '_' for c in key)
+    return os.path.join(LKG_DIR, f'{safe}.json')
+
+
+def remember(key, payload):
+    """Store a good result; a failed file write only loses the disk copy"""
+    saved_at = time.time()
+    _snapshots[key] = (saved_at, payload)
+    _stale.discard(key)
+    path = _path(key)
+    tmp = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    try:
+        os.makedirs(LKG_DIR, exist_ok=True)
+        with open(tmp, 'w') as f:
+            json.dump({'saved_at': saved_at, 'payload': payload}, f, separators=(',', ':'), default=str)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+def recall(key):
+    """(payload, age in seconds) of the last good result, or None"""
+    saved = _snapshots.get(key)
+    if saved is None:
+        try:
+            with open(_path(key)) as f:
+                stored = json.load(f)
+            saved = (stored['saved_at'], stored['payload'])
+        except (OSError, ValueError, KeyError):
+            return None
+        _snapshots[key] = saved
+    return saved[1], max(0, int(time.time() - saved[0]))
+
+
+def mark_stale(*keys):
+    """
+    After a write: the keys' snapshots stay as the outage fallback but
+    are no longer served as fresh, so the next read goes to the database
+    """
+    _stale.update(keys)
+
+
+def refresh_in_background(key, load):
+    """Run load() on a daemon thread and remember the result; one refresh per key at a time"""
+    with _lock:
+        if key in _refreshing:
+            return
+        _refreshing.add(key)
+
+    def run():
+        try:
+            remember(key, load())
+        except Exception:
+            pass
+        finally:
+            with _lock:
+                _refreshing.discard(key)
+
+    threading.Thread(target=run, daemon=True).start()
+
+
+def last_known_good(key, load, revalidate_after=REVALIDATE_SECONDS, deadline=DEADLINE_SECONDS):
+    """
+    load() with a last-known-good fallback. Returns (payload, age): age
+    is None for a live result (or one within the revalidate window, at
+    most MICRO_TTL_SECONDS old), else the snapshot's age in seconds.
+    Raises load()'s error only when there is no snapshot to serve.
+    """
+    snapshot = recall(key)
+    if snapshot is None:
+        payload = load()
+        remember(key, payload)
+        return payload, None
+
+    window = min(revalidate_after or 0, MICRO_TTL_SECONDS)
+    saved_at = _snapshots[key][0]
+    if key not in _stale and time.time() - saved_at < window:
+        refresh_in_background(key, load)
+        return snapshot[0], None
+
+    def run():
+        payload = load()
+        remember(key, payload)
+        return payload
+
+    # Not `with`: leaving the block would wait for an overrunning load
+    pool = ThreadPoolExecutor(max_workers=1)
+    future = pool.submit(run)
+    pool.shutdown(wait=False)
+    try:
+        return future.result(timeout=deadline), None
+    except Exception:
+        return snapshot
+
+
+def age_headers(age):
+    """X-Data-Age for a last_known_good() result; stale snapshots are never cached downstream"""
+    if age is None:
+        return {'X-Data-Age': '0'}
+    return {'X-Data-Age': str(age), 'Cache-Control': 'no-store'}
@@ -0,0 +1,123 @@
+"""
+Shared helper: memoized pairing runs
+A pairing run is a pure function of its inputs - the pairable roster,
+blocked pairs and recent-match counts (or the database candidates), the
+seed and the engine parameters - so each result is stored in
+pairing_runs (migrations/010) under a sha256 of those inputs. Retries,
+previews and the monthly cron read an identical run back instead of
+recomputing it.
+
+Runs are written with the service role key only (migrations/020), so
+callers holding the public anon key can't plant results. Without
+SUPABASE_SERVICE_ROLE_KEY runs are read but never stored; without
+migration 010 the lookups fail too. Either way every run is computed
+fresh.
+"""
+import hashlib
+import json
+
+from api._db import APIError, gather, get_service_client
+from api._ratings import INITIAL_RATING
+
+
+# Bump whenever generate_pairings() changes behaviour, so old runs stop matching
+ENGINE_VERSION = 2
+
+
+def input_hash(players, blocked_pairs, recent_matches, candidates=None, history=None, seed=None, params=None,
+               period_start=None):
+    """
+    sha256 of everything a run depends on. players is the pool in the
+    order generate_pairings() sees it (order breaks ties when unseeded).
+    The period is part of it, so a stored run belongs to one period.
+    """
+    recent = {}
+    for m in recent_matches:
+        key = '|'.join(sorted([m['player1_id'], m['player2_id']]))
+        recent[key] = recent.get(key, 0) + 1
+
+    payload = {
+        'players': [
+            [p['id'], p.get('skill_level'), p.get('skill_rating'), float(p.get('rating') or INITIAL_RATING)]
+            for p in players
+        ],
+        'blocked': sorted({'|'.join(sorted([b['player_a'], b['player_b']])) for b in blocked_pairs}),
+        'recent': recent,
+        'candidates': candidates,
+        'history': history,
+        'seed': seed,
+        'params': params,
+        'period_start': str(period_start) if period_start else None,
+    }
+    encoded = json.dumps(payload, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+def history_marker(supabase):
+    """
+    Cheap fingerprint of blocks and match history for runs scored from
+    database candidates, which never download either: the block count,
+    the latest block change and the latest match.
+    """
+    blocks_query = supabase.table('match_feedback')\
+        .select('updated_at', count='exact')\
+        .eq('would_play_again', False)\
+        .order('updated_at', desc=True)\
+        .limit(1)
+    latest_query = supabase.table('matches')\
+        .select('id')\
+        .order('created_at', desc=True)\
+        .limit(1)
+    blocks, latest = gather(blocks_query.execute, latest_query.execute)
+    return {
+        'blocks': blocks.count,
+        'last_block': blocks.data[0]['updated_at'] if blocks.data else None,
+        'last_match': latest.data[0]['id'] if latest.data else None,
+    }
+
+
+def serialize_result(pairings, skipped):
+    """Stored form of generate_pairings() output: ids and scores only"""
+    return {
+        'pairs': [[p['player1']['id'], p['player2']['id'], p['score']] for p in pairings],
+        'skipped': [p['id'] for p in skipped],
+    }
+
+
+def find_run(supabase, run_hash=None, run_id=None):
+    """Stored run by input hash or id, or None (also when migration 010 isn't applied)"""
+    query = supabase.table('pairing_runs').select('id, input_hash, seed, params, result, period_start, created_at')
+    query = query.eq('id', run_id) if run_id else query.eq('input_hash', run_hash)
+    try:
+        rows = query.limit(1).execute().data
+    except APIError:
+        return None
+    return rows[0] if rows else None
+
+
+def save_run(supabase, run_hash, result, seed=None, params=None, period_start=None):
+    """
+    Store a run; returns the stored row. When another request stored the
+    same inputs first, that row wins, so every caller sees one result.
+    Returns None when the table is missing or there is no service role
+    key to write with.
+    """
+    writer = get_service_client(supabase.league)
+    if writer is None:
+        return None
+    row = {
+        'input_hash': run_hash,
+        'seed': seed,
+        'params': params or {},
+        'result': result,
+        'period_start': period_start,
+    }
+    try:
+        saved = writer.table('pairing_runs')\
+            .upsert(row, on_conflict='league_id,input_hash', ignore_duplicates=True)\
+            .execute()
+    except APIError:
+        return None
+    if saved.data:
+        return saved.data[0]
+    return find_run(supabase, run_hash)
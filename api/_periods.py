@@ -0,0 +1,81 @@
+"""
+Shared helper: monthly periods
+A period is stored twice: period_label ("January 2025", shown to
+players) and period_start (DATE, first of the month, used for queries -
+equality and range scans hit the period_start indexes from
+migrations/007).
+
+Month names come from MONTHS rather than strftime('%B'), which follows
+the server locale.
+
+Quarters ("Q2 2025") and ISO weeks ("Week 5 2025") are PERIOD_TYPES too,
+with the same starts as period_label_start() in migrations/007.
+"""
+import re
+from datetime import date
+
+
+MONTHS = ['January', 'February', 'March', 'April', 'May', 'June', 'July',
+          'August', 'September', 'October', 'November', 'December']
+
+PERIOD_TYPES = ('month', 'quarter', 'week')
+
+
+def period_start(day=None):
+    """First day of the month containing `day` (default: today)"""
+    day = day or date.today()
+    return date(day.year, day.month, 1)
+
+
+def period_label(day=None):
+    """'January 2025' for any date in that month (default: today)"""
+    start = period_start(day)
+    return f'{MONTHS[start.month - 1]} {start.year}'
+
+
+def parse_period_label(label):
+    """'January 2025' -> date(2025, 1, 1); ValueError if it isn't a month label"""
+    try:
+        month, year = label.strip().split()
+        return date(int(year), MONTHS.index(month.capitalize()) + 1, 1)
+    except (AttributeError, ValueError):
+        raise ValueError(f'Not a month period: {label!r}')
+
+
+def period_fields(label=None, period_type='month'):
+    """
+    {'period_label', 'period_start'} for inserts; the current period if
+    no label. ValueError for an unknown period_type or a label that
+    isn't one of its periods.
+    """
+    if period_type == 'month':
+        start = parse_period_label(label) if label else period_start()
+        return {'period_label': period_label(start), 'period_start': start.isoformat()}
+
+    if period_type == 'quarter':
+        if label:
+            match = re.fullmatch(r'\s*Q([1-4])\s+(\d{4})\s*', label, re.IGNORECASE)
+            if not match:
+                raise ValueError(f'Not a quarter period: {label!r}')
+            quarter, year = int(match.group(1)), int(match.group(2))
+        else:
+            today = date.today()
+            quarter, year = (today.month - 1) // 3 + 1, today.year
+        start = date(year, (quarter - 1) * 3 + 1, 1)
+        return {'period_label': f'Q{quarter} {year}', 'period_start': start.isoformat()}
+
+    if period_type == 'week':
+        if label:
+            match = re.fullmatch(r'\s*Week\s+(\d{1,2})\s+(\d{4})\s*', label, re.IGNORECASE)
+            if not match:
+                raise ValueError(f'Not a week period: {label!r}')
+            week, year = int(match.group(1)), int(match.group(2))
+        else:
+            year, week, _ = date.today().isocalendar()
+        try:
+            start = date.fromisocalendar(year, week, 1)
+        except ValueError:
+            raise ValueError(f'Not a week period: {label!r}')
+        return {'period_label': f'Week {week} {year}', 'period_start': start.isoformat()}
+
+    raise ValueError(f"Unknown period_type {period_type!r} (expected one of {', '.join(PERIOD_TYPES)})")
@@ -0,0 +1,103 @@
+"""
+Shared helper: Elo ratings from set scores
+Every player starts at INITIAL_RATING. A match moves both ratings by
+K * (actual - expected), where "actual" comes from the set scores: mostly
+who won, partly by how much (share of games won). New players use a
+larger K until they have PROVISIONAL_MATCHES rated matches.
+
+- rate_match(): incremental update for one new match; the database
+  applies the same update on insert (migrations/018, rate_new_match())
+- replay(): full chronological rebuild (scripts/replay_ratings.py)
+
+Rankings still come from total_games; ratings are for pairing and display.
+"""
+
+INITIAL_RATING = 1500.0
+SCALE = 400.0
+K_PROVISIONAL = 40.0
+K_ESTABLISHED = 20.0
+PROVISIONAL_MATCHES = 10
+
+# Weight of the result vs the game share in a match's actual score
+RESULT_WEIGHT = 0.7
+FORFEIT_SCORE = 1.0  # player1 is the winner of a forfeit
+
+SETS = (('set1_p1', 'set1_p2'), ('set2_p1', 'set2_p2'), ('set3_p1', 'set3_p2'))
+
+# Fields replay() needs from each matches row
+MATCH_FIELDS = 'id, player1_id, player2_id, set1_p1, set1_p2, set2_p1, set2_p2, set3_p1, set3_p2, ' \
+               'is_forfeit, match_date, created_at'
+
+
+def match_score(match):
+    """Player 1's actual score in [0, 1]; None if there's nothing to rate"""
+    if match.get('is_forfeit'):
+        return FORFEIT_SCORE
+
+    sets1 = sets2 = games1 = games2 = 0
+    for a, b in SETS:
+        g1, g2 = match.get(a) or 0, match.get(b) or 0
+        games1 += g1
+        games2 += g2
+        if g1 > g2:
+            sets1 += 1
+        elif g2 > g1:
+            sets2 += 1
+
+    if games1 + games2 == 0:
+        return None
+    result = 1.0 if sets1 > sets2 else 0.0 if sets2 > sets1 else 0.5
+    return RESULT_WEIGHT * result + (1 - RESULT_WEIGHT) * games1 / (games1 + games2)
+
+
+def expected_score(rating1, rating2):
+    """Probability-like expectation that player 1 beats player 2"""
+    return 1.0 / (1.0 + 10 ** ((rating2 - rating1) / SCALE))
+
+
+def k_factor(rated_matches):
+    return K_PROVISIONAL if (rated_matches or 0) < PROVISIONAL_MATCHES else K_ESTABLISHED
+
+
+def rate_match(rating1, rated1, rating2, rated2, score):
+    """New (rating1, rating2) after a match where player 1 scored `score`"""
+    rating1 = INITIAL_RATING if rating1 is None else float(rating1)
+    rating2 = INITIAL_RATING if rating2 is None else float(rating2)
+    delta = score - expected_score(rating1, rating2)
+    return (
+        round(rating1 + k_factor(rated1) * delta, 2),
+        round(rating2 - k_factor(rated2) * delta, 2),
+    )
+
+
+def match_order(match):
+    """Chronological key: when it was played, falling back to when it was reported"""
+    return (match.get('match_date') or match.get('created_at') or '', match.get('created_at') or '', str(match.get('id')))
+
+
+def replay(matches):
+    """
+    Replay matches oldest-first from scratch.
+    Returns {player_id: {'rating': float, 'rated_matches': int}} for every
+    player who appears in a rated match.
+    """
+    ratings = {}
+    counts = {}
+    get_rating, get_count = ratings.get, counts.get
+    k_new, k_est, provisional = K_PROVISIONAL, K_ESTABLISHED, PROVISIONAL_MATCHES
+
+    for match in sorted(matches, key=match_order):
+        score = match_score(match)
+        p1, p2 = match.get('player1_id'), match.get('player2_id')
+        if score is None or not p1 or not p2:
+            continue
+
+        r1, r2 = get_rating(p1, INITIAL_RATING), get_rating(p2, INITIAL_RATING)
+        n1, n2 = get_count(p1, 0), get_count(p2, 0)
+        delta = score - 1.0 / (1.0 + 10 ** ((r2 - r1) / SCALE))
+        ratings[p1] = r1 + (k_new if n1 < provisional else k_est) * delta
+        ratings[p2] = r2 - (k_new if n2 < provisional else k_est) * delta
+        counts[p1] = n1 + 1
+        counts[p2] = n2 + 1
+
+    return {pid: {'rating': round(r, 2), 'rated_matches': counts[pid]} for pid, r in ratings.items()}
@@ -0,0 +1,217 @@
+"""
+Shared helper: match slot scheduling
+After pairing, each pair gets one suggested (court, day, time slot):
+a slot both players marked available (player_availability), at a court
+neither marked "never" (api/_courts.py), with at most
+COURT_SLOT_CAPACITY pairs sent to the same court at the same time.
+
+Solved as a min-cost flow - source -> pair (1) -> slot (capacity) ->
+sink - so the league-wide choice is optimal rather than first come,
+first served. Edge cost is how far the court is from both players'
+favourite (0 = both love it). Each pair keeps only its
+OPTIONS_PER_PAIR cheapest slots, which keeps the graph small enough for
+hundreds of pairs in well under a second. Pairs with no shared slot, or
+whose options are all full, get None and coordinate themselves as before.
+"""
+import heapq
+
+from api.config import COURT_SLOT_CAPACITY
+
+
+OPTIONS_PER_PAIR = 12
+
+DAY_NAMES = ['Sunday', 'Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday']
+
+# Two players who both love a court (weight +2 each) cost 0
+BEST_COURT_WEIGHT = 4
+
+
+def slot_options(vector1, vector2, availability1, availability2, courts, limit=OPTIONS_PER_PAIR):
+    """
+    Cheapest (cost, (court, day, time)) options for one pair. Vectors are
+    court weight vectors from api/_courts.py (None = never); availability
+    is [{'day', 'time'}] as built by load_availability().
+    """
+    shared = sorted(
+        {(a['day'], a['time']) for a in availability1} &
+        {(a['day'], a['time']) for a in availability2}
+    )
+    if not shared:
+        return []
+    options = []
+    for i, (w1, w2) in enumerate(zip(vector1, vector2)):
+        if w1 is None or w2 is None:
+            continue
+        cost = BEST_COURT_WEIGHT - (w1 + w2)
+        for order, (day, time) in enumerate(shared):
+            options.append((cost, order, i, (courts[i], day, time)))
+    # Cheapest court first; among equal courts spread over the shared times
+    options.sort()
+    return [(cost, slot) for cost, _, _, slot in options[:limit]]
+
+
+def min_cost_assignment(options, capacity, used=None):
+    """
+    Assign each pair at most one of its options, never more than
+    capacity pairs per slot (minus `used`, slots already booked), with
+    as many pairs placed as possible at the lowest total cost.
+
+    options: per pair, a list of (cost, slot) with cost >= 0.
+    Returns the chosen slot (or None) per pair.
+    """
+    used = used or {}
+    slots = sorted({slot for pair_options in options for _, slot in pair_options})
+    slot_node = {slot: len(options) + 1 + i for i, slot in enumerate(slots)}
+    source, sink = 0, len(options) + len(slots) + 1
+    size = sink + 1
+
+    # Edge lists: to, residual capacity, cost, index of the reverse edge
+    graph = [[] for _ in range(size)]
+
+    def add_edge(u, v, cap, cost):
+        graph[u].append([v, cap, cost, len(graph[v])])
+        graph[v].append([u, 0, -cost, len(graph[u]) - 1])
+
+    for p, pair_options in enumerate(options):
+        if pair_options:
+            add_edge(source, p + 1, 1, 0)
+        for cost, slot in pair_options:
+            add_edge(p + 1, slot_node[slot], 1, cost)
+    for slot in slots:
+        free = capacity - used.get(slot, 0)
+        if free > 0:
+            add_edge(slot_node[slot], sink, free, 0)
+
+    # Primal-dual min-cost flow: Dijkstra (with potentials) finds the
+    # current shortest path length, then every augmenting path of that
+    # length is pushed at once along zero reduced-cost edges (Dinic-style
+    # blocking flow). Costs are small integers, so there are only a few
+    # phases however many pairs there are.
+    potential = [0] * size
+    while True:
+        dist = [None] * size
+        dist[source] = 0
+        heap = [(0, source)]
+        while heap:
+            d, u = heapq.heappop(heap)
+            if d > dist[u]:
+                continue
+            for v, cap, cost, _ in graph[u]:
+                if cap <= 0:
+                    continue
+                nd = d + cost + potential[u] - potential[v]
+                if dist[v] is None or nd < dist[v]:
+                    dist[v] = nd
+                    heapq.heappush(heap, (nd, v))
+        if dist[sink] is None:
+            break
+        for v in range(size):
+            potential[v] += min(dist[v], dist[sink]) if dist[v] is not None else dist[sink]
+
+        if not blocking_flow(graph, potential, source, sink):
+            break
+
+    chosen = []
+    for p in range(len(options)):
+        slot = None
+        for v, cap, cost, _ in graph[p + 1]:
+            if v != source and cap == 0:
+                slot = slots[v - len(options) - 1]
+                break
+        chosen.append(slot)
+    return chosen
+
+
+def blocking_flow(graph, potential, source, sink):
+    """
+    Push as many unit augmenting paths as possible along admissible
+    (residual, zero reduced-cost) edges; returns how many were pushed.
+    """
+    def admissible(u, edge):
+        v, cap, cost, _ = edge
+        return cap > 0 and cost + potential[u] - potential[v] == 0
+
+    pushed = 0
+    while True:
+        # BFS levels over admissible edges
+        level = {source: 0}
+        queue = [source]
+        for u in queue:
+            for edge in graph[u]:
+                if edge[0] not in level and admissible(u, edge):
+                    level[edge[0]] = level[u] + 1
+                    queue.append(edge[0])
+        if sink not in level:
+            return pushed
+
+        # Iterative DFS along increasing levels; next_edge skips dead ends
+        next_edge = {u: 0 for u in level}
+        while True:
+            path = []  # (node, edge index)
+            u = source
+            while u != sink:
+                edges = graph[u]
+                i = next_edge[u]
+                while i < len(edges):
+                    v = edges[i][0]
+                    if level.get(v) == level[u] + 1 and admissible(u, edges[i]):
+                        break
+                    i += 1
+                next_edge[u] = i
+                if i == len(edges):
+                    if not path:
+                        break
+                    # Dead end: retreat and skip the edge that led here
+                    u, _ = path.pop()
+                    next_edge[u] += 1
+                    continue
+                path.append((u, i))
+                u = edges[i][0]
+            if u != sink:
+                break
+            for u, i in path:
+                edge = graph[u][i]
+                edge[1] -= 1
+                graph[edge[0]][edge[3]][1] += 1
+            pushed += 1
+
+
+def schedule_pairs(pairs, availability, vectors, courts, capacity=COURT_SLOT_CAPACITY, used=None):
+    """
+    Suggested slot per (player1_id, player2_id) pair, as
+    {'court', 'day', 'time'} or None.
+    """
+    neutral = [0] * len(courts)
+    options = [
+        slot_options(vectors.get(player1_id, neutral), vectors.get(player2_id, neutral),
+                     availability.get(player1_id, []), availability.get(player2_id, []), courts)
+        for player1_id, player2_id in pairs
+    ]
+    return [
+        {'court': slot[0], 'day': slot[1], 'time': slot[2]} if slot else None
+        for slot in min_cost_assignment(options, capacity, used)
+    ]
+
+
+def load_booked_slots(supabase, period_start):
+    """{(court, day, time): pairs} already suggested for open assignments this period"""
+    rows = supabase.table('match_assignments')\
+        .select('suggested_slot')\
+        .eq('period_start', period_start)\
+        .in_('status', ['pending', 'accepted'])\
+        .execute().data
+    booked = {}
+    for r in rows:
+        slot = r.get('suggested_slot')
+        if slot:
+            key = (slot['court'], slot['day'], slot['time'])
+            booked[key] = booked.get(key, 0) + 1
+    return booked
+
+
+def describe_slot(slot):
+    """'Sunday evening at Vermont Canyon'"""
+    if not slot:
+        return None
+    day = DAY_NAMES[slot['day']] if 0 <= slot['day'] < len(DAY_NAMES) else f"Day {slot['day']}"
+    return f"{day} {slot['time']} at {slot['court']}"
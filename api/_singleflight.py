@@ -0,0 +1,101 @@
+"""
+Shared helper: single-flight reads
+When pairing emails go out, many players open the site at once and a
+warm instance gets the same read several times concurrently. The first
+request for a key runs the query; identical requests that arrive while
+it is in flight wait for that result instead of issuing their own. The
+result is then kept for MICRO_TTL_SECONDS, so a burst of N identical
+requests costs one database query.
+
+Keys come from QueryBuilder.cache_key() (method, path, sorted filters,
+league). Only reads are shared; errors are never cached - every waiter
+sees the error and the next request tries again. Everything is per
+process.
+"""
+import copy
+import os
+import threading
+import time
+
+from api._db import APIResponse
+
+
+MICRO_TTL_SECONDS = float(os.environ.get('MICRO_TTL_SECONDS', '2'))
+MAX_ENTRIES = 256
+
+_lock = threading.Lock()
+_inflight = {}  # key -> _Flight
+_recent = {}    # key -> (expires_at, result)
+
+
+class _Flight:
+    """One upstream call that followers wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+def single_flight(key, load, ttl=MICRO_TTL_SECONDS):
+    """
+    load() once per key across concurrent callers, its result reused for
+    ttl seconds. Callers share the returned object - don't mutate it.
+    """
+    with _lock:
+        hit = _recent.get(key)
+        if hit and hit[0] > time.monotonic():
+            return hit[1]
+        flight = _inflight.get(key)
+        leader = flight is None
+        if leader:
+            flight = _inflight[key] = _Flight()
+
+    if not leader:
+        flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+
+    try:
+        flight.result = load()
+    except Exception as e:
+        flight.error = e
+        raise
+    finally:
+        with _lock:
+            del _inflight[key]
+            if flight.error is None and ttl > 0:
+                _remember(key, flight.result, ttl)
+        flight.done.set()
+    return flight.result
+
+
+def _remember(key, result, ttl):
+    """Store a result (caller holds _lock); expired entries go first when full"""
+    now = time.monotonic()
+    if len(_recent) >= MAX_ENTRIES:
+        for k in [k for k, (expires_at, _) in _recent.items() if expires_at <= now]:
+            del _recent[k]
+        if len(_recent) >= MAX_ENTRIES:
+            _recent.clear()
+    _recent[key] = (now + ttl, result)
+
+
+def shared_execute(query, ttl=MICRO_TTL_SECONDS):
+    """
+    query.execute() through single_flight(). Each caller gets its own
+    copy of the rows, so handlers can annotate them freely. Writes run
+    directly.
+    """
+    key = query.cache_key()
+    if key[1] != 'GET':
+        return query.execute()
+    response = single_flight(key, query.execute, ttl)
+    return APIResponse(copy.deepcopy(response.data), response.count)
+
+
+def forget():
+    """Drop every micro-cached read, after a write in this instance"""
+    with _lock:
+        _recent.clear()
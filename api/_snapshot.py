@@ -0,0 +1,38 @@
+"""
+Shared helper: static ladder snapshot
+Builds the public ladder JSON so the homepage can be served straight
+from the CDN. Only public fields are included - never email or phone.
+
+The file is written by scripts/build_snapshot.py, which the
+ladder-snapshot GitHub workflow runs every 15 minutes; the change feed
+(migrations/016) makes runs without a ladder change stop early, so
+match reports don't need to trigger a rebuild themselves.
+"""
+from datetime import datetime, timezone
+
+
+PUBLIC_FIELDS = ['rank', 'name', 'skill_level', 'total_games', 'matches_played', 'trend']
+
+
+def fetch_ladder_players(supabase):
+    """Active, non-admin players in rank order, public fields only"""
+    response = supabase.table('players')\
+        .select(', '.join(PUBLIC_FIELDS))\
+        .eq('is_active', True)\
+        .eq('is_admin', False)\
+        .order('rank')\
+        .execute()
+    return [{f: p.get(f) for f in PUBLIC_FIELDS} for p in response.data]
+
+
+def build_ladder_snapshot(players):
+    """Compact ladder payload with the stats the homepage ticker shows"""
+    leader = players[0] if players else None
+    total_matches = sum(p.get('matches_played') or 0 for p in players) // 2
+    return {
+        'generated_at': datetime.now(timezone.utc).isoformat(),
+        'player_count': len(players),
+        'total_matches': total_matches,
+        'leader': {'name': leader['name'], 'total_games': leader.get('total_games') or 0} if leader else None,
+        'players': players,
+    }
@@ -3,37 +3,16 @@ Vercel Serverless Function: Authentication API
 Uses Supabase Magic Links (passwordless email login)
 Free tier: 50,000 emails/month
 """
-from http.server import BaseHTTPRequestHandler
-import json
 import os
 
+from api._base import BaseHandler
+from api._db import get_supabase_client
 
-def get_supabase_client():
-    """Lazy initialization of Supabase client"""
-    try:
-        from supabase import create_client
-        url = os.environ.get('SUPABASE_URL')
-        key = os.environ.get('SUPABASE_ANON_KEY')
-        if url and key:
-            return create_client(url, key)
-    except Exception:
-        pass
-    return None
-
-
-class handler(BaseHTTPRequestHandler):
-    def do_OPTIONS(self):
-        self.send_response(200)
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type, Authorization')
-        self.end_headers()
 
+class handler(BaseHandler):
     def do_POST(self):
         try:
-            content_length = int(self.headers.get('Content-Length', 0))
-            body = self.rfile.read(content_length).decode('utf-8')
-            data = json.loads(body) if body else {}
+            data = self._read_json()
 
             action = data.get('action', 'magic_link')
             email = data.get('email', '').lower().strip()
@@ -42,7 +21,7 @@ class handler(BaseHTTPRequestHandler):
                 self._send_error(400, "Email is required")
                 return
 
-            supabase = get_supabase_client()
+            supabase = get_supabase_client(self._league())
 
             if action == 'magic_link':
                 # Send magic link email
@@ -121,17 +100,3 @@ class handler(BaseHTTPRequestHandler):
 
         except Exception as e:
             self._send_error(500, str(e))
-
-    def _send_success(self, data):
-        self.send_response(200)
-        self.send_header('Content-Type', 'application/json')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.end_headers()
-        self.wfile.write(json.dumps({"success": True, **data}).encode())
-
-    def _send_error(self, status, message):
-        self.send_response(status)
-        self.send_header('Content-Type', 'application/json')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.end_headers()
-        self.wfile.write(json.dumps({"success": False, "error": message}).encode())
@@ -0,0 +1,50 @@
+"""
+Vercel Serverless Function: Change Feed
+Events recorded by the migrations/016 triggers on players, matches and
+match_assignments, oldest first (see api/_changes.py).
+
+GET /api/changes?after=<seq>&limit=500
+    -> {events: [{seq, table_name, op, row_id, changed_columns, created_at}],
+        cursor, has_more, reset}
+
+Pass the returned cursor as `after` next time. reset=true means events
+after your cursor were pruned: refresh everything, then continue from
+the cursor. When CRON_SECRET is set, requests need
+`Authorization: Bearer <CRON_SECRET>`. The feed is read with
+SUPABASE_SERVICE_ROLE_KEY (migrations/023 closes it to the anon key);
+503 without it.
+"""
+import os
+
+from api._base import BaseHandler
+from api._changes import CHANGES_PAGE, fetch_changes
+from api._db import get_service_client
+
+
+class handler(BaseHandler):
+    allowed_methods = 'GET, OPTIONS'
+
+    def do_GET(self):
+        try:
+            cron_secret = os.environ.get('CRON_SECRET')
+            if cron_secret and self.headers.get('Authorization') != f'Bearer {cron_secret}':
+                self._send_error(401, 'Unauthorized')
+                return
+
+            query = self._query()
+            try:
+                after = max(0, int(query.get('after', 0)))
+                limit = max(1, min(CHANGES_PAGE, int(query.get('limit', CHANGES_PAGE))))
+            except ValueError:
+                self._send_error(400, "after and limit must be numbers")
+                return
+
+            supabase = get_service_client(self._league())
+            if not supabase:
+                self._send_error(503, "Change feed not configured")
+                return
+
+            self._send_success(fetch_changes(supabase, after, limit), headers={'Cache-Control': 'no-store'})
+
+        except Exception as e:
+            self._send_error(500, str(e))
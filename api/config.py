@@ -108,6 +108,9 @@ APPROVED_COURTS = [
 # For email display
 COURTS_DISPLAY = " • ".join(APPROVED_COURTS[:7])  # First 7 for brevity
 
+# Pairs suggested to the same court at the same day/time slot (api/_scheduling.py)
+COURT_SLOT_CAPACITY = 2
+
 # =============================================================================
 # SKILL LEVELS
 # =============================================================================
@@ -121,6 +124,17 @@ SKILL_LEVELS = [
     ('2.5', '2.5 Beginner'),
 ]
 
+# Numeric value of each level, stored as players.skill_rating (migrations/012)
+# and used for all skill comparisons. Mirrored by skill_numeric() in SQL.
+SKILL_RATINGS = {
+    '4.5': 4.5,
+    '4.0': 4.0,
+    '3.5+': 3.75,
+    '3.5': 3.5,
+    '3.0': 3.0,
+    '2.5': 2.5,
+}
+
 # =============================================================================
 # TIME SLOTS
 # =============================================================================
@@ -141,10 +155,10 @@ def get_site_url():
     return os.environ.get('SITE_URL', SITE_URL)
 
 
-def format_subject(template_key, **kwargs):
-    """Format an email subject with variables"""
+def format_subject(template_key, league=None, **kwargs):
+    """Format an email subject with variables; league: settings from api/_league.py"""
     template = EMAIL_SUBJECTS.get(template_key, template_key)
-    kwargs['league_name'] = LEAGUE_NAME
+    kwargs['league_name'] = (league or {}).get('league_name') or LEAGUE_NAME
     return template.format(**kwargs)
 
 
@@ -2,26 +2,204 @@
 Vercel Cron Job: Monthly Pairing Generation
 Runs on 1st of each month at 9am PT
 Generates pairings and sends notification emails
+
+The run is split so no single invocation has to handle the whole roster:
+1. Coordinator (POST/GET with no body): fans out one shard per
+   (league, skill tier) and calls each as its own function invocation
+2. Shard worker (POST {"shard": {"tier": ...}} + X-League): pairs,
+   saves and emails its tier, returns the players it couldn't pair
+3. Leftover pass (in the coordinator): cross-pairs leftovers from
+   adjacent tiers of the same league
+
+Without SITE_URL the shards run in-process, one after another. A shard
+that fails or times out is retried in-process before the leftover pass.
+
+Re-running is safe: players who already have an assignment for the
+period are left out of every pass, so only the missing pairs are
+created and emailed.
 """
-from http.server import BaseHTTPRequestHandler
-import json
 import os
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+from api._assignments import build_assignments
+from api._base import BaseHandler
+from api._cache import PAIRINGS, invalidate
+from api._db import gather, get_supabase_client
+from api._league import MAX_PARALLEL_LEAGUES, get_league_settings, list_leagues
+from api._periods import period_fields, period_label as current_period_label
+
+
+SHARD_TIMEOUT_SECONDS = 300
+
+
+def assigned_player_ids(supabase, period_start):
+    """Ids of players who already have an assignment (any status) in the period"""
+    rows = supabase.table('match_assignments')\
+        .select('player1_id, player2_id')\
+        .eq('period_start', period_start)\
+        .order('id')\
+        .execute_all().data
+    return {pid for row in rows for pid in (row['player1_id'], row['player2_id']) if pid}
+
+
+def load_tier_players(supabase, tier=None, period_start=None):
+    """
+    Active, non-admin players (optionally one tier). With period_start,
+    players already assigned in that period are left out.
+    """
+    from api.pairings import SKILL_TIERS
+
+    query = supabase.table('players')\
+        .select('id, name, email, skill_level, skill_rating, rank, rating')\
+        .eq('is_active', True)\
+        .eq('is_admin', False)
+    if tier:
+        # Range scan on idx_players_league_skill (migrations/012)
+        low, high = SKILL_TIERS[tier]
+        query = query.gte('skill_rating', low).lte('skill_rating', high)
+
+    players_resp, assigned = gather(
+        query.execute,
+        lambda: assigned_player_ids(supabase, period_start) if period_start else set(),
+    )
+    return [p for p in players_resp.data if p['id'] not in assigned]
+
+
+def load_pairing_inputs(supabase, tier=None, period_start=None):
+    """
+    Players (see load_tier_players), blocked pairs and recent matches.
+    Availability isn't needed to pair: save_and_notify() loads it for
+    the paired players only.
+    """
+    from api.pairings import load_pairing_history
+
+    players, (blocked_pairs, recent) = gather(
+        lambda: load_tier_players(supabase, tier, period_start),
+        lambda: load_pairing_history(supabase),
+    )
+    return players, blocked_pairs, recent
+
+
+def save_and_notify(supabase, pairings, period_label, availability=None, period=None, period_type='month'):
+    """
+    Insert assignments for the pairings and email both players; returns
+    (created, emails_sent). A pairing's optional 'assignment' dict is
+    merged into its row (rematch lineage). Availability is loaded for
+    the paired players unless given. period: the stored
+    {'period_label', 'period_start'} when re-pairing an existing period,
+    so labels period_fields() doesn't parse are kept as they are.
+    """
+    from api._scheduling import describe_slot
+
+    period = period or period_fields(period_label, period_type)
+    league = get_league_settings(supabase)
+    pairs = [(p['player1']['id'], p['player2']['id']) for p in pairings]
+
+    # Courts, slot (within what's already booked) and shared times per pair
+    assignments = build_assignments(supabase, pairs, period, period_type, availability,
+                                    [p.get('assignment', {}) for p in pairings])
+
+    # Save assignments to database
+    if assignments:
+        supabase.table('match_assignments').insert(assignments).execute()
+        invalidate(supabase, PAIRINGS)
+
+    # Send pairing emails
+    from api.email import send_email, get_pairing_email_html
+
+    sent_count = 0
+    for p, a in zip(pairings, assignments):
+        p1, p2 = p['player1'], p['player2']
+        pair_courts, slot = a['suggested_courts'], a['suggested_slot']
+
+        # Email to player 1
+        html1 = get_pairing_email_html(p1['name'], p2['name'], p2['email'], period_label, league=league,
+                                       suggested_courts=pair_courts, suggested_slot=describe_slot(slot))
+        result1 = send_email(p1['email'], f'🎾 Your {period_label} Tennis Match', html1)
+        if result1.get('success'):
+            sent_count += 1
 
+        # Email to player 2
+        html2 = get_pairing_email_html(p2['name'], p1['name'], p1['email'], period_label, league=league,
+                                       suggested_courts=pair_courts, suggested_slot=describe_slot(slot))
+        result2 = send_email(p2['email'], f'🎾 Your {period_label} Tennis Match', html2)
+        if result2.get('success'):
+            sent_count += 1
 
-def get_supabase_client():
-    try:
-        from supabase import create_client
-        url = os.environ.get('SUPABASE_URL')
-        key = os.environ.get('SUPABASE_ANON_KEY')
-        if url and key:
-            return create_client(url, key)
-    except Exception:
-        pass
-    return None
+    return len(assignments), sent_count
 
 
-class handler(BaseHTTPRequestHandler):
+def run_shard(supabase, period_label, tier, seed=None):
+    """Pair one skill tier of one league; leftovers go back to the coordinator"""
+    from api.pairings import run_pairings
+
+    period_start = period_fields(period_label)['period_start']
+    players, blocked_pairs, recent = load_pairing_inputs(supabase, tier, period_start)
+    pairings, skipped, run = run_pairings(supabase, players, blocked_pairs, recent, seed, period_start)
+    created, sent = save_and_notify(supabase, pairings, period_label)
+
+    return {
+        'tier': tier,
+        'players': len(players),
+        'run_id': run['id'],
+        'cached': run['cached'],
+        'pairings_created': created,
+        'emails_sent': sent,
+        'leftovers': skipped,
+    }
+
+
+def run_leftover_pass(supabase, period_label, leftovers, seed=None):
+    """Cross-pair the players each tier couldn't pair (adjacent tiers first)"""
+    from api.pairings import load_pairing_history, run_pairings
+
+    if len(leftovers) < 2:
+        return {'players': len(leftovers), 'pairings_created': 0, 'emails_sent': 0,
+                'unpaired': [p['name'] for p in leftovers]}
+
+    period_start = period_fields(period_label)['period_start']
+    assigned, (blocked_pairs, recent) = gather(
+        lambda: assigned_player_ids(supabase, period_start),
+        lambda: load_pairing_history(supabase),
+    )
+    # Only players still without an assignment (a re-run may have paired some)
+    leftovers = [p for p in leftovers if p['id'] not in assigned]
+    # generate_pairings sorts by skill, so neighbours from adjacent tiers meet first
+    pairings, skipped, run = run_pairings(supabase, leftovers, blocked_pairs, recent, seed, period_start)
+    created, sent = save_and_notify(supabase, pairings, period_label)
+
+    return {
+        'players': len(leftovers),
+        'run_id': run['id'],
+        'cached': run['cached'],
+        'pairings_created': created,
+        'emails_sent': sent,
+        'unpaired': [p['name'] for p in skipped],
+    }
+
+
+def invoke_shard(site_url, auth_header, league, tier, period_label, seed=None):
+    """Run one shard as its own serverless invocation"""
+    import httpx
+
+    headers = {'Content-Type': 'application/json'}
+    if auth_header:
+        headers['Authorization'] = auth_header
+    if league:
+        headers['X-League'] = league
+    response = httpx.post(
+        f'{site_url}/api/cron/monthly',
+        headers=headers,
+        json={'shard': {'tier': tier, 'period_label': period_label, 'seed': seed}},
+        timeout=SHARD_TIMEOUT_SECONDS,
+    )
+    body = response.json()
+    if not body.get('success'):
+        raise RuntimeError(body.get('error', f'shard failed ({response.status_code})'))
+    return body
+
+
+class handler(BaseHandler):
     def do_GET(self):
         """
         Called by Vercel Cron on 1st of each month.
@@ -38,134 +216,96 @@ class handler(BaseHTTPRequestHandler):
             #     self._send_error(401, 'Unauthorized')
             #     return
 
-            period_label = datetime.now().strftime('%B %Y')
-            supabase = get_supabase_client()
+            data = self._read_json() if self.command == 'POST' else {}
+            shard = data.get('shard')
+            period_label = (shard or {}).get('period_label') or current_period_label()
+            # Optional pairing seed for reproducible tie-breaking (see generate_pairings)
+            seed = (shard or data).get('seed')
 
+            supabase = get_supabase_client(self._league())
             if not supabase:
                 self._send_error(503, 'Database not configured')
                 return
 
-            # Import the pairing logic
-            from api.pairings import generate_pairings, skill_to_numeric
-
-            # 1. Get all active players with availability
-            players_resp = supabase.table('players')\
-                .select('id, name, email, skill_level, rank')\
-                .eq('is_active', True)\
-                .eq('is_admin', False)\
-                .execute()
-            players = players_resp.data
-
-            # 2. Get availability preferences
-            availability_resp = supabase.table('player_availability')\
-                .select('player_id, day_of_week, time_slot, is_available')\
-                .eq('is_available', True)\
-                .execute()
-
-            # Build availability lookup
-            availability = {}
-            for a in availability_resp.data:
-                pid = a['player_id']
-                if pid not in availability:
-                    availability[pid] = []
-                availability[pid].append({
-                    'day': a['day_of_week'],
-                    'time': a['time_slot']
-                })
-
-            # 3. Get blocked pairs
-            blocked_resp = supabase.table('match_feedback')\
-                .select('from_player_id, about_player_id')\
-                .eq('would_play_again', False)\
-                .execute()
-            blocked_pairs = []
-            for b in blocked_resp.data:
-                blocked_pairs.append({
-                    'player_a': min(b['from_player_id'], b['about_player_id']),
-                    'player_b': max(b['from_player_id'], b['about_player_id'])
-                })
-
-            # 4. Get recent matches for variety
-            recent_resp = supabase.table('matches')\
-                .select('player1_id, player2_id')\
-                .order('created_at', desc=True)\
-                .limit(200)\
-                .execute()
-
-            # 5. Generate pairings
-            pairings = generate_pairings(players, blocked_pairs, recent_resp.data)
-
-            # 6. Find overlapping availability for each pair
-            assignments = []
-            for p in pairings:
-                p1_avail = availability.get(p['player1']['id'], [])
-                p2_avail = availability.get(p['player2']['id'], [])
-
-                # Find overlapping times
-                suggested_times = []
-                for a1 in p1_avail:
-                    for a2 in p2_avail:
-                        if a1['day'] == a2['day'] and a1['time'] == a2['time']:
-                            suggested_times.append({
-                                'day': a1['day'],
-                                'time': a1['time']
-                            })
-
-                assignment = {
-                    'player1_id': p['player1']['id'],
-                    'player2_id': p['player2']['id'],
-                    'period_type': 'month',
-                    'period_label': period_label,
-                    'status': 'pending',
-                    'notes': json.dumps({'suggested_times': suggested_times[:3]}) if suggested_times else None
-                }
-                assignments.append(assignment)
-
-            # 7. Save assignments to database
-            if assignments:
-                supabase.table('match_assignments').insert(assignments).execute()
-
-            # 8. Send pairing emails
-            # Import email sending function
-            from api.email import send_email, get_pairing_email_html
-
-            sent_count = 0
-            for assignment in assignments:
-                # Get player details
-                p1 = next((p for p in players if p['id'] == assignment['player1_id']), None)
-                p2 = next((p for p in players if p['id'] == assignment['player2_id']), None)
-
-                if p1 and p2:
-                    # Email to player 1
-                    html1 = get_pairing_email_html(p1['name'], p2['name'], p2['email'], period_label)
-                    result1 = send_email(p1['email'], f'🎾 Your {period_label} Tennis Match', html1)
-                    if result1.get('success'):
-                        sent_count += 1
-
-                    # Email to player 2
-                    html2 = get_pairing_email_html(p2['name'], p1['name'], p1['email'], period_label)
-                    result2 = send_email(p2['email'], f'🎾 Your {period_label} Tennis Match', html2)
-                    if result2.get('success'):
-                        sent_count += 1
-
-            self._send_success({
-                'period': period_label,
-                'pairings_created': len(assignments),
-                'emails_sent': sent_count,
-                'players': len(players)
-            })
+            if shard:
+                self._send_success(run_shard(supabase, period_label, shard['tier'], seed))
+            else:
+                self._send_success(self._coordinate(supabase, period_label, auth_header, seed))
 
         except Exception as e:
             self._send_error(500, str(e))
 
-    def _send_success(self, data):
-        self.send_response(200)
-        self.send_header('Content-Type', 'application/json')
-        self.end_headers()
-        self.wfile.write(json.dumps({"success": True, **data}).encode())
-
-    def _send_error(self, status, message):
-        self.send_response(status)
-        self.send_header('Content-Type', 'application/json')
-        self.end_headers()
-        self.wfile.write(json.dumps({"success": False, "error": message}).encode())
+    def do_POST(self):
+        """GitHub Actions (biweekly-emails.yml) calls this with POST"""
+        self.do_GET()
+
+    def _coordinate(self, supabase, period_label, auth_header, seed=None):
+        """Fan out (league, tier) shards in parallel, then run each league's leftover pass"""
+        from api.pairings import SKILL_TIERS
+
+        leagues = [self._league()] if self._league() else list_leagues(supabase)
+        shards = [(league, tier) for league in leagues for tier in SKILL_TIERS]
+        site_url = os.environ.get('SITE_URL')
+
+        def client_for(league):
+            return supabase.for_league(league) if league else supabase
+
+        def run(shard, remote=bool(site_url)):
+            league, tier = shard
+            try:
+                if remote:
+                    return invoke_shard(site_url, auth_header, league, tier, period_label, seed)
+                return run_shard(client_for(league), period_label, tier, seed)
+            except Exception as e:
+                return {'tier': tier, 'error': str(e), 'leftovers': []}
+
+        def unassigned_in_tier(shard):
+            """A shard that failed twice: its still-unassigned players, for the leftover pass"""
+            league, tier = shard
+            try:
+                return load_tier_players(client_for(league), tier, period_fields(period_label)['period_start'])
+            except Exception:
+                return []
+
+        if site_url:
+            workers = max(1, min(len(shards), MAX_PARALLEL_LEAGUES * len(SKILL_TIERS)))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                shard_results = list(pool.map(run, shards))
+        else:
+            shard_results = [run(shard) for shard in shards]
+
+        # Retry failed or timed-out shards here, one at a time. Players the
+        # failed attempt did pair are skipped, so nobody is paired twice.
+        # If the retry fails too, the tier's unassigned players join the
+        # league's leftover pass (and are listed as unpaired if it can't).
+        for i, shard in enumerate(shards):
+            if 'error' in shard_results[i]:
+                first_error = shard_results[i]['error']
+                shard_results[i] = run(shard, remote=False)
+                shard_results[i]['retried_after'] = first_error
+                if 'error' in shard_results[i]:
+                    shard_results[i]['leftovers'] = unassigned_in_tier(shard)
+
+        results = {}
+        for (league, tier), result in zip(shards, shard_results):
+            league_result = results.setdefault(league or 'default', {'shards': {}, 'leftovers': []})
+            league_result['leftovers'].extend(result.pop('leftovers', []))
+            league_result['shards'][tier] = result
+
+        for league, league_result in results.items():
+            client = client_for(league if league != 'default' else None)
+            leftovers = league_result.pop('leftovers')
+            try:
+                league_result['leftover_pass'] = run_leftover_pass(client, period_label, leftovers, seed)
+            except Exception as e:
+                league_result['leftover_pass'] = {'error': str(e), 'unpaired': [p['name'] for p in leftovers]}
+
+        return {
+            'period': period_label,
+            'leagues': results,
+            'pairings_created': sum(
+                s.get('pairings_created', 0)
+                for r in results.values()
+                for s in [*r['shards'].values(), r['leftover_pass']]
+            ),
+        }
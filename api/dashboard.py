@@ -0,0 +1,119 @@
+"""
+Vercel Serverless Function: Player Dashboard
+Everything dashboard.html needs in one request, instead of separate
+calls to /api/profile, /api/pairings and /api/matches.
+
+Endpoints:
+- GET: profile, open assignments and recent match history (requires auth)
+
+The token is verified once and the player looked up by email; the
+assignments (with each opponent's contact details and availability)
+and the match history then load concurrently. Both are filtered to
+this player in the database rather than in the browser.
+"""
+from api._base import BaseHandler, get_user_from_token
+from api._db import gather, get_supabase_client
+from api._periods import period_label
+from api.pairings import get_availability_text
+from api.players import PLAYER_STATS_EMBED
+from api.profile import profile_payload
+
+
+HISTORY_LIMIT = 10
+
+OPPONENT_FIELDS = 'id, name, email, phone, skill_level, available_morning, available_afternoon, available_evening'
+
+ASSIGNMENT_FIELDS = 'id, period_label, period_start, status, suggested_courts, suggested_slot, player1_id, player2_id, ' \
+                    f'player1:players!player1_id({OPPONENT_FIELDS}), player2:players!player2_id({OPPONENT_FIELDS})'
+
+MATCH_FIELDS = 'id, player1_id, player2_id, set1_p1, set1_p2, set2_p1, set2_p2, set3_p1, set3_p2, ' \
+               'player1_games, player2_games, period_label, match_date, court, ' \
+               'player1:players!player1_id(id, name), player2:players!player2_id(id, name)'
+
+
+def assignment_payload(a, player_id):
+    """Open assignment from this player's side: opponent, their availability, suggestions"""
+    mine = a['player1_id'] == player_id
+    opponent = (a.get('player2') if mine else a.get('player1')) or {}
+    return {
+        'id': a['id'],
+        'period_label': a.get('period_label'),
+        'status': a.get('status'),
+        'opponent': {k: opponent.get(k) for k in ('id', 'name', 'email', 'phone', 'skill_level')},
+        'opponent_availability': get_availability_text(opponent) if opponent else None,
+        'suggested_courts': a.get('suggested_courts') or [],
+        'suggested_slot': a.get('suggested_slot'),
+    }
+
+
+def match_payload(m, player_id):
+    """Played match from this player's side: [mine, theirs] per set and in games"""
+    mine = m['player1_id'] == player_id
+    opponent = (m.get('player2') if mine else m.get('player1')) or {}
+    sets = []
+    for n in (1, 2, 3):
+        p1, p2 = m.get(f'set{n}_p1'), m.get(f'set{n}_p2')
+        if p1 is None or p2 is None:
+            continue
+        sets.append([p1, p2] if mine else [p2, p1])
+    games = [m.get('player1_games'), m.get('player2_games')]
+    return {
+        'id': m['id'],
+        'period_label': m.get('period_label'),
+        'match_date': m.get('match_date'),
+        'court': m.get('court'),
+        'opponent': {'id': opponent.get('id'), 'name': opponent.get('name')},
+        'sets': sets,
+        'games': games if mine else games[::-1],
+    }
+
+
+class handler(BaseHandler):
+    allowed_methods = 'GET, OPTIONS'
+
+    def do_GET(self):
+        """Profile, open assignments and match history for the signed-in player"""
+        try:
+            supabase = get_supabase_client(self._league())
+            if not supabase:
+                self._send_error(503, "Database not available")
+                return
+
+            user = get_user_from_token(supabase, self.headers.get('Authorization'))
+            if not user:
+                self._send_error(401, "Authentication required")
+                return
+
+            player = supabase.table('players')\
+                .select(f'*, {PLAYER_STATS_EMBED}')\
+                .eq('email', user.email.lower())\
+                .maybe_single()\
+                .execute()
+            if not player.data:
+                self._send_error(404, "Player profile not found")
+                return
+            player_id = player.data['id']
+            mine = f'player1_id.eq.{player_id},player2_id.eq.{player_id}'
+
+            # Open assignments from any period (outstanding ones included), newest first
+            assignments_query = supabase.table('match_assignments')\
+                .select(ASSIGNMENT_FIELDS)\
+                .or_(mine)\
+                .in_('status', ['pending', 'accepted'])\
+                .order('period_start', desc=True)
+            matches_query = supabase.table('matches')\
+                .select(MATCH_FIELDS)\
+                .or_(mine)\
+                .order('created_at', desc=True)\
+                .limit(HISTORY_LIMIT)
+            assignments, matches = gather(assignments_query.execute, matches_query.execute)
+
+            self._send_success({
+                'period': period_label(),
+                'profile': profile_payload(player.data),
+                'assignments': [assignment_payload(a, player_id) for a in assignments.data],
+                'matches': [match_payload(m, player_id) for m in matches.data],
+            })
+
+        except Exception as e:
+            self._send_error(500, str(e))
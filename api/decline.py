@@ -0,0 +1,204 @@
+"""
+Vercel Serverless Function: Decline a Pairing
+A player declines this period's match; both players are re-paired
+with whoever else is waiting.
+
+Endpoints:
+- POST {"assignment_id": ...} (requires auth)
+
+Rematch rules (match_assignments lineage columns):
+- decline_count on an assignment = declines in its lineage so far,
+  including its own; rematches carry it forward
+- is_rematch / original_assignment_id link every rematch to the
+  assignment the lineage started from
+- a lineage is re-paired at most MAX_REMATCHES times, after that its
+  players sit the period out
+
+Only waiting players are re-paired (players from declined assignments
+of the period who have no open assignment), using the same
+generate_pairings() as the monthly run on that small pool. Pairs already
+tried this period are never offered again. Anyone left over waits for
+the next decline.
+
+players.decline_count / engagement_status are maintained by a trigger on
+declined_by (migrations/011). Concurrent declines can't hand a waiting
+player two rematches: a trigger refuses a second open assignment for
+the period (migrations/022), and the losing rematch starts over.
+"""
+from datetime import datetime, timezone
+
+from api._base import BaseHandler, get_user_from_token
+from api._cache import PAIRINGS, invalidate
+from api._db import UNIQUE_VIOLATION, APIError, gather, get_supabase_client
+from api._singleflight import forget
+from api.players import lookup_player_id
+
+
+MAX_REMATCHES = 2
+REMATCH_ATTEMPTS = 2
+
+OPEN_STATUSES = ('pending', 'accepted', 'completed')
+LINEAGE_FIELDS = 'id, player1_id, player2_id, status, decline_count, is_rematch, original_assignment_id, period_label, period_start, period_type'
+
+
+def lineage_root(assignment):
+    """Id of the assignment a rematch lineage started from"""
+    return assignment.get('original_assignment_id') or assignment['id']
+
+
+def waiting_players(assignments):
+    """
+    {player_id: declined assignment} for players in this period's declined
+    assignments who can still be rematched and have no open assignment
+    """
+    busy = {
+        pid
+        for a in assignments if a['status'] in OPEN_STATUSES
+        for pid in (a['player1_id'], a['player2_id'])
+    }
+    # Each player's latest decline decides (an exhausted lineage sits out)
+    latest = {}
+    declined = [a for a in assignments if a['status'] == 'declined']
+    for a in sorted(declined, key=lambda a: a.get('decline_count') or 0):
+        for pid in (a['player1_id'], a['player2_id']):
+            if pid not in busy:
+                latest[pid] = a
+    return {pid: a for pid, a in latest.items() if (a.get('decline_count') or 0) <= MAX_REMATCHES}
+
+
+def rematch_period(supabase, assignment, attempts=REMATCH_ATTEMPTS):
+    """
+    Re-pair the waiting players of the declined assignment's period;
+    returns a summary. New rows reuse its stored period_label,
+    period_start and period_type, whatever the label's format. If a
+    concurrent rematch claimed some of the players first, the insert
+    is refused and the pass runs again on what is left.
+    """
+    from api._assignments import load_availability
+    from api.cron.monthly import save_and_notify
+    from api.pairings import generate_pairings, load_pairing_history
+
+    assignments = supabase.table('match_assignments')\
+        .select(LINEAGE_FIELDS)\
+        .eq('period_start', assignment['period_start'])\
+        .order('id')\
+        .execute_all().data
+    waiting = waiting_players(assignments)
+    if len(waiting) < 2:
+        return {'pairings_created': 0, 'emails_sent': 0, 'waiting': len(waiting)}
+
+    players_query = supabase.table('players')\
+        .select('id, name, email, skill_level, skill_rating, rank, rating, is_active, unavailable_until, available_morning, available_afternoon, available_evening')\
+        .in_('id', list(waiting))\
+        .eq('is_active', True)\
+        .eq('is_admin', False)
+    # Roster, history and the waiting players' availability load concurrently
+    players_resp, (blocked_pairs, recent), availability = gather(
+        players_query.execute,
+        lambda: load_pairing_history(supabase),
+        lambda: load_availability(supabase, waiting),
+    )
+    players = players_resp.data
+
+    # Never offer a pair that was already assigned this period
+    blocked_pairs = blocked_pairs + [
+        {'player_a': min(a['player1_id'], a['player2_id']), 'player_b': max(a['player1_id'], a['player2_id'])}
+        for a in assignments
+    ]
+
+    pairings, skipped = generate_pairings(players, blocked_pairs, recent)
+    for p in pairings:
+        origin1, origin2 = waiting[p['player1']['id']], waiting[p['player2']['id']]
+        p['assignment'] = {
+            'is_rematch': True,
+            'original_assignment_id': lineage_root(origin1),
+            'decline_count': max(origin1.get('decline_count') or 0, origin2.get('decline_count') or 0),
+        }
+
+    paired_ids = [pid for p in pairings for pid in (p['player1']['id'], p['player2']['id'])]
+    period = {'period_label': assignment['period_label'], 'period_start': assignment['period_start']}
+    try:
+        created, sent = save_and_notify(supabase, pairings, period['period_label'], availability,
+                                        period, assignment.get('period_type') or 'month')
+    except APIError as e:
+        if e.code != UNIQUE_VIOLATION:
+            raise
+        if attempts > 1:
+            return rematch_period(supabase, assignment, attempts - 1)
+        return {'pairings_created': 0, 'emails_sent': 0, 'waiting': len(waiting), 'conflict': True}
+
+    return {
+        'pairings_created': created,
+        'emails_sent': sent,
+        'waiting': len(waiting) - len(paired_ids),
+    }
+
+
+class handler(BaseHandler):
+    allowed_methods = 'POST, OPTIONS'
+
+    def do_POST(self):
+        """Decline an assignment and re-pair the players"""
+        try:
+            supabase = get_supabase_client(self._league())
+            if not supabase:
+                self._send_error(503, "Database not available")
+                return
+
+            user = get_user_from_token(supabase, self.headers.get('Authorization'))
+            if not user:
+                self._send_error(401, "Authentication required")
+                return
+
+            data = self._read_json()
+            assignment_id = data.get('assignment_id')
+            if not assignment_id:
+                self._send_error(400, "assignment_id is required")
+                return
+
+            assignment_query = supabase.table('match_assignments')\
+                .select(LINEAGE_FIELDS)\
+                .eq('id', assignment_id)\
+                .maybe_single()
+            player_id, assignment = gather(
+                lambda: lookup_player_id(supabase, user.email),
+                lambda: assignment_query.execute().data,
+            )
+            if not player_id:
+                self._send_error(404, "Player profile not found")
+                return
+            if not assignment or player_id not in (assignment['player1_id'], assignment['player2_id']):
+                self._send_error(404, "Assignment not found")
+                return
+
+            # Only open assignments can be declined (the status filter guards against double submits)
+            decline_count = (assignment.get('decline_count') or 0) + 1
+            declined = supabase.table('match_assignments')\
+                .update({
+                    'status': 'declined',
+                    'declined_by': player_id,
+                    'decline_count': decline_count,
+                    'responded_at': datetime.now(timezone.utc).isoformat()
+                })\
+                .eq('id', assignment_id)\
+                .in_('status', ['pending', 'accepted'])\
+                .execute()
+            if not declined.data:
+                self._send_error(409, f"Assignment is already {assignment['status']}")
+                return
+            forget()
+            invalidate(supabase, PAIRINGS)
+
+            if decline_count > MAX_REMATCHES:
+                rematch = {'pairings_created': 0, 'emails_sent': 0, 'exhausted': True}
+            else:
+                rematch = rematch_period(supabase, assignment)
+
+            self._send_success({
+                'assignment_id': assignment_id,
+                'decline_count': decline_count,
+                'rematch': rematch
+            })
+
+        except Exception as e:
+            self._send_error(500, str(e))
@@ -5,23 +5,14 @@ Uses Resend (free 3,000 emails/month) for sending:
 - Match reminders
 - Score confirmations
 """
-from http.server import BaseHTTPRequestHandler
-import json
 import os
 from datetime import datetime
 
-
-def get_supabase_client():
-    """Lazy initialization of Supabase client"""
-    try:
-        from supabase import create_client
-        url = os.environ.get('SUPABASE_URL')
-        key = os.environ.get('SUPABASE_ANON_KEY')
-        if url and key:
-            return create_client(url, key)
-    except Exception:
-        pass
-    return None
+from api._base import BaseHandler
+from api._db import get_supabase_client
+from api._league import for_each_league, get_league_settings
+from api.config import format_subject
+from api._periods import parse_period_label, period_label as current_period_label, period_start
 
 
 def send_email(to_email, subject, html_content, reply_to=None):
@@ -80,7 +71,8 @@ def send_email(to_email, subject, html_content, reply_to=None):
 
 
 def get_pairing_email_html(player_name, opponent_name, opponent_email, period_label,
-                           player_availability="Any time", opponent_availability="Any time"):
+                           player_availability="Any time", opponent_availability="Any time",
+                           league=None, suggested_courts=None, suggested_slot=None):
     """
     Generate HTML for pairing notification email
 
@@ -91,6 +83,11 @@ def get_pairing_email_html(player_name, opponent_name, opponent_email, period_la
         period_label: e.g., "January 2025"
         player_availability: Recipient's time preferences
         opponent_availability: Opponent's time preferences
+        league: Optional league settings (api/_league.py) overriding config branding
+        suggested_courts: Optional courts ranked for this pair (api/_courts.py),
+            shown instead of the approved courts list
+        suggested_slot: Optional suggested time and place (api/_scheduling.py),
+            e.g. "Sunday evening at Vermont Canyon"
     """
     # Import config for branding
     try:
@@ -109,6 +106,16 @@ def get_pairing_email_html(player_name, opponent_name, opponent_email, period_la
         COURTS_DISPLAY = "Vermont Canyon • Griffith Park • Echo Park • Hermon Park • Eagle Rock • Cheviot Hills • Poinsettia Park"
         site_url = os.environ.get('SITE_URL', 'https://networthtennis.com')
 
+    if league:
+        LEAGUE_NAME = league.get('league_name', LEAGUE_NAME)
+        LEAGUE_TAGLINE = league.get('tagline', LEAGUE_TAGLINE)
+        COURTS_DISPLAY = " • ".join(league.get('approved_courts', [])[:7]) or COURTS_DISPLAY
+
+    courts_title = "Approved Courts"
+    if suggested_courts:
+        courts_title = "Suggested Courts"
+        COURTS_DISPLAY = " • ".join(suggested_courts)
+
     return f"""
     <!DOCTYPE html>
     <html>
@@ -150,6 +157,7 @@ def get_pairing_email_html(player_name, opponent_name, opponent_email, period_la
                     <div class="availability-title">Availability</div>
                     <div class="availability-row"><span class="availability-name">{opponent_name}:</span> {opponent_availability}</div>
                     <div class="availability-row"><span class="availability-name">You:</span> {player_availability}</div>
+                    {f'<div class="availability-row"><span class="availability-name">Suggested:</span> {suggested_slot}</div>' if suggested_slot else ''}
                 </div>
 
                 <p style="margin-top: 20px; color: {COLORS['text_secondary']}; line-height: 1.6;">
@@ -163,7 +171,7 @@ def get_pairing_email_html(player_name, opponent_name, opponent_email, period_la
                 <a href="{site_url}/dashboard" class="btn">Report Score →</a>
 
                 <div class="courts">
-                    <div class="courts-title">Approved Courts</div>
+                    <div class="courts-title">{courts_title}</div>
                     <div class="court-list">
                         {COURTS_DISPLAY}
                     </div>
@@ -450,31 +458,22 @@ def get_last_chance_email_html(player_name, opponent_name, opponent_email, perio
     """
 
 
-class handler(BaseHTTPRequestHandler):
-    def do_OPTIONS(self):
-        self.send_response(200)
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type, Authorization')
-        self.end_headers()
-
+class handler(BaseHandler):
     def do_POST(self):
         """Send emails based on action type"""
         try:
-            content_length = int(self.headers.get('Content-Length', 0))
-            body = self.rfile.read(content_length).decode('utf-8')
-            data = json.loads(body) if body else {}
+            data = self._read_json()
 
             action = data.get('action')
 
             if action == 'send_pairings':
                 # Send pairing emails for current month
-                result = self._send_pairing_emails(data.get('period_label'))
+                result = self._run_job(lambda db: self._send_pairing_emails(db, data.get('period_label')))
                 self._send_success(result)
 
             elif action == 'send_reminders':
                 # Send reminder emails for unpaid matches
-                result = self._send_reminder_emails(data.get('period_label'))
+                result = self._run_job(lambda db: self._send_reminder_emails(db, data.get('period_label')))
                 self._send_success(result)
 
             elif action == 'send_welcome':
@@ -495,12 +494,12 @@ class handler(BaseHTTPRequestHandler):
 
             elif action == 'send_last_chance':
                 # Send last chance reminders (for end of month)
-                result = self._send_last_chance_emails(data.get('period_label'))
+                result = self._run_job(lambda db: self._send_last_chance_emails(db, data.get('period_label')))
                 self._send_success(result)
 
             elif action == 'send_outstanding_reminders':
                 # Send reminders for matches from previous months that weren't completed
-                result = self._send_outstanding_match_emails()
+                result = self._run_job(self._send_outstanding_match_emails)
                 self._send_success(result)
 
             elif action == 'send_single':
@@ -521,22 +520,32 @@ class handler(BaseHTTPRequestHandler):
         except Exception as e:
             self._send_error(500, str(e))
 
-    def _send_pairing_emails(self, period_label=None):
-        """Send pairing notification to all players with assignments"""
-        if not period_label:
-            period_label = datetime.now().strftime('%B %Y')
-
-        supabase = get_supabase_client()
+    def _run_job(self, job):
+        """
+        Run a batch email job for the requested league, or - when the
+        request names no league (cron) - for every league in parallel.
+        """
+        league = self._league()
+        supabase = get_supabase_client(league)
         if not supabase:
             return {'sent': 0, 'error': 'Database not configured'}
+        if league:
+            return job(supabase)
+        return {'leagues': for_each_league(supabase, job)}
+
+    def _send_pairing_emails(self, supabase, period_label=None):
+        """Send pairing notification to all players with assignments"""
+        if not period_label:
+            period_label = current_period_label()
 
         # Get all pending assignments for this period (with availability fields)
         assignments = supabase.table('match_assignments')\
             .select('*, player1:players!player1_id(id, name, email, available_morning, available_afternoon, available_evening), player2:players!player2_id(id, name, email, available_morning, available_afternoon, available_evening)')\
-            .eq('period_label', period_label)\
+            .eq('period_start', parse_period_label(period_label).isoformat())\
             .eq('status', 'pending')\
             .execute()
 
+        league = get_league_settings(supabase)
         sent_count = 0
         errors = []
 
@@ -552,7 +561,8 @@ class handler(BaseHTTPRequestHandler):
             html1 = get_pairing_email_html(
                 p1['name'], p2['name'], p2['email'], period_label,
                 player_availability=p1_avail,
-                opponent_availability=p2_avail
+                opponent_availability=p2_avail,
+                league=league
             )
             result1 = send_email(
                 p1['email'],
@@ -569,7 +579,8 @@ class handler(BaseHTTPRequestHandler):
             html2 = get_pairing_email_html(
                 p2['name'], p1['name'], p1['email'], period_label,
                 player_availability=p2_avail,
-                opponent_availability=p1_avail
+                opponent_availability=p1_avail,
+                league=league
             )
             result2 = send_email(
                 p2['email'],
@@ -608,19 +619,15 @@ class handler(BaseHTTPRequestHandler):
             times.append("Evenings")
         return ", ".join(times)
 
-    def _send_reminder_emails(self, period_label=None):
+    def _send_reminder_emails(self, supabase, period_label=None):
         """Send reminders for matches not yet completed"""
         if not period_label:
-            period_label = datetime.now().strftime('%B %Y')
-
-        supabase = get_supabase_client()
-        if not supabase:
-            return {'sent': 0, 'error': 'Database not configured'}
+            period_label = current_period_label()
 
         # Get pending assignments (not completed)
         assignments = supabase.table('match_assignments')\
             .select('*, player1:players!player1_id(*), player2:players!player2_id(*)')\
-            .eq('period_label', period_label)\
+            .eq('period_start', parse_period_label(period_label).isoformat())\
             .in_('status', ['pending', 'accepted'])\
             .execute()
 
@@ -668,7 +675,9 @@ class handler(BaseHTTPRequestHandler):
             return {'sent': 0, 'error': 'Missing player_email or player_name'}
 
         html = get_welcome_email_html(player_name)
-        result = send_email(player_email, 'Welcome to NET WORTH Tennis!', html)
+        supabase = get_supabase_client(self._league())
+        league = get_league_settings(supabase) if supabase else None
+        result = send_email(player_email, format_subject('welcome', league), html)
 
         return {
             'sent': 1 if result.get('success') else 0,
@@ -679,9 +688,9 @@ class handler(BaseHTTPRequestHandler):
     def _send_score_confirmations(self, match_id, period_label=None):
         """Send score confirmation emails to both players after match reported"""
         if not period_label:
-            period_label = datetime.now().strftime('%B %Y')
+            period_label = current_period_label()
 
-        supabase = get_supabase_client()
+        supabase = get_supabase_client(self._league())
         if not supabase:
             return {'sent': 0, 'error': 'Database not configured'}
 
@@ -735,23 +744,17 @@ class handler(BaseHTTPRequestHandler):
             'errors': errors if errors else None
         }
 
-    def _send_outstanding_match_emails(self):
+    def _send_outstanding_match_emails(self, supabase):
         """Send reminders for matches from previous months that weren't completed.
 
         This finds all assignments from past periods (not current month) that are
         still pending/accepted and haven't been completed yet.
         """
-        supabase = get_supabase_client()
-        if not supabase:
-            return {'sent': 0, 'error': 'Database not configured'}
-
-        current_period = datetime.now().strftime('%B %Y')
-
-        # Get all pending/accepted assignments from PREVIOUS periods (not current month)
+        # Get all pending/accepted assignments from PREVIOUS periods (before this month)
         assignments = supabase.table('match_assignments')\
             .select('*, player1:players!player1_id(*), player2:players!player2_id(*)')\
             .in_('status', ['pending', 'accepted'])\
-            .neq('period_label', current_period)\
+            .lt('period_start', period_start().isoformat())\
             .execute()
 
         sent_count = 0
@@ -789,19 +792,15 @@ class handler(BaseHTTPRequestHandler):
             'errors': errors if errors else None
         }
 
-    def _send_last_chance_emails(self, period_label=None):
+    def _send_last_chance_emails(self, supabase, period_label=None):
         """Send last chance reminders for matches not yet completed (end of month)"""
         if not period_label:
-            period_label = datetime.now().strftime('%B %Y')
-
-        supabase = get_supabase_client()
-        if not supabase:
-            return {'sent': 0, 'error': 'Database not configured'}
+            period_label = current_period_label()
 
         # Get pending assignments (not completed)
         assignments = supabase.table('match_assignments')\
             .select('*, player1:players!player1_id(*), player2:players!player2_id(*)')\
-            .eq('period_label', period_label)\
+            .eq('period_start', parse_period_label(period_label).isoformat())\
             .in_('status', ['pending', 'accepted'])\
             .execute()
 
@@ -835,17 +834,3 @@ class handler(BaseHTTPRequestHandler):
             'pending_matches': len(assignments.data),
             'errors': errors if errors else None
         }
-
-    def _send_success(self, data):
-        self.send_response(200)
-        self.send_header('Content-Type', 'application/json')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.end_headers()
-        self.wfile.write(json.dumps({"success": True, **data}).encode())
-
-    def _send_error(self, status, message):
-        self.send_response(status)
-        self.send_header('Content-Type', 'application/json')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.end_headers()
-        self.wfile.write(json.dumps({"success": False, "error": message}).encode())
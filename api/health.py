@@ -2,26 +2,14 @@
 Vercel Serverless Function: Health Check
 Simple health endpoint for monitoring
 """
-from http.server import BaseHTTPRequestHandler
-import json
 import os
 from datetime import datetime, timezone
 
+from api._base import BaseHandler
+from api._db import get_supabase_client
 
-def get_supabase_client():
-    """Lazy initialization of Supabase client"""
-    try:
-        from supabase import create_client
-        url = os.environ.get('SUPABASE_URL')
-        key = os.environ.get('SUPABASE_ANON_KEY')
-        if url and key:
-            return create_client(url, key)
-    except Exception:
-        pass
-    return None
 
-
-class handler(BaseHTTPRequestHandler):
+class handler(BaseHandler):
     def do_GET(self):
         db_status = "not_configured"
         supabase_available = False
@@ -38,11 +26,7 @@ class handler(BaseHTTPRequestHandler):
         except Exception:
             db_status = "init_error"
 
-        self.send_response(200)
-        self.send_header('Content-Type', 'application/json')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.end_headers()
-        self.wfile.write(json.dumps({
+        self._send_json(200, {
             "status": "healthy",
             "service": "networth-tennis",
             "version": "2.0.0",
@@ -53,4 +37,4 @@ class handler(BaseHTTPRequestHandler):
                 "status": db_status
             },
             "environment": os.environ.get('VERCEL_ENV', 'development')
-        }).encode())
+        })
@@ -3,22 +3,10 @@ Vercel Serverless Function: Join Request API
 Handles new player requests to join the ladder.
 Sends notification email to league administrators.
 """
-from http.server import BaseHTTPRequestHandler
-import json
 import os
 
-
-def get_supabase_client():
-    """Lazy initialization of Supabase client"""
-    try:
-        from supabase import create_client
-        url = os.environ.get('SUPABASE_URL')
-        key = os.environ.get('SUPABASE_ANON_KEY')
-        if url and key:
-            return create_client(url, key)
-    except Exception:
-        pass
-    return None
+from api._base import BaseHandler
+from api._db import get_supabase_client
 
 
 def send_admin_notification(name, email, skill_level):
@@ -95,19 +83,12 @@ def send_admin_notification(name, email, skill_level):
         return {'success': False, 'error': str(e)}
 
 
-class handler(BaseHTTPRequestHandler):
-    def do_OPTIONS(self):
-        self.send_response(200)
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
-        self.end_headers()
+class handler(BaseHandler):
+    allowed_headers = 'Content-Type, X-League'
 
     def do_POST(self):
         try:
-            content_length = int(self.headers.get('Content-Length', 0))
-            body = self.rfile.read(content_length).decode('utf-8')
-            data = json.loads(body) if body else {}
+            data = self._read_json()
 
             name = data.get('name', '').strip()
             email = data.get('email', '').strip().lower()
@@ -123,7 +104,7 @@ class handler(BaseHTTPRequestHandler):
                 return
 
             # Check if already exists
-            supabase = get_supabase_client()
+            supabase = get_supabase_client(self._league())
             if supabase:
                 try:
                     existing = supabase.table('players').select('id').eq('email', email).execute()
@@ -154,17 +135,3 @@ class handler(BaseHTTPRequestHandler):
 
         except Exception as e:
             self._send_error(500, str(e))
-
-    def _send_success(self, data):
-        self.send_response(200)
-        self.send_header('Content-Type', 'application/json')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.end_headers()
-        self.wfile.write(json.dumps({"success": True, **data}).encode())
-
-    def _send_error(self, status, message):
-        self.send_response(status)
-        self.send_header('Content-Type', 'application/json')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.end_headers()
-        self.wfile.write(json.dumps({"success": False, "error": message}).encode())
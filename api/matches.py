@@ -6,87 +6,45 @@ Match reporting flow:
 1. Player enters set scores (e.g., 6-4, 3-6, 6-2)
 2. Player answers "Would you play again?" (for silent blocking)
 3. System calculates games won for each player
-4. Updates player total_games for ranking
+4. Database triggers add the games to total_games (002), re-rank, and
+   move both Elo ratings (018) in the insert's own transaction
+
+GET serves the last good list (api/_lkg.py) when Supabase is down.
 """
-from http.server import BaseHTTPRequestHandler
-import json
-import os
-from datetime import datetime, timezone
-
-
-def get_supabase_client():
-    """Lazy initialization of Supabase client"""
-    try:
-        from supabase import create_client
-        url = os.environ.get('SUPABASE_URL')
-        key = os.environ.get('SUPABASE_ANON_KEY')
-        if url and key:
-            return create_client(url, key)
-    except Exception:
-        pass
-    return None
-
-
-# Sample matches using new schema (set scores, games won per player)
-SAMPLE_MATCHES = [
-    {"id": 1, "player1": {"name": "Kim Ndombe"}, "player2": {"name": "Natalie Coffen"},
-     "set1_p1": 6, "set1_p2": 4, "set2_p1": 6, "set2_p2": 3,
-     "player1_games": 12, "player2_games": 7, "period_label": "January 2025", "court": "Vermont Canyon"},
-    {"id": 2, "player1": {"name": "Sara Chrisman"}, "player2": {"name": "Arianna Hairston"},
-     "set1_p1": 7, "set1_p2": 5, "set2_p1": 6, "set2_p2": 4,
-     "player1_games": 13, "player2_games": 9, "period_label": "January 2025", "court": "Griffith Park"},
-    {"id": 3, "player1": {"name": "Kim Ndombe"}, "player2": {"name": "Hannah Shin"},
-     "set1_p1": 6, "set1_p2": 2, "set2_p1": 6, "set2_p2": 4,
-     "player1_games": 12, "player2_games": 6, "period_label": "December 2024", "court": "Echo Park"},
-    {"id": 4, "player1": {"name": "Natalie Coffen"}, "player2": {"name": "Alik Apelian"},
-     "set1_p1": 6, "set1_p2": 3, "set2_p1": 6, "set2_p2": 2,
-     "player1_games": 12, "player2_games": 5, "period_label": "December 2024", "court": "Silver Lake"},
-    {"id": 5, "player1": {"name": "Hannah Shin"}, "player2": {"name": "Hanna Pavlova"},
-     "set1_p1": 6, "set1_p2": 4, "set2_p1": 7, "set2_p2": 5,
-     "player1_games": 13, "player2_games": 9, "period_label": "December 2024", "court": "Los Feliz"},
-]
-
-
-class handler(BaseHTTPRequestHandler):
-    def do_OPTIONS(self):
-        self.send_response(200)
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type, Authorization')
-        self.end_headers()
+from api._base import BaseHandler
+from api._cache import LADDER, PAIRINGS, STANDINGS, invalidate
+from api._db import get_supabase_client
+from api._lkg import age_headers, last_known_good, mark_stale
+from api._periods import period_fields
+from api._singleflight import forget, shared_execute
+
+
+RECENT_MATCHES = 20
 
+
+class handler(BaseHandler):
     def do_GET(self):
         try:
-            supabase = get_supabase_client()
-            if supabase:
-                response = supabase.table('matches').select('*, player1:players!player1_id(*), player2:players!player2_id(*)').order('created_at', desc=True).limit(20).execute()
-                matches = response.data
-                source = "supabase"
-            else:
-                matches = SAMPLE_MATCHES
-                source = "sample"
-
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            self.wfile.write(json.dumps({
-                "success": True,
+            supabase = get_supabase_client(self._league())
+
+            def load():
+                if not supabase:
+                    raise RuntimeError("Database not configured")
+                query = supabase.table('matches').select('*, player1:players!player1_id(*), player2:players!player2_id(*)').order('created_at', desc=True).limit(RECENT_MATCHES)
+                # Concurrent identical reads in this instance share one query
+                return shared_execute(query).data
+
+            # Database down or slow: the last good list, marked with its age
+            matches, age = last_known_good(f"matches:{self._league() or ''}", load)
+
+            self._send_success({
                 "matches": matches,
-                "source": source
-            }).encode())
+                "source": "supabase" if age is None else "snapshot",
+                "age_seconds": age or 0
+            }, headers=age_headers(age))
 
         except Exception as e:
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            self.wfile.write(json.dumps({
-                "success": True,
-                "matches": SAMPLE_MATCHES,
-                "source": "sample_fallback",
-                "error": str(e)
-            }).encode())
+            self._send_error(503, str(e))
 
     def do_POST(self):
         """
@@ -105,11 +63,9 @@ class handler(BaseHTTPRequestHandler):
         }
         """
         try:
-            content_length = int(self.headers.get('Content-Length', 0))
-            body = self.rfile.read(content_length).decode('utf-8')
-            data = json.loads(body) if body else {}
+            data = self._read_json()
 
-            supabase = get_supabase_client()
+            supabase = get_supabase_client(self._league())
             if not supabase:
                 self._send_demo_response(data)
                 return
@@ -125,6 +81,12 @@ class handler(BaseHTTPRequestHandler):
             player1_games = set1_p1 + set2_p1 + set3_p1
             player2_games = set1_p2 + set2_p2 + set3_p2
 
+            try:
+                period = period_fields(data.get('period_label'))
+            except ValueError:
+                # Week/quarter labels: the DB trigger derives period_start
+                period = {'period_label': data['period_label']}
+
             match_data = {
                 "player1_id": data['player1_id'],
                 "player2_id": data['player2_id'],
@@ -137,7 +99,7 @@ class handler(BaseHTTPRequestHandler):
                 "player1_games": player1_games,
                 "player2_games": player2_games,
                 "period_type": data.get('period_type', 'month'),
-                "period_label": data.get('period_label', datetime.now().strftime('%B %Y')),
+                **period,
                 "court": data.get('court'),
                 "match_date": data.get('match_date'),
                 "is_forfeit": data.get('is_forfeit', False)
@@ -165,54 +127,25 @@ class handler(BaseHTTPRequestHandler):
                 }
                 supabase.table('match_feedback').insert(feedback_data).execute()
 
-            # Update player total_games
-            # Get current values first
-            p1 = supabase.table('players').select('total_games, matches_played').eq('id', data['player1_id']).single().execute()
-            p2 = supabase.table('players').select('total_games, matches_played').eq('id', data['player2_id']).single().execute()
-
-            if p1.data:
-                supabase.table('players').update({
-                    'total_games': (p1.data.get('total_games') or 0) + player1_games,
-                    'matches_played': (p1.data.get('matches_played') or 0) + 1
-                }).eq('id', data['player1_id']).execute()
-
-            if p2.data:
-                supabase.table('players').update({
-                    'total_games': (p2.data.get('total_games') or 0) + player2_games,
-                    'matches_played': (p2.data.get('matches_played') or 0) + 1
-                }).eq('id', data['player2_id']).execute()
-
-            self.send_response(201)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            self.wfile.write(json.dumps({
-                "success": True,
+            # Rankings changed - drop cached reads (the static snapshot follows the change feed)
+            forget()
+            invalidate(supabase, LADDER, STANDINGS, PAIRINGS)
+            mark_stale(f"players:{self._league() or ''}", f"matches:{self._league() or ''}")
+
+            self._send_success({
                 "match": match,
                 "games_added": {
                     "player1": player1_games,
                     "player2": player2_games
                 }
-            }).encode())
+            }, status=201)
 
         except Exception as e:
-            self.send_response(500)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            self.wfile.write(json.dumps({
-                "success": False,
-                "error": str(e)
-            }).encode())
+            self._send_error(500, str(e))
 
     def _send_demo_response(self, data):
         """Send response when database not available (demo mode)"""
-        self.send_response(200)
-        self.send_header('Content-Type', 'application/json')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.end_headers()
-        self.wfile.write(json.dumps({
-            "success": True,
+        self._send_success({
             "message": "Match recorded (demo mode)",
             "match": data
-        }).encode())
+        })
@@ -5,46 +5,70 @@ Generates monthly match pairings based on:
 2. Blocked pairs exclusion (would_play_again=false)
 3. Variety (prefer players who haven't played each other recently)
 4. Respects unavailable_until for players taking a break
+5. Elo rating closeness (api/_ratings.py) as a tie-breaker within a level
 
 SIMPLIFIED: No court constraints, no availability matching.
 Email will include each player's time preferences for them to coordinate.
 """
-from http.server import BaseHTTPRequestHandler
-import json
-import os
+from bisect import bisect_left
 from datetime import datetime, date
 import random
 
-
-def get_supabase_client():
-    """Lazy initialization of Supabase client"""
-    try:
-        from supabase import create_client
-        url = os.environ.get('SUPABASE_URL')
-        key = os.environ.get('SUPABASE_ANON_KEY')
-        if url and key:
-            return create_client(url, key)
-    except Exception:
-        pass
-    return None
+from api._assignments import build_assignments
+from api._base import BaseHandler
+from api._cache import PAIRINGS, PAIRINGS_TTL_SECONDS, cached, invalidate
+from api._changes import sync_cache
+from api.config import SKILL_RATINGS
+from api._db import UNIQUE_VIOLATION, APIError, gather, get_supabase_client
+from api._pairing_runs import ENGINE_VERSION, find_run, history_marker, input_hash, save_run, serialize_result
+from api._periods import period_fields
+from api._ratings import INITIAL_RATING
+from api._singleflight import forget, shared_execute
 
 
 def skill_to_numeric(skill_level):
-    """Convert skill level string to numeric for comparison"""
+    """
+    Parse a skill level string to its SKILL_RATINGS value. Writes keep
+    players.skill_rating in sync with this (migrations/012), so loops use
+    player_skill() instead.
+    """
     if not skill_level:
         return 3.0
-    if '4.5' in skill_level:
-        return 4.5
-    elif '4.0' in skill_level:
-        return 4.0
-    elif '3.5+' in skill_level:
-        return 3.75
-    elif '3.5' in skill_level:
-        return 3.5
-    elif '3.0' in skill_level:
-        return 3.0
-    else:
-        return 2.5
+    # SKILL_RATINGS lists '3.5+' before '3.5'
+    for code, rating in SKILL_RATINGS.items():
+        if code in skill_level:
+            return rating
+    return 2.5
+
+
+def player_skill(player):
+    """Numeric skill: the stored skill_rating, parsed from skill_level only if it's missing"""
+    skill = player.get('skill_rating')
+    if skill is not None:
+        return float(skill)
+    return skill_to_numeric(player.get('skill_level', '3.0'))
+
+
+# Opponents per player returned by the pairing_candidate_lists() RPC
+PAIRING_CANDIDATES_K = 10
+# Players per pairing_candidate_lists() call (below PostgREST's max rows)
+CANDIDATE_PAGE_SIZE = 500
+# Matches counted for the variety bonus
+RECENT_MATCH_LIMIT = 200
+
+# Rating gap (Elo points) that costs one score point; capped at
+# RATING_MAX_PENALTY so ratings refine, never override, skill levels
+RATING_POINTS_PER_SCORE = 20
+RATING_MAX_PENALTY = 10
+
+
+# Skill tiers used to shard the monthly run (api/cron/monthly.py).
+# Each tier covers a range of skill_rating values, inclusive.
+SKILL_TIERS = {
+    'advanced': (4.0, 4.5),
+    'intermediate': (3.5, 3.75),
+    'beginner': (0.0, 3.0),
+}
 
 
 def get_availability_text(player):
@@ -90,15 +114,124 @@ def is_player_available(player):
     return True
 
 
-def generate_pairings(players, blocked_pairs, recent_matches):
+def pair_score(player1, player2, recent_count):
+    """
+    Match score for a pair - higher is better.
+    Mirrored by pairing_candidates() in migrations/009; keep them in step.
+    """
+    # Calculate match score - SKILL IS PRIMARY
+    score = 0
+
+    # Skill similarity (max 50 points, lose points for difference)
+    skill_diff = abs(player_skill(player1) - player_skill(player2))
+    score += 50 - (skill_diff * 25)  # Increased weight on skill
+
+    # Rating closeness (small, so skill level stays primary)
+    rating_gap = abs(
+        float(player1.get('rating') or INITIAL_RATING) -
+        float(player2.get('rating') or INITIAL_RATING)
+    )
+    score -= min(RATING_MAX_PENALTY, rating_gap / RATING_POINTS_PER_SCORE)
+
+    # Variety bonus (haven't played recently)
+    pair_key = tuple(sorted([player1['id'], player2['id']]))
+    times_played = recent_count.get(pair_key, 0)
+    if times_played == 0:
+        score += 15  # Never played = bonus
+    else:
+        score -= times_played * 5  # Played recently = penalty
+
+    return score
+
+
+def score_bound(skill_diff, rating_gap):
+    """
+    Highest pair_score() any pair with this skill difference and rating
+    gap can reach (never played recently). Same arithmetic as
+    pair_score(), so the bound is exact, not approximate.
+    """
+    score = 0
+    score += 50 - (skill_diff * 25)
+    score -= min(RATING_MAX_PENALTY, rating_gap / RATING_POINTS_PER_SCORE)
+    score += 15
+    return score
+
+
+class SkillBuckets:
+    """
+    Unpaired players grouped by player_skill(), each group sorted by
+    rating, so the best opponent can be searched nearest-first.
+    Entries are (rating, position) where position is the player's index
+    in the skill-sorted list.
+    """
+
+    def __init__(self, skills, ratings):
+        self.skills = skills
+        self.ratings = ratings
+        self.buckets = {}
+        for position, skill in enumerate(skills):
+            self.buckets.setdefault(skill, []).append((ratings[position], position))
+        for entries in self.buckets.values():
+            entries.sort()
+
+    def remove(self, position):
+        entries = self.buckets[self.skills[position]]
+        entries.pop(bisect_left(entries, (self.ratings[position], position)))
+
+    def nearest(self, position):
+        """
+        Yield (skill_diff, neighbours) per bucket, closest skill first;
+        neighbours yields (rating_gap, candidate_position), closest rating
+        first. Callers stop early using score_bound().
+        """
+        skill, rating = self.skills[position], self.ratings[position]
+        for bucket in sorted(self.buckets, key=lambda b: abs(skill - b)):
+            yield abs(skill - bucket), self._by_rating(self.buckets[bucket], rating, position)
+
+    @staticmethod
+    def _by_rating(entries, rating, position):
+        right = bisect_left(entries, (rating, position))
+        left = right - 1
+        while left >= 0 or right < len(entries):
+            left_gap = abs(rating - entries[left][0]) if left >= 0 else None
+            right_gap = abs(rating - entries[right][0]) if right < len(entries) else None
+            if right_gap is None or (left_gap is not None and left_gap <= right_gap):
+                yield left_gap, entries[left][1]
+                left -= 1
+            else:
+                yield right_gap, entries[right][1]
+                right += 1
+
+
+def generate_pairings(players, blocked_pairs, recent_matches, candidates=None, seed=None):
     """
     Generate optimal pairings for all active players.
     SIMPLIFIED: Skill-based matching only. No court/time constraints.
 
+    Greedy, highest skill first: each player takes the best-scoring
+    unpaired opponent (ties go to the earlier player in skill order).
+    Opponents are searched nearest skill bucket / rating first and the
+    search stops as soon as score_bound() says nobody further away can
+    beat the best found, so it's near-linear - a stranded player (all
+    neighbours blocked) simply searches wider. Results are identical to
+    scoring every remaining player.
+
+    candidates: optional {player_id: {candidate_id: score}} from
+    fetch_pairing_candidates(). When given, only those pairs are
+    considered and blocked_pairs/recent_matches can be empty.
+
+    seed: players are shuffled with random.Random(seed) before the
+    (stable) skill sort, so equal scores are broken the same way on every
+    run whatever order the roster arrived in. Without a seed, roster
+    order breaks ties.
+
     Returns list of pairing dicts with player info and availability text.
     """
     # Filter to only available players
     available_players = [p for p in players if is_player_available(p)]
+    if seed is not None:
+        available_players.sort(key=lambda p: p['id'])
+        random.Random(seed).shuffle(available_players)
 
     # Convert blocked pairs to a set for O(1) lookup
     blocked_set = set()
@@ -113,52 +246,58 @@ def generate_pairings(players, blocked_pairs, recent_matches):
         recent_count[key] = recent_count.get(key, 0) + 1
 
     # Sort players by skill level for better matching
-    sorted_players = sorted(
-        available_players,
-        key=lambda p: skill_to_numeric(p.get('skill_level', '3.0')),
-        reverse=True
-    )
+    sorted_players = sorted(available_players, key=player_skill, reverse=True)
+
+    skills = [player_skill(p) for p in sorted_players]
+    ratings = [float(p.get('rating') or INITIAL_RATING) for p in sorted_players]
+    buckets = SkillBuckets(skills, ratings)
+    position_of = {p['id']: i for i, p in enumerate(sorted_players)}
+    paired = [False] * len(sorted_players)
+    remaining = len(sorted_players)
 
     pairings = []
-    unpaired = list(sorted_players)
     skipped = []  # Players who couldn't be matched (all options blocked)
 
-    while len(unpaired) >= 2:
-        player1 = unpaired.pop(0)
+    for i, player1 in enumerate(sorted_players):
+        if paired[i]:
+            continue
+        if remaining < 2:
+            # If odd number of players, last one gets skipped
+            skipped.append(player1)
+            break
+        paired[i] = True
+        remaining -= 1
+        buckets.remove(i)
 
         # Find best match for player1
-        best_match = None
+        best = None
         best_score = -999
 
-        for i, player2 in enumerate(unpaired):
-            # Check if blocked
-            if (player1['id'], player2['id']) in blocked_set:
-                continue
-
-            # Calculate match score - SKILL IS PRIMARY
-            score = 0
-
-            # Skill similarity (max 50 points, lose points for difference)
-            skill_diff = abs(
-                skill_to_numeric(player1.get('skill_level', '3.0')) -
-                skill_to_numeric(player2.get('skill_level', '3.0'))
-            )
-            score += 50 - (skill_diff * 25)  # Increased weight on skill
-
-            # Variety bonus (haven't played recently)
-            pair_key = tuple(sorted([player1['id'], player2['id']]))
-            times_played = recent_count.get(pair_key, 0)
-            if times_played == 0:
-                score += 15  # Never played = bonus
-            else:
-                score -= times_played * 5  # Played recently = penalty
-
-            if score > best_score:
-                best_score = score
-                best_match = (i, player2)
-
-        if best_match:
-            idx, player2 = best_match
+        if candidates is not None:
+            # Scored in the database; blocked pairs are never candidates
+            for candidate_id, score in candidates.get(player1['id'], {}).items():
+                j = position_of.get(candidate_id)
+                if j is None or paired[j]:
+                    continue
+                if score > best_score or (best is not None and score == best_score and j < best):
+                    best, best_score = j, score
+        else:
+            for skill_diff, neighbours in buckets.nearest(i):
+                if score_bound(skill_diff, 0) < best_score:
+                    break  # every further bucket is even further away
+                for rating_gap, j in neighbours:
+                    if score_bound(skill_diff, rating_gap) < best_score:
+                        break  # the rest of this bucket is further away in rating
+                    player2 = sorted_players[j]
+                    # Check if blocked
+                    if (player1['id'], player2['id']) in blocked_set:
+                        continue
+                    score = pair_score(player1, player2, recent_count)
+                    if score > best_score or (best is not None and score == best_score and j < best):
+                        best, best_score = j, score
+
+        if best is not None:
+            player2 = sorted_players[best]
             pairings.append({
                 'player1': player1,
                 'player2': player2,
@@ -166,42 +305,249 @@ def generate_pairings(players, blocked_pairs, recent_matches):
                 'player2_availability': get_availability_text(player2),
                 'score': best_score
             })
-            unpaired.pop(idx)
+            paired[best] = True
+            remaining -= 1
+            buckets.remove(best)
         else:
             # No valid match found (all blocked), add to skipped list
             skipped.append(player1)
 
-    # If odd number of players, last one gets skipped
-    if unpaired:
-        skipped.extend(unpaired)
-
     return pairings, skipped
 
 
-class handler(BaseHTTPRequestHandler):
-    def do_OPTIONS(self):
-        self.send_response(200)
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type, Authorization')
-        self.end_headers()
+def load_pairing_history(supabase):
+    """(blocked_pairs, recent_matches) for generate_pairings"""
+    # Blocked pairs (from "would not play again" feedback)
+    blocked_query = supabase.table('match_feedback')\
+        .select('from_player_id, about_player_id')\
+        .eq('would_play_again', False)
+    # Recent matches for variety
+    recent_query = supabase.table('matches')\
+        .select('player1_id, player2_id')\
+        .order('created_at', desc=True)\
+        .limit(RECENT_MATCH_LIMIT)
+    blocked_resp, recent_resp = gather(blocked_query.execute, recent_query.execute)
 
+    blocked_pairs = []
+    for b in blocked_resp.data:
+        blocked_pairs.append({
+            'player_a': min(b['from_player_id'], b['about_player_id']),
+            'player_b': max(b['from_player_id'], b['about_player_id'])
+        })
+
+    return blocked_pairs, recent_resp.data
+
+
+def fetch_pairing_candidates(supabase, k=PAIRING_CANDIDATES_K):
+    """
+    Top-k scored opponents per player from the pairing_candidate_lists()
+    RPC (migrations/021), as a symmetric {player_id: {candidate_id: score}}.
+    One row per player crosses the wire instead of the block list and
+    match history. Pages are keyset slices of CANDIDATE_PAGE_SIZE players,
+    so each call scores only its own slice.
+    """
+    candidates = {}
+    after = None
+    while True:
+        rows = supabase.rpc('pairing_candidate_lists', {
+            'k': k, 'recent_limit': RECENT_MATCH_LIMIT,
+            'after_player_id': after, 'page_size': CANDIDATE_PAGE_SIZE,
+        }).execute().data
+        for r in rows:
+            for candidate_id, score in r['candidates'].items():
+                score = float(score)
+                candidates.setdefault(r['player_id'], {})[candidate_id] = score
+                candidates.setdefault(candidate_id, {})[r['player_id']] = score
+        if len(rows) < CANDIDATE_PAGE_SIZE:
+            return candidates
+        after = rows[-1]['player_id']
+
+
+def pairing_params():
+    """Engine parameters a stored run was computed with (part of its input hash)"""
+    return {
+        'engine': ENGINE_VERSION,
+        'candidates_k': PAIRING_CANDIDATES_K,
+        'recent_match_limit': RECENT_MATCH_LIMIT,
+        'rating_points_per_score': RATING_POINTS_PER_SCORE,
+        'rating_max_penalty': RATING_MAX_PENALTY,
+    }
+
+
+def hydrate_run(result, players):
+    """
+    generate_pairings()-style (pairings, skipped) from a stored run, or
+    None if it names a player who isn't in players.
+    """
+    by_id = {p['id']: p for p in players}
+    if any(pid not in by_id for pair in result['pairs'] for pid in pair[:2]) or \
+            any(pid not in by_id for pid in result['skipped']):
+        return None
+    pairings = []
+    for player1_id, player2_id, score in result['pairs']:
+        player1, player2 = by_id[player1_id], by_id[player2_id]
+        pairings.append({
+            'player1': player1,
+            'player2': player2,
+            'player1_availability': get_availability_text(player1),
+            'player2_availability': get_availability_text(player2),
+            'score': score
+        })
+    return pairings, [by_id[pid] for pid in result['skipped']]
+
+
+def run_pairings(supabase, players, blocked_pairs=None, recent_matches=None, seed=None, period_start=None,
+                 history=None):
+    """
+    generate_pairings() memoized in pairing_runs (api/_pairing_runs.py).
+
+    With blocked_pairs/recent_matches the run is keyed on them exactly.
+    Without, pairs are scored in the database (pairing_candidate_lists(),
+    falling back to the full history) and the run is keyed on
+    history_marker() - a hit then skips the scoring query entirely.
+    Pass history when the caller already fetched the marker alongside
+    the roster.
+
+    Returns (pairings, skipped, run); run has id (None if not stored),
+    input_hash, cached and candidate_source.
+    """
+    pool = [p for p in players if is_player_available(p)]
+    if seed is not None:
+        pool.sort(key=lambda p: p['id'])  # generate_pairings shuffles from id order
+
+    params = pairing_params()
+    if blocked_pairs is None:
+        if history is None:
+            history = history_marker(supabase)
+        run_hash = input_hash(pool, [], [], history=history, seed=seed,
+                              params={**params, 'scored_in': 'database'}, period_start=period_start)
+    else:
+        run_hash = input_hash(pool, blocked_pairs, recent_matches, seed=seed, params=params,
+                              period_start=period_start)
+
+    stored = find_run(supabase, run_hash)
+    hydrated = hydrate_run(stored['result'], pool) if stored else None
+    if hydrated:
+        pairings, skipped = hydrated
+        return pairings, skipped, {
+            'id': stored['id'], 'input_hash': run_hash, 'cached': True,
+            'candidate_source': stored['params'].get('candidate_source', 'full'),
+        }
+
+    candidates = None
+    candidate_source = 'full'
+    if blocked_pairs is None:
+        # Score candidate pairs in the database (top-k per player);
+        # without migration 021, load blocks + history and score here
+        try:
+            candidates = fetch_pairing_candidates(supabase)
+            blocked_pairs, recent_matches = [], []
+            candidate_source = 'database'
+        except APIError:
+            blocked_pairs, recent_matches = load_pairing_history(supabase)
+
+    pairings, skipped = generate_pairings(pool, blocked_pairs, recent_matches, candidates, seed)
+
+    # Anyone whose top-k were all taken: pair them with the full rules
+    if candidates is not None and len(skipped) >= 2:
+        blocked_pairs, recent_matches = load_pairing_history(supabase)
+        extra, skipped = generate_pairings(skipped, blocked_pairs, recent_matches, seed=seed)
+        pairings.extend(extra)
+
+    saved = save_run(supabase, run_hash, serialize_result(pairings, skipped), seed,
+                     {**params, 'candidate_source': candidate_source}, period_start)
+    return pairings, skipped, {
+        'id': saved['id'] if saved else None, 'input_hash': run_hash, 'cached': False,
+        'candidate_source': candidate_source,
+    }
+
+
+def pairing_metrics(pairings, skipped):
+    """Quality summary of a set of pairings (for previews)"""
+    if not pairings:
+        return {'pairs': 0, 'players_paired': 0, 'players_skipped': len(skipped)}
+    skill_diffs, rating_gaps, repeats = [], [], 0
+    for p in pairings:
+        skill_diff = abs(player_skill(p['player1']) - player_skill(p['player2']))
+        rating_gap = abs(
+            float(p['player1'].get('rating') or INITIAL_RATING) -
+            float(p['player2'].get('rating') or INITIAL_RATING)
+        )
+        skill_diffs.append(skill_diff)
+        rating_gaps.append(rating_gap)
+        # Anything under the bound lost the never-played bonus
+        if p['score'] < score_bound(skill_diff, rating_gap) - 1e-9:
+            repeats += 1
+    scores = [p['score'] for p in pairings]
+    return {
+        'pairs': len(pairings),
+        'players_paired': len(pairings) * 2,
+        'players_skipped': len(skipped),
+        'mean_score': round(sum(scores) / len(scores), 2),
+        'min_score': round(min(scores), 2),
+        'mean_skill_diff': round(sum(skill_diffs) / len(skill_diffs), 3),
+        'max_skill_diff': max(skill_diffs),
+        'mean_rating_gap': round(sum(rating_gaps) / len(rating_gaps), 1),
+        'repeat_pairs': repeats,
+    }
+
+
+def load_live_assignments(supabase, period):
+    """This period's assignments (any status) as stored"""
+    return supabase.table('match_assignments')\
+        .select('id, player1_id, player2_id, status')\
+        .eq('period_start', period['period_start'])\
+        .execute().data
+
+
+def diff_assignments(pairs, live):
+    """
+    Compare proposed (player1_id, player2_id) pairs with the live
+    assignments. Proposed pairs that reuse a player who is already
+    assigned to someone else are conflicts - committing skips them.
+    """
+    live_keys = {frozenset((a['player1_id'], a['player2_id'])): a for a in live}
+    live_players = {pid for a in live for pid in (a['player1_id'], a['player2_id'])}
+    proposed_keys = {frozenset(pair) for pair in pairs}
+
+    diff = {'added': [], 'unchanged': [], 'conflicts': [], 'removed': []}
+    for player1_id, player2_id in pairs:
+        key = frozenset((player1_id, player2_id))
+        entry = {'player1_id': player1_id, 'player2_id': player2_id}
+        if key in live_keys:
+            diff['unchanged'].append({**entry, 'status': live_keys[key]['status']})
+        elif player1_id in live_players or player2_id in live_players:
+            diff['conflicts'].append(entry)
+        else:
+            diff['added'].append(entry)
+    for key, a in live_keys.items():
+        if key not in proposed_keys:
+            diff['removed'].append({'player1_id': a['player1_id'], 'player2_id': a['player2_id'], 'status': a['status']})
+    return diff
+
+
+class handler(BaseHandler):
     def do_GET(self):
         """Get current month's pairings"""
         try:
-            supabase = get_supabase_client()
-            current_month = datetime.now().strftime('%B %Y')
+            supabase = get_supabase_client(self._league())
+            current = period_fields()
+            current_month = current['period_label']
 
             if supabase:
                 # Get existing pairings for this month with player details
-                response = supabase.table('match_assignments')\
+                query = supabase.table('match_assignments')\
                     .select('*, player1:players!player1_id(id, name, email, available_morning, available_afternoon, available_evening), player2:players!player2_id(id, name, email, available_morning, available_afternoon, available_evening)')\
-                    .eq('period_label', current_month)\
-                    .execute()
+                    .eq('period_start', current['period_start'])
+                # Shared cache first (less whatever the change feed says changed);
+                # concurrent identical misses in this instance share one query
+                sync_cache(supabase)
+                rows = cached(supabase, f"pairings:{current['period_start']}",
+                              lambda: shared_execute(query).data, PAIRINGS_TTL_SECONDS, [PAIRINGS])
 
                 # Add availability text to response
                 pairings_with_availability = []
-                for p in response.data:
+                for p in rows:
                     p['player1_availability'] = get_availability_text(p.get('player1', {}))
                     p['player2_availability'] = get_availability_text(p.get('player2', {}))
                     pairings_with_availability.append(p)
@@ -209,7 +555,7 @@ class handler(BaseHTTPRequestHandler):
                 self._send_success({
                     'period': current_month,
                     'pairings': pairings_with_availability,
-                    'count': len(response.data)
+                    'count': len(rows)
                 })
             else:
                 self._send_success({
@@ -223,97 +569,175 @@ class handler(BaseHTTPRequestHandler):
             self._send_error(500, str(e))
 
     def do_POST(self):
-        """Generate new pairings for current or specified month"""
+        """
+        Generate new pairings for the current or specified period
+        (period_type 'month', 'quarter' or 'week'; default 'month').
+
+        {"preview": true}: run the engine and return the proposed pairings,
+        metrics and a diff against this period's assignments - nothing is
+        written except the stored run. {"run_id": ...}: commit a previewed
+        run from pairing_runs without reloading the roster or history.
+        """
         try:
-            content_length = int(self.headers.get('Content-Length', 0))
-            body = self.rfile.read(content_length).decode('utf-8')
-            data = json.loads(body) if body else {}
+            data = self._read_json()
 
-            period_label = data.get('period_label', datetime.now().strftime('%B %Y'))
             period_type = data.get('period_type', 'month')
+            try:
+                period = period_fields(data.get('period_label'), period_type)
+            except ValueError as e:
+                self._send_error(400, str(e))
+                return
+            period_label = period['period_label']
+
+            seed = data.get('seed')
+            if seed is not None and (isinstance(seed, bool) or not isinstance(seed, int)):
+                self._send_error(400, "seed must be an integer")
+                return
 
-            supabase = get_supabase_client()
+            supabase = get_supabase_client(self._league())
 
             if not supabase:
                 self._send_error(503, "Database not configured")
                 return
 
-            # 1. Get all active players (including new availability fields)
-            players_resp = supabase.table('players')\
-                .select('id, name, email, skill_level, rank, is_active, unavailable_until, available_morning, available_afternoon, available_evening')\
+            if data.get('run_id'):
+                self._commit_run(supabase, data['run_id'], period, period_type)
+                return
+
+            # 1. Get all active players (including new availability fields),
+            #    fetching the history marker for the run lookup alongside
+            players_query = supabase.table('players')\
+                .select('id, name, email, skill_level, skill_rating, rank, rating, is_active, unavailable_until, available_morning, available_afternoon, available_evening')\
                 .eq('is_active', True)\
-                .eq('is_admin', False)\
-                .execute()
+                .eq('is_admin', False)
+            players_resp, history = gather(players_query.execute, lambda: history_marker(supabase))
             players = players_resp.data
 
-            # 2. Get blocked pairs (from "would not play again" feedback)
-            blocked_resp = supabase.table('match_feedback')\
-                .select('from_player_id, about_player_id')\
-                .eq('would_play_again', False)\
-                .execute()
-            blocked_pairs = []
-            for b in blocked_resp.data:
-                blocked_pairs.append({
-                    'player_a': min(b['from_player_id'], b['about_player_id']),
-                    'player_b': max(b['from_player_id'], b['about_player_id'])
-                })
+            # 2. Pair them (a stored run with the same inputs is reused as-is)
+            pairings, skipped, run = run_pairings(supabase, players, seed=seed, period_start=period['period_start'],
+                                                  history=history)
 
-            # 3. Get recent matches (last 3 months for variety)
-            recent_resp = supabase.table('matches')\
-                .select('player1_id, player2_id')\
-                .order('created_at', desc=True)\
-                .limit(200)\
-                .execute()
-            recent_matches = recent_resp.data
-
-            # 4. Generate pairings (now returns tuple: pairings, skipped)
-            pairings, skipped = generate_pairings(players, blocked_pairs, recent_matches)
-
-            # 5. Save to match_assignments
-            assignments = []
-            for p in pairings:
-                assignment = {
-                    'player1_id': p['player1']['id'],
-                    'player2_id': p['player2']['id'],
-                    'period_type': period_type,
-                    'period_label': period_label,
-                    'status': 'pending'
-                }
-                assignments.append(assignment)
+            # Courts, slot (within what's already booked) and shared times per pair
+            assignments = build_assignments(supabase, [(p['player1']['id'], p['player2']['id']) for p in pairings],
+                                            period, period_type)
 
+            if data.get('preview'):
+                live = load_live_assignments(supabase, period)
+                self._send_success({
+                    'period': period_label,
+                    'preview': True,
+                    'run_id': run['id'],
+                    'input_hash': run['input_hash'],
+                    'cached': run['cached'],
+                    'seed': seed,
+                    'candidate_source': run['candidate_source'],
+                    'metrics': pairing_metrics(pairings, skipped),
+                    'diff': diff_assignments([(p['player1']['id'], p['player2']['id']) for p in pairings], live),
+                    'players_skipped': [s['name'] for s in skipped],
+                    'pairings': [self._pairing_summary(p, a) for p, a in zip(pairings, assignments)]
+                })
+                return
+
+            # 3. Save to match_assignments
             if assignments:
-                supabase.table('match_assignments').insert(assignments).execute()
+                if not self._insert_assignments(supabase, assignments):
+                    return
 
             self._send_success({
                 'period': period_label,
                 'pairings_created': len(assignments),
+                'candidate_source': run['candidate_source'],
+                'run_id': run['id'],
+                'input_hash': run['input_hash'],
+                'cached': run['cached'],
+                'seed': seed,
                 'players_available': len([p for p in players if is_player_available(p)]),
                 'players_unavailable': len([p for p in players if not is_player_available(p)]),
                 'players_skipped': [s['name'] for s in skipped],
-                'pairings': [{
-                    'player1': p['player1']['name'],
-                    'player1_email': p['player1']['email'],
-                    'player1_availability': p['player1_availability'],
-                    'player2': p['player2']['name'],
-                    'player2_email': p['player2']['email'],
-                    'player2_availability': p['player2_availability'],
-                    'match_score': p['score']
-                } for p in pairings]
+                'pairings': [self._pairing_summary(p, a) for p, a in zip(pairings, assignments)]
             })
 
         except Exception as e:
             self._send_error(500, str(e))
 
-    def _send_success(self, data):
-        self.send_response(200)
-        self.send_header('Content-Type', 'application/json')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.end_headers()
-        self.wfile.write(json.dumps({"success": True, **data}).encode())
-
-    def _send_error(self, status, message):
-        self.send_response(status)
-        self.send_header('Content-Type', 'application/json')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.end_headers()
-        self.wfile.write(json.dumps({"success": False, "error": message}).encode())
+    def _insert_assignments(self, supabase, assignments):
+        """
+        Insert the rows; 409 (and False) if a player already has an open
+        assignment this period, e.g. from a rematch that landed first.
+        """
+        try:
+            supabase.table('match_assignments').insert(assignments).execute()
+        except APIError as e:
+            if e.code != UNIQUE_VIOLATION:
+                raise
+            self._send_error(409, f"{e.message} - preview again")
+            return False
+        forget()
+        invalidate(supabase, PAIRINGS)
+        return True
+
+    def _commit_run(self, supabase, run_id, period, period_type):
+        """
+        Write a previewed run's pairs that don't clash with live
+        assignments. 409 if the run was computed for another period or
+        any of its players has since become inactive or unavailable -
+        preview again instead.
+        """
+        stored = find_run(supabase, run_id=run_id)
+        if not stored:
+            self._send_error(404, "Pairing run not found")
+            return
+        if str(stored.get('period_start')) != str(period['period_start']):
+            self._send_error(409, f"Pairing run was computed for another period ({stored.get('period_start')})")
+            return
+
+        pairs = [(p1, p2) for p1, p2, _ in stored['result']['pairs']]
+        run_player_ids = {pid for pair in pairs for pid in pair}
+        current = supabase.table('players')\
+            .select('id, is_active, is_admin, unavailable_until')\
+            .in_('id', sorted(run_player_ids))\
+            .execute().data if run_player_ids else []
+        pairable = {p['id'] for p in current if is_player_available(p) and not p.get('is_admin')}
+        gone = sorted(run_player_ids - pairable)
+        if gone:
+            self._send_error(409, f"Players no longer available since the preview: {', '.join(gone)}")
+            return
+
+        scores = {(p1, p2): score for p1, p2, score in stored['result']['pairs']}
+        diff = diff_assignments(pairs, load_live_assignments(supabase, period))
+
+        added = [(a['player1_id'], a['player2_id']) for a in diff['added']]
+        assignments = build_assignments(supabase, added, period, period_type)
+        if assignments and not self._insert_assignments(supabase, assignments):
+            return
+
+        self._send_success({
+            'period': period['period_label'],
+            'run_id': stored['id'],
+            'input_hash': stored['input_hash'],
+            'pairings_created': len(assignments),
+            'already_assigned': len(diff['unchanged']),
+            'conflicts': diff['conflicts'],
+            'players_skipped': stored['result']['skipped'],
+            'pairings': [{
+                'player1_id': a['player1_id'],
+                'player2_id': a['player2_id'],
+                'match_score': scores[(a['player1_id'], a['player2_id'])],
+                'suggested_courts': a['suggested_courts'],
+                'suggested_slot': a['suggested_slot']
+            } for a in assignments]
+        })
+
+    @staticmethod
+    def _pairing_summary(p, assignment):
+        return {
+            'player1': p['player1']['name'],
+            'player1_email': p['player1']['email'],
+            'player1_availability': p['player1_availability'],
+            'player2': p['player2']['name'],
+            'player2_email': p['player2']['email'],
+            'player2_availability': p['player2_availability'],
+            'match_score': p['score'],
+            'suggested_courts': assignment['suggested_courts'],
+            'suggested_slot': assignment['suggested_slot']
+        }
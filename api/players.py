@@ -1,83 +1,61 @@
 """
 Vercel Serverless Function: Players API
 Handles player listing with Supabase
+
+Per-player aggregates (wins, losses, streak, games per month) come from
+the trigger-maintained player_stats table (migrations/005), embedded as
+`stats` - one row per player, no match history scan.
+
+Every good read is remembered (api/_lkg.py); when Supabase errors or
+times out the last real ladder is served with its age, never sample data.
 """
-from http.server import BaseHTTPRequestHandler
-import json
-import os
+from api._base import BaseHandler
+from api._cache import LADDER, LADDER_TTL_SECONDS, PLAYER_ID_TTL_SECONDS, PLAYERS, cached
+from api._changes import sync_cache
+from api._db import get_supabase_client
+from api._lkg import age_headers, last_known_good
+from api._singleflight import shared_execute
+
 
+# PostgREST embed for the one-to-one player_stats row
+PLAYER_STATS_EMBED = 'stats:player_stats(wins, losses, games_won, games_lost, game_diff, ' \
+                     'last_match_date, streak, monthly_games)'
 
-def get_supabase_client():
-    """Lazy initialization of Supabase client"""
-    try:
-        from supabase import create_client
-        url = os.environ.get('SUPABASE_URL')
-        key = os.environ.get('SUPABASE_ANON_KEY')
-        if url and key:
-            return create_client(url, key)
-    except Exception:
-        pass
-    return None
 
+def lookup_player_id(supabase, email):
+    """Player id for a signed-in email, or None; cached across instances (api/_cache.py)"""
+    email = email.lower()
 
-# Real player data fallback - NET WORTH Tennis East Side LA (games-won system)
-SAMPLE_PLAYERS = [
-    {"id": 1, "rank": 1, "name": "Kim Ndombe", "skill_level": "4.5 Advanced+", "total_games": 51, "matches_played": 5, "trend": "up"},
-    {"id": 2, "rank": 2, "name": "Natalie Coffen", "skill_level": "4.5 Advanced+", "total_games": 50, "matches_played": 6, "trend": "up"},
-    {"id": 3, "rank": 3, "name": "Sara Chrisman", "skill_level": "4.5 Advanced+", "total_games": 49, "matches_played": 5, "trend": "neutral"},
-    {"id": 4, "rank": 4, "name": "Arianna Hairston", "skill_level": "4.5 Advanced+", "total_games": 48, "matches_played": 4, "trend": "neutral"},
-    {"id": 5, "rank": 5, "name": "Alik Apelian", "skill_level": "4.5 Advanced+", "total_games": 45, "matches_played": 5, "trend": "neutral"},
-    {"id": 6, "rank": 6, "name": "Hannah Shin", "skill_level": "4.5 Advanced+", "total_games": 45, "matches_played": 4, "trend": "up"},
-    {"id": 7, "rank": 7, "name": "Hanna Pavlova", "skill_level": "4.0 Advanced", "total_games": 41, "matches_played": 6, "trend": "neutral"},
-    {"id": 8, "rank": 8, "name": "Maddy Whitby", "skill_level": "4.0 Advanced", "total_games": 38, "matches_played": 5, "trend": "neutral"},
-    {"id": 9, "rank": 9, "name": "Allison Dunne", "skill_level": "4.0 Advanced", "total_games": 37, "matches_played": 4, "trend": "up"},
-    {"id": 10, "rank": 10, "name": "Ashley Brooke Kaufman", "skill_level": "3.5+ Intermediate", "total_games": 33, "matches_played": 7, "trend": "neutral"},
-    {"id": 11, "rank": 11, "name": "Kaitlin Kelly", "skill_level": "3.5+ Intermediate", "total_games": 32, "matches_played": 4, "trend": "neutral"},
-    {"id": 12, "rank": 12, "name": "Page Eaton", "skill_level": "3.5+ Intermediate", "total_games": 30, "matches_played": 4, "trend": "neutral"},
-    {"id": 13, "rank": 13, "name": "Sarah Yun", "skill_level": "3.5+ Intermediate", "total_games": 29, "matches_played": 3, "trend": "neutral"},
-    {"id": 14, "rank": 14, "name": "Camille Tsalik", "skill_level": "3.5+ Intermediate", "total_games": 29, "matches_played": 3, "trend": "neutral"},
-    {"id": 15, "rank": 15, "name": "Laurie Berger", "skill_level": "3.5+ Intermediate", "total_games": 26, "matches_played": 3, "trend": "neutral"},
-    {"id": 16, "rank": 16, "name": "Katie Morey", "skill_level": "3.5 Intermediate", "total_games": 24, "matches_played": 2, "trend": "neutral"},
-]
+    def load():
+        rows = supabase.table('players').select('id').eq('email', email).limit(1).execute().data
+        return rows[0]['id'] if rows else None
 
+    sync_cache(supabase)
+    return cached(supabase, f'player-id:{email}', load, PLAYER_ID_TTL_SECONDS, [PLAYERS])
 
-class handler(BaseHTTPRequestHandler):
-    def do_OPTIONS(self):
-        self.send_response(200)
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type, Authorization')
-        self.end_headers()
 
+class handler(BaseHandler):
     def do_GET(self):
         try:
-            supabase = get_supabase_client()
-            if supabase:
-                response = supabase.table('players').select('*').eq('is_active', True).order('rank').execute()
-                players = response.data
-                source = "supabase"
-            else:
-                players = SAMPLE_PLAYERS
-                source = "sample"
+            supabase = get_supabase_client(self._league())
+
+            def load():
+                if not supabase:
+                    raise RuntimeError("Database not configured")
+                query = supabase.table('players').select(f'*, {PLAYER_STATS_EMBED}').eq('is_active', True).order('rank')
+                # Shared cache first (less whatever the change feed says changed);
+                # concurrent identical misses in this instance share one query
+                sync_cache(supabase)
+                return cached(supabase, 'ladder', lambda: shared_execute(query).data, LADDER_TTL_SECONDS, [LADDER])
+
+            # Database down or slow: the last good ladder, marked with its age
+            players, age = last_known_good(f"players:{self._league() or ''}", load)
 
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            self.wfile.write(json.dumps({
-                "success": True,
+            self._send_success({
                 "players": players,
-                "source": source
-            }).encode())
+                "source": "supabase" if age is None else "snapshot",
+                "age_seconds": age or 0
+            }, headers=age_headers(age))
 
         except Exception as e:
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            self.wfile.write(json.dumps({
-                "success": True,
-                "players": SAMPLE_PLAYERS,
-                "source": "sample_fallback",
-                "error": str(e)
-            }).encode())
+            self._send_error(503, str(e))
@@ -0,0 +1,92 @@
+"""
+Vercel Serverless Function: Standings API
+Leaderboard for one period, read from the player_period_stats rollup
+(migrations/006) - one index range read, no scan of matches.
+
+GET /api/standings?period=June 2025   (default: current month)
+    &limit=50
+
+Finished periods only change when a late score comes in, so they're
+cached at the edge for a day; the current period for a few minutes.
+"""
+from api._base import BaseHandler
+from api._cache import PAST_STANDINGS_TTL_SECONDS, STANDINGS, STANDINGS_TTL_SECONDS, cached
+from api._changes import sync_cache
+from api._db import get_supabase_client
+from api._periods import period_fields
+
+
+CURRENT_PERIOD_CACHE = 'public, max-age=60, s-maxage=300, stale-while-revalidate=3600'
+PAST_PERIOD_CACHE = 'public, max-age=3600, s-maxage=86400, stale-while-revalidate=604800'
+MAX_LIMIT = 200
+
+
+def rank_standings(rows):
+    """Order by games won (then name) and number them; ties share a rank"""
+    rows = sorted(rows, key=lambda r: (-r['games_won'], (r.get('player') or {}).get('name') or ''))
+    standings = []
+    rank = 0
+    previous = None
+    for position, row in enumerate(rows, start=1):
+        if row['games_won'] != previous:
+            rank = position
+            previous = row['games_won']
+        player = row.get('player') or {}
+        standings.append({
+            'rank': rank,
+            'player_id': row['player_id'],
+            'name': player.get('name'),
+            'skill_level': player.get('skill_level'),
+            'games_won': row['games_won'],
+            'games_lost': row['games_lost'],
+            'wins': row['wins'],
+            'losses': row['losses'],
+            'matches_played': row['matches_played'],
+        })
+    return standings
+
+
+class handler(BaseHandler):
+    allowed_methods = 'GET, OPTIONS'
+
+    def do_GET(self):
+        try:
+            query = self._query()
+            current_period = period_fields()
+            try:
+                period = period_fields(query.get('period'))
+            except ValueError as e:
+                self._send_error(400, str(e))
+                return
+            try:
+                limit = max(1, min(MAX_LIMIT, int(query.get('limit', MAX_LIMIT))))
+            except ValueError:
+                self._send_error(400, "limit must be a number")
+                return
+
+            supabase = get_supabase_client(self._league())
+            if not supabase:
+                self._send_error(503, "Database not configured")
+                return
+
+            query = supabase.table('player_period_stats')\
+                .select('player_id, games_won, games_lost, wins, losses, matches_played, '
+                        'player:players(name, skill_level)')\
+                .eq('period_start', period['period_start'])\
+                .order('games_won', desc=True)\
+                .limit(limit)
+            is_current = period == current_period
+            # Late scores and renames made anywhere retire cached standings (api/_changes.py)
+            sync_cache(supabase)
+            rows = cached(supabase, f"standings:{period['period_start']}:{limit}", lambda: query.execute().data,
+                          STANDINGS_TTL_SECONDS if is_current else PAST_STANDINGS_TTL_SECONDS, [STANDINGS])
+
+            cache = CURRENT_PERIOD_CACHE if is_current else PAST_PERIOD_CACHE
+            self._send_success({
+                'period': period['period_label'],
+                'period_start': period['period_start'],
+                'standings': rank_standings(rows),
+            }, headers={'Cache-Control': cache, 'Vary': 'X-League'})
+
+        except Exception as e:
+            self._send_error(500, str(e))
@@ -0,0 +1,65 @@
+-- =============================================================
+-- 001: updated_at on every backed-up table
+-- Run in Supabase SQL Editor after supabase-final-setup.sql
+--
+-- scripts/backup.py pages through each table by (updated_at, id)
+-- and only exports rows changed since the last backup's high-water
+-- mark, so every table needs a maintained updated_at column.
+-- =============================================================
+
+ALTER TABLE matches ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE;
+ALTER TABLE match_assignments ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE;
+ALTER TABLE match_feedback ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE;
+ALTER TABLE player_availability ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE;
+ALTER TABLE player_court_preferences ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE;
+
+-- Backfill from the best timestamp each table already has
+UPDATE players SET updated_at = COALESCE(updated_at, created_at, NOW()) WHERE updated_at IS NULL;
+UPDATE matches SET updated_at = COALESCE(created_at, NOW()) WHERE updated_at IS NULL;
+UPDATE match_assignments SET updated_at = COALESCE(responded_at, assigned_at, NOW()) WHERE updated_at IS NULL;
+UPDATE match_feedback SET updated_at = COALESCE(created_at, NOW()) WHERE updated_at IS NULL;
+UPDATE player_availability SET updated_at = NOW() WHERE updated_at IS NULL;
+UPDATE player_court_preferences SET updated_at = NOW() WHERE updated_at IS NULL;
+
+ALTER TABLE players ALTER COLUMN updated_at SET DEFAULT NOW(), ALTER COLUMN updated_at SET NOT NULL;
+ALTER TABLE matches ALTER COLUMN updated_at SET DEFAULT NOW(), ALTER COLUMN updated_at SET NOT NULL;
+ALTER TABLE match_assignments ALTER COLUMN updated_at SET DEFAULT NOW(), ALTER COLUMN updated_at SET NOT NULL;
+ALTER TABLE match_feedback ALTER COLUMN updated_at SET DEFAULT NOW(), ALTER COLUMN updated_at SET NOT NULL;
+ALTER TABLE player_availability ALTER COLUMN updated_at SET DEFAULT NOW(), ALTER COLUMN updated_at SET NOT NULL;
+ALTER TABLE player_court_preferences ALTER COLUMN updated_at SET DEFAULT NOW(), ALTER COLUMN updated_at SET NOT NULL;
+
+-- Keep updated_at current on every UPDATE
+CREATE OR REPLACE FUNCTION set_updated_at()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at = NOW();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_players_updated_at ON players;
+CREATE TRIGGER trigger_players_updated_at BEFORE UPDATE ON players
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+DROP TRIGGER IF EXISTS trigger_matches_updated_at ON matches;
+CREATE TRIGGER trigger_matches_updated_at BEFORE UPDATE ON matches
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+DROP TRIGGER IF EXISTS trigger_assignments_updated_at ON match_assignments;
+CREATE TRIGGER trigger_assignments_updated_at BEFORE UPDATE ON match_assignments
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+DROP TRIGGER IF EXISTS trigger_feedback_updated_at ON match_feedback;
+CREATE TRIGGER trigger_feedback_updated_at BEFORE UPDATE ON match_feedback
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+DROP TRIGGER IF EXISTS trigger_availability_updated_at ON player_availability;
+CREATE TRIGGER trigger_availability_updated_at BEFORE UPDATE ON player_availability
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+DROP TRIGGER IF EXISTS trigger_court_prefs_updated_at ON player_court_preferences;
+CREATE TRIGGER trigger_court_prefs_updated_at BEFORE UPDATE ON player_court_preferences
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+
+-- Keyset cursor indexes: WHERE (updated_at, id) > (?, ?) ORDER BY updated_at, id
+CREATE INDEX IF NOT EXISTS idx_players_updated ON players(updated_at, id);
+CREATE INDEX IF NOT EXISTS idx_matches_updated ON matches(updated_at, id);
+CREATE INDEX IF NOT EXISTS idx_assignments_updated ON match_assignments(updated_at, id);
+CREATE INDEX IF NOT EXISTS idx_feedback_updated ON match_feedback(updated_at, id);
+CREATE INDEX IF NOT EXISTS idx_availability_updated ON player_availability(updated_at, id);
+CREATE INDEX IF NOT EXISTS idx_court_prefs_updated ON player_court_preferences(updated_at, id);
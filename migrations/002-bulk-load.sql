@@ -0,0 +1,122 @@
+-- =============================================================
+-- 002: Bulk load support for scripts/restore.py
+-- Run in Supabase SQL Editor after 001
+--
+-- While a bulk load is active the per-row match trigger skips its
+-- total_games update and ranking recalculation; finish_bulk_load()
+-- does that work once at the end instead of once per inserted row.
+-- =============================================================
+
+CREATE TABLE IF NOT EXISTS bulk_load_state (
+    id BOOLEAN PRIMARY KEY DEFAULT true CHECK (id), -- single row
+    active BOOLEAN NOT NULL DEFAULT false,
+    started_at TIMESTAMP WITH TIME ZONE
+);
+INSERT INTO bulk_load_state (id, active) VALUES (true, false) ON CONFLICT (id) DO NOTHING;
+
+ALTER TABLE bulk_load_state ENABLE ROW LEVEL SECURITY;
+CREATE POLICY "Bulk load state viewable" ON bulk_load_state FOR SELECT USING (true);
+
+-- =============================================================
+-- LEGACY MONTHLY GAMES (from "Net Worth ladder 2025 - Net Worth.csv")
+-- The spreadsheet only has games won per player per month, no opponents,
+-- so it can't be loaded into matches.
+-- =============================================================
+CREATE TABLE IF NOT EXISTS legacy_monthly_games (
+    player_id UUID REFERENCES players(id) ON DELETE CASCADE,
+    period_label VARCHAR(30) NOT NULL, -- "March 2025"
+    games INTEGER NOT NULL DEFAULT 0,
+    imported_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (player_id, period_label)
+);
+
+ALTER TABLE legacy_monthly_games ENABLE ROW LEVEL SECURITY;
+CREATE POLICY "Legacy games viewable" ON legacy_monthly_games FOR SELECT USING (true);
+
+CREATE OR REPLACE FUNCTION bulk_load_active()
+RETURNS boolean AS $$
+    SELECT COALESCE((SELECT active FROM bulk_load_state WHERE id), false);
+$$ LANGUAGE sql STABLE;
+
+CREATE OR REPLACE FUNCTION begin_bulk_load()
+RETURNS void AS $$
+BEGIN
+    UPDATE bulk_load_state SET active = true, started_at = NOW() WHERE id;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- recompute_totals: rebuild total_games / matches_played from matches.
+-- Leave false when the loaded players rows already carry their totals.
+CREATE OR REPLACE FUNCTION finish_bulk_load(recompute_totals boolean DEFAULT false)
+RETURNS void AS $$
+BEGIN
+    UPDATE bulk_load_state SET active = false, started_at = NULL WHERE id;
+
+    IF recompute_totals THEN
+        WITH totals AS (
+            SELECT player_id, SUM(games) AS games, COUNT(*) AS played
+            FROM (
+                SELECT player1_id AS player_id,
+                       CASE WHEN is_forfeit THEN 6 ELSE player1_games END AS games
+                FROM matches
+                UNION ALL
+                SELECT player2_id,
+                       CASE WHEN is_forfeit THEN 0 ELSE player2_games END
+                FROM matches
+            ) sides
+            WHERE player_id IS NOT NULL
+            GROUP BY player_id
+        )
+        UPDATE players p SET
+            total_games = COALESCE(t.games, 0),
+            matches_played = COALESCE(t.played, 0)
+        FROM players p2
+        LEFT JOIN totals t ON t.player_id = p2.id
+        WHERE p.id = p2.id;
+    END IF;
+
+    PERFORM recalculate_rankings();
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- Same as supabase-final-setup.sql, plus the bulk load short-circuit
+CREATE OR REPLACE FUNCTION update_player_games()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF bulk_load_active() THEN
+        RETURN NEW;
+    END IF;
+
+    -- Handle forfeits: winner gets 6, loser gets 0
+    IF NEW.is_forfeit THEN
+        -- player1 is winner for forfeits
+        UPDATE players SET
+            total_games = total_games + 6,
+            matches_played = matches_played + 1,
+            updated_at = NOW()
+        WHERE id = NEW.player1_id;
+
+        UPDATE players SET
+            matches_played = matches_played + 1,
+            updated_at = NOW()
+        WHERE id = NEW.player2_id;
+    ELSE
+        -- Normal match: add actual games won
+        UPDATE players SET
+            total_games = total_games + NEW.player1_games,
+            matches_played = matches_played + 1,
+            updated_at = NOW()
+        WHERE id = NEW.player1_id;
+
+        UPDATE players SET
+            total_games = total_games + NEW.player2_games,
+            matches_played = matches_played + 1,
+            updated_at = NOW()
+        WHERE id = NEW.player2_id;
+    END IF;
+
+    -- Recalculate rankings
+    PERFORM recalculate_rankings();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,116 @@
+-- =============================================================
+-- 003: Multi-league tenancy
+-- Run in Supabase SQL Editor after 002
+--
+-- league_settings becomes the league table. Every player, match,
+-- assignment and feedback row belongs to one league. The API sends
+-- the league slug in an X-League header; PostgREST exposes it to
+-- SQL and current_league_id() turns it into the league's id.
+-- Requests without the header fall back to the oldest league, so a
+-- single-league deployment keeps working unchanged.
+-- =============================================================
+
+-- Per-league config (NULL = use the defaults in api/config.py)
+ALTER TABLE league_settings ADD COLUMN IF NOT EXISTS slug VARCHAR(50);
+ALTER TABLE league_settings ADD COLUMN IF NOT EXISTS tagline VARCHAR(255);
+ALTER TABLE league_settings ADD COLUMN IF NOT EXISTS approved_courts JSONB;
+ALTER TABLE league_settings ADD COLUMN IF NOT EXISTS skill_levels JSONB;
+ALTER TABLE league_settings ADD COLUMN IF NOT EXISTS is_active BOOLEAN NOT NULL DEFAULT true;
+
+ALTER TABLE league_settings ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW();
+
+DROP TRIGGER IF EXISTS trigger_league_settings_updated_at ON league_settings;
+CREATE TRIGGER trigger_league_settings_updated_at BEFORE UPDATE ON league_settings
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+CREATE INDEX IF NOT EXISTS idx_league_settings_updated ON league_settings(updated_at, id);
+
+UPDATE league_settings SET slug = 'networth'
+WHERE slug IS NULL AND id = (SELECT id FROM league_settings ORDER BY created_at LIMIT 1);
+UPDATE league_settings SET slug = id::text WHERE slug IS NULL;
+ALTER TABLE league_settings ALTER COLUMN slug SET NOT NULL;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_league_settings_slug ON league_settings(slug);
+
+CREATE OR REPLACE FUNCTION current_league_id()
+RETURNS uuid AS $$
+    SELECT COALESCE(
+        (SELECT id FROM league_settings
+         WHERE slug = NULLIF(current_setting('request.headers', true)::json->>'x-league', '')),
+        (SELECT id FROM league_settings ORDER BY created_at LIMIT 1)
+    );
+$$ LANGUAGE sql STABLE;
+
+-- =============================================================
+-- league_id on the league-owned tables
+-- =============================================================
+ALTER TABLE players ADD COLUMN IF NOT EXISTS league_id UUID REFERENCES league_settings(id);
+ALTER TABLE matches ADD COLUMN IF NOT EXISTS league_id UUID REFERENCES league_settings(id);
+ALTER TABLE match_assignments ADD COLUMN IF NOT EXISTS league_id UUID REFERENCES league_settings(id);
+ALTER TABLE match_feedback ADD COLUMN IF NOT EXISTS league_id UUID REFERENCES league_settings(id);
+
+UPDATE players SET league_id = (SELECT id FROM league_settings WHERE slug = 'networth') WHERE league_id IS NULL;
+UPDATE matches m SET league_id = p.league_id FROM players p WHERE m.league_id IS NULL AND p.id = m.player1_id;
+UPDATE match_assignments a SET league_id = p.league_id FROM players p WHERE a.league_id IS NULL AND p.id = a.player1_id;
+UPDATE match_feedback f SET league_id = p.league_id FROM players p WHERE f.league_id IS NULL AND p.id = f.from_player_id;
+-- Rows whose players were deleted
+UPDATE matches SET league_id = (SELECT id FROM league_settings WHERE slug = 'networth') WHERE league_id IS NULL;
+
+ALTER TABLE players ALTER COLUMN league_id SET DEFAULT current_league_id(), ALTER COLUMN league_id SET NOT NULL;
+ALTER TABLE matches ALTER COLUMN league_id SET DEFAULT current_league_id(), ALTER COLUMN league_id SET NOT NULL;
+ALTER TABLE match_assignments ALTER COLUMN league_id SET DEFAULT current_league_id(), ALTER COLUMN league_id SET NOT NULL;
+ALTER TABLE match_feedback ALTER COLUMN league_id SET DEFAULT current_league_id(), ALTER COLUMN league_id SET NOT NULL;
+
+-- The same person can play in more than one league
+ALTER TABLE players DROP CONSTRAINT IF EXISTS players_email_key;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_players_league_email ON players(league_id, email);
+
+-- =============================================================
+-- Composite indexes: league first, then the existing access path
+-- =============================================================
+DROP INDEX IF EXISTS idx_players_rank;
+CREATE INDEX IF NOT EXISTS idx_players_league_rank ON players(league_id, rank) WHERE is_active = true;
+CREATE INDEX IF NOT EXISTS idx_matches_league_created ON matches(league_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_matches_league_period ON matches(league_id, period_type, period_label);
+CREATE INDEX IF NOT EXISTS idx_assignments_league_period ON match_assignments(league_id, period_label, status);
+CREATE INDEX IF NOT EXISTS idx_feedback_league_blocks ON match_feedback(league_id, would_play_again);
+
+-- =============================================================
+-- Row level security scoped to the request's league
+-- (the service role key bypasses RLS for backups and restores)
+-- =============================================================
+DROP POLICY IF EXISTS "Players viewable by all" ON players;
+DROP POLICY IF EXISTS "Players updatable" ON players;
+DROP POLICY IF EXISTS "Players insertable" ON players;
+DROP POLICY IF EXISTS "Matches viewable by all" ON matches;
+DROP POLICY IF EXISTS "Matches insertable" ON matches;
+DROP POLICY IF EXISTS "Feedback insertable" ON match_feedback;
+DROP POLICY IF EXISTS "Feedback viewable by admin" ON match_feedback;
+DROP POLICY IF EXISTS "Assignments viewable" ON match_assignments;
+DROP POLICY IF EXISTS "Assignments manageable" ON match_assignments;
+
+CREATE POLICY "Players in league" ON players FOR SELECT USING (league_id = current_league_id());
+CREATE POLICY "Players updatable in league" ON players FOR UPDATE USING (league_id = current_league_id());
+CREATE POLICY "Players insertable in league" ON players FOR INSERT WITH CHECK (league_id = current_league_id());
+CREATE POLICY "Matches in league" ON matches FOR SELECT USING (league_id = current_league_id());
+CREATE POLICY "Matches insertable in league" ON matches FOR INSERT WITH CHECK (league_id = current_league_id());
+CREATE POLICY "Feedback insertable in league" ON match_feedback FOR INSERT WITH CHECK (league_id = current_league_id());
+CREATE POLICY "Feedback in league" ON match_feedback FOR SELECT USING (league_id = current_league_id());
+CREATE POLICY "Assignments in league" ON match_assignments FOR ALL
+    USING (league_id = current_league_id()) WITH CHECK (league_id = current_league_id());
+
+-- =============================================================
+-- Rankings are per league
+-- =============================================================
+CREATE OR REPLACE FUNCTION recalculate_rankings()
+RETURNS void AS $$
+BEGIN
+    WITH ranked AS (
+        SELECT id, ROW_NUMBER() OVER (PARTITION BY league_id ORDER BY total_games DESC, name ASC) as new_rank
+        FROM players
+        WHERE is_active = true AND is_admin = false
+    )
+    UPDATE players p
+    SET rank = r.new_rank
+    FROM ranked r
+    WHERE p.id = r.id AND p.rank IS DISTINCT FROM r.new_rank;
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,38 @@
+-- =============================================================
+-- 004: Elo ratings (api/_ratings.py)
+-- Run in Supabase SQL Editor after 003
+--
+-- api/matches.py updates both players' ratings when a match is
+-- reported; scripts/replay_ratings.py rebuilds every rating from the
+-- full match history and writes them back with apply_ratings().
+-- =============================================================
+
+ALTER TABLE players ADD COLUMN IF NOT EXISTS rating NUMERIC(7,2) NOT NULL DEFAULT 1500;
+ALTER TABLE players ADD COLUMN IF NOT EXISTS rated_matches INTEGER NOT NULL DEFAULT 0;
+
+CREATE INDEX IF NOT EXISTS idx_players_league_rating ON players(league_id, rating DESC);
+
+-- ratings: [{"id": "...", "rating": 1523.4, "rated_matches": 12}, ...]
+-- reset: put everyone not in the list back to 1500 / 0 (full replay)
+-- Runs with the caller's rights, so the anon key only touches its league.
+CREATE OR REPLACE FUNCTION apply_ratings(ratings jsonb, reset boolean DEFAULT false)
+RETURNS integer AS $$
+DECLARE
+    updated integer;
+BEGIN
+    IF reset THEN
+        UPDATE players SET rating = 1500, rated_matches = 0
+        WHERE (rating <> 1500 OR rated_matches <> 0)
+          AND id NOT IN (SELECT (r->>'id')::uuid FROM jsonb_array_elements(ratings) r);
+    END IF;
+
+    UPDATE players p SET
+        rating = r.rating,
+        rated_matches = r.rated_matches
+    FROM jsonb_to_recordset(ratings) AS r(id uuid, rating numeric, rated_matches integer)
+    WHERE p.id = r.id
+      AND (p.rating IS DISTINCT FROM r.rating OR p.rated_matches IS DISTINCT FROM r.rated_matches);
+    GET DIAGNOSTICS updated = ROW_COUNT;
+    RETURN updated;
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,225 @@
+-- =============================================================
+-- 005: Materialized per-player stats
+-- Run in Supabase SQL Editor after 004
+--
+-- One row per player with the aggregates the ladder and dashboard
+-- show, kept current by a trigger on matches instead of scanning
+-- match history on every view:
+--   wins / losses, games won / lost / differential,
+--   last match date, current streak (+3 = three wins in a row,
+--   -2 = two losses), and games per month like the legacy sheet.
+--
+-- The trigger is skipped during a bulk load (002); finish_bulk_load()
+-- rebuilds the whole table once instead.
+-- =============================================================
+
+CREATE TABLE IF NOT EXISTS player_stats (
+    player_id UUID PRIMARY KEY REFERENCES players(id) ON DELETE CASCADE,
+    league_id UUID NOT NULL REFERENCES league_settings(id) ON DELETE CASCADE,
+    wins INTEGER NOT NULL DEFAULT 0,
+    losses INTEGER NOT NULL DEFAULT 0,
+    games_won INTEGER NOT NULL DEFAULT 0,
+    games_lost INTEGER NOT NULL DEFAULT 0,
+    game_diff INTEGER GENERATED ALWAYS AS (games_won - games_lost) STORED,
+    last_match_date DATE,
+    streak INTEGER NOT NULL DEFAULT 0,
+    monthly_games JSONB NOT NULL DEFAULT '{}'::jsonb, -- {"March 2025": 12, ...}
+    updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_player_stats_league ON player_stats(league_id);
+
+ALTER TABLE player_stats ENABLE ROW LEVEL SECURITY;
+CREATE POLICY "Player stats in league" ON player_stats FOR SELECT USING (league_id = current_league_id());
+
+-- =============================================================
+-- Per-side view of matches: one row per player per match
+-- Forfeits count as a 6-0 win for player1 (same as update_player_games)
+-- security_invoker keeps the matches RLS (league scoping) for API callers
+-- =============================================================
+CREATE OR REPLACE VIEW match_sides WITH (security_invoker = true) AS
+WITH scored AS (
+    SELECT m.*,
+        (COALESCE(set1_p1, 0) > COALESCE(set1_p2, 0))::int
+          + (COALESCE(set2_p1, 0) > COALESCE(set2_p2, 0))::int
+          + (COALESCE(set3_p1, 0) > COALESCE(set3_p2, 0))::int AS sets_p1,
+        (COALESCE(set1_p2, 0) > COALESCE(set1_p1, 0))::int
+          + (COALESCE(set2_p2, 0) > COALESCE(set2_p1, 0))::int
+          + (COALESCE(set3_p2, 0) > COALESCE(set3_p1, 0))::int AS sets_p2
+    FROM matches m
+)
+SELECT id AS match_id, league_id, player1_id AS player_id, period_label,
+       COALESCE(match_date, created_at::date) AS played_on, created_at,
+       CASE WHEN is_forfeit THEN 6 ELSE COALESCE(player1_games, 0) END AS games_won,
+       CASE WHEN is_forfeit THEN 0 ELSE COALESCE(player2_games, 0) END AS games_lost,
+       is_forfeit OR sets_p1 > sets_p2
+         OR (sets_p1 = sets_p2 AND COALESCE(player1_games, 0) > COALESCE(player2_games, 0)) AS won
+FROM scored WHERE player1_id IS NOT NULL
+UNION ALL
+SELECT id, league_id, player2_id, period_label,
+       COALESCE(match_date, created_at::date), created_at,
+       CASE WHEN is_forfeit THEN 0 ELSE COALESCE(player2_games, 0) END,
+       CASE WHEN is_forfeit THEN 6 ELSE COALESCE(player1_games, 0) END,
+       NOT is_forfeit AND (sets_p2 > sets_p1
+         OR (sets_p1 = sets_p2 AND COALESCE(player2_games, 0) > COALESCE(player1_games, 0)))
+FROM scored WHERE player2_id IS NOT NULL;
+
+-- =============================================================
+-- Incremental update: fold one new match into both players' rows
+-- =============================================================
+CREATE OR REPLACE FUNCTION update_player_stats()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF bulk_load_active() THEN
+        RETURN NEW;
+    END IF;
+
+    INSERT INTO player_stats AS s (player_id, league_id, wins, losses, games_won, games_lost,
+                                   last_match_date, streak, monthly_games)
+    SELECT side.player_id, side.league_id,
+           side.won::int, (NOT side.won)::int, side.games_won, side.games_lost,
+           side.played_on, CASE WHEN side.won THEN 1 ELSE -1 END,
+           jsonb_build_object(side.period_label, side.games_won)
+    FROM match_sides side
+    WHERE side.match_id = NEW.id
+    ON CONFLICT (player_id) DO UPDATE SET
+        wins = s.wins + EXCLUDED.wins,
+        losses = s.losses + EXCLUDED.losses,
+        games_won = s.games_won + EXCLUDED.games_won,
+        games_lost = s.games_lost + EXCLUDED.games_lost,
+        last_match_date = GREATEST(s.last_match_date, EXCLUDED.last_match_date),
+        -- Extend the run if the result matches it, else start a new one
+        streak = CASE
+            WHEN EXCLUDED.streak > 0 AND s.streak > 0 THEN s.streak + 1
+            WHEN EXCLUDED.streak < 0 AND s.streak < 0 THEN s.streak - 1
+            ELSE EXCLUDED.streak
+        END,
+        monthly_games = s.monthly_games || jsonb_build_object(
+            NEW.period_label,
+            COALESCE((s.monthly_games->>NEW.period_label)::int, 0)
+              + (EXCLUDED.monthly_games->>NEW.period_label)::int
+        ),
+        updated_at = NOW();
+
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+DROP TRIGGER IF EXISTS trigger_update_player_stats ON matches;
+CREATE TRIGGER trigger_update_player_stats
+    AFTER INSERT ON matches
+    FOR EACH ROW
+    EXECUTE FUNCTION update_player_stats();
+
+-- =============================================================
+-- Full rebuild from matches + legacy_monthly_games
+-- =============================================================
+CREATE OR REPLACE FUNCTION rebuild_player_stats()
+RETURNS void AS $$
+BEGIN
+    DELETE FROM player_stats WHERE true;
+
+    WITH ordered AS (
+        SELECT player_id, won,
+               ROW_NUMBER() OVER (PARTITION BY player_id ORDER BY played_on DESC, created_at DESC, match_id DESC) AS rn,
+               FIRST_VALUE(won) OVER (PARTITION BY player_id ORDER BY played_on DESC, created_at DESC, match_id DESC) AS latest
+        FROM match_sides
+    ),
+    streaks AS (
+        -- Length of the leading run of results equal to the latest one
+        SELECT player_id,
+               COALESCE(MIN(rn) FILTER (WHERE won <> latest), MAX(rn) + 1) - 1 AS run,
+               BOOL_OR(latest) AS latest_won
+        FROM ordered
+        GROUP BY player_id
+    ),
+    totals AS (
+        SELECT player_id,
+               COUNT(*) FILTER (WHERE won) AS wins,
+               COUNT(*) FILTER (WHERE NOT won) AS losses,
+               SUM(games_won) AS games_won,
+               SUM(games_lost) AS games_lost,
+               MAX(played_on) AS last_match_date
+        FROM match_sides
+        GROUP BY player_id
+    ),
+    monthly AS (
+        SELECT player_id, jsonb_object_agg(period_label, games) AS monthly_games
+        FROM (
+            SELECT player_id, period_label, SUM(games) AS games
+            FROM (
+                SELECT player_id, period_label, games_won AS games FROM match_sides
+                UNION ALL
+                SELECT player_id, period_label, games FROM legacy_monthly_games
+            ) g
+            WHERE period_label IS NOT NULL
+            GROUP BY player_id, period_label
+        ) per_month
+        GROUP BY player_id
+    )
+    INSERT INTO player_stats (player_id, league_id, wins, losses, games_won, games_lost,
+                              last_match_date, streak, monthly_games)
+    SELECT p.id, p.league_id,
+           COALESCE(t.wins, 0), COALESCE(t.losses, 0),
+           COALESCE(t.games_won, 0), COALESCE(t.games_lost, 0),
+           t.last_match_date,
+           COALESCE(CASE WHEN s.latest_won THEN s.run ELSE -s.run END, 0),
+           COALESCE(mo.monthly_games, '{}'::jsonb)
+    FROM players p
+    LEFT JOIN totals t ON t.player_id = p.id
+    LEFT JOIN streaks s ON s.player_id = p.id
+    LEFT JOIN monthly mo ON mo.player_id = p.id;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- Same as 002, plus the stats rebuild
+CREATE OR REPLACE FUNCTION finish_bulk_load(recompute_totals boolean DEFAULT false)
+RETURNS void AS $$
+BEGIN
+    UPDATE bulk_load_state SET active = false, started_at = NULL WHERE id;
+
+    IF recompute_totals THEN
+        WITH totals AS (
+            SELECT player_id, SUM(games) AS games, COUNT(*) AS played
+            FROM (
+                SELECT player1_id AS player_id,
+                       CASE WHEN is_forfeit THEN 6 ELSE player1_games END AS games
+                FROM matches
+                UNION ALL
+                SELECT player2_id,
+                       CASE WHEN is_forfeit THEN 0 ELSE player2_games END
+                FROM matches
+            ) sides
+            WHERE player_id IS NOT NULL
+            GROUP BY player_id
+        )
+        UPDATE players p SET
+            total_games = COALESCE(t.games, 0),
+            matches_played = COALESCE(t.played, 0)
+        FROM players p2
+        LEFT JOIN totals t ON t.player_id = p2.id
+        WHERE p.id = p2.id;
+    END IF;
+
+    PERFORM rebuild_player_stats();
+    PERFORM recalculate_rankings();
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- New players get an empty row so the ladder embed never comes back null
+CREATE OR REPLACE FUNCTION create_player_stats()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO player_stats (player_id, league_id) VALUES (NEW.id, NEW.league_id)
+    ON CONFLICT (player_id) DO NOTHING;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+DROP TRIGGER IF EXISTS trigger_create_player_stats ON players;
+CREATE TRIGGER trigger_create_player_stats
+    AFTER INSERT ON players
+    FOR EACH ROW
+    EXECUTE FUNCTION create_player_stats();
+
+SELECT rebuild_player_stats();
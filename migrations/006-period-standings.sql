@@ -0,0 +1,122 @@
+-- =============================================================
+-- 006: Per-period standings rollup
+-- Run in Supabase SQL Editor after 005
+--
+-- One row per (player, period) with that period's games and results,
+-- so a historical leaderboard ("who led in June 2025") is one index
+-- range read instead of a scan of matches. Kept current by a trigger
+-- on matches; legacy spreadsheet months come from legacy_monthly_games.
+-- Served by GET /api/standings?period=.
+-- =============================================================
+
+CREATE TABLE IF NOT EXISTS player_period_stats (
+    player_id UUID NOT NULL REFERENCES players(id) ON DELETE CASCADE,
+    league_id UUID NOT NULL REFERENCES league_settings(id) ON DELETE CASCADE,
+    period_label VARCHAR(30) NOT NULL,
+    games_won INTEGER NOT NULL DEFAULT 0,
+    games_lost INTEGER NOT NULL DEFAULT 0,
+    wins INTEGER NOT NULL DEFAULT 0,
+    losses INTEGER NOT NULL DEFAULT 0,
+    matches_played INTEGER NOT NULL DEFAULT 0, -- 0 for legacy-only months
+    updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (player_id, period_label)
+);
+
+-- The leaderboard read: one league, one period, best first
+CREATE INDEX IF NOT EXISTS idx_period_stats_board
+    ON player_period_stats(league_id, period_label, games_won DESC);
+
+ALTER TABLE player_period_stats ENABLE ROW LEVEL SECURITY;
+CREATE POLICY "Period stats in league" ON player_period_stats FOR SELECT USING (league_id = current_league_id());
+
+-- Fold one new match into both players' period rows
+CREATE OR REPLACE FUNCTION update_period_stats()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF bulk_load_active() THEN
+        RETURN NEW;
+    END IF;
+
+    INSERT INTO player_period_stats AS s (player_id, league_id, period_label, games_won, games_lost,
+                                          wins, losses, matches_played)
+    SELECT side.player_id, side.league_id, side.period_label, side.games_won, side.games_lost,
+           side.won::int, (NOT side.won)::int, 1
+    FROM match_sides side
+    WHERE side.match_id = NEW.id
+    ON CONFLICT (player_id, period_label) DO UPDATE SET
+        games_won = s.games_won + EXCLUDED.games_won,
+        games_lost = s.games_lost + EXCLUDED.games_lost,
+        wins = s.wins + EXCLUDED.wins,
+        losses = s.losses + EXCLUDED.losses,
+        matches_played = s.matches_played + 1,
+        updated_at = NOW();
+
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+DROP TRIGGER IF EXISTS trigger_update_period_stats ON matches;
+CREATE TRIGGER trigger_update_period_stats
+    AFTER INSERT ON matches
+    FOR EACH ROW
+    EXECUTE FUNCTION update_period_stats();
+
+CREATE OR REPLACE FUNCTION rebuild_period_stats()
+RETURNS void AS $$
+BEGIN
+    DELETE FROM player_period_stats WHERE true;
+
+    INSERT INTO player_period_stats (player_id, league_id, period_label, games_won, games_lost,
+                                     wins, losses, matches_played)
+    SELECT g.player_id, p.league_id, g.period_label,
+           SUM(g.games_won), SUM(g.games_lost), SUM(g.wins), SUM(g.losses), SUM(g.played)
+    FROM (
+        SELECT player_id, period_label, games_won, games_lost,
+               won::int AS wins, (NOT won)::int AS losses, 1 AS played
+        FROM match_sides
+        UNION ALL
+        SELECT player_id, period_label, games, 0, 0, 0, 0
+        FROM legacy_monthly_games
+    ) g
+    JOIN players p ON p.id = g.player_id
+    WHERE g.period_label IS NOT NULL
+    GROUP BY g.player_id, p.league_id, g.period_label;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- Same as 005, plus the period rollup
+CREATE OR REPLACE FUNCTION finish_bulk_load(recompute_totals boolean DEFAULT false)
+RETURNS void AS $$
+BEGIN
+    UPDATE bulk_load_state SET active = false, started_at = NULL WHERE id;
+
+    IF recompute_totals THEN
+        WITH totals AS (
+            SELECT player_id, SUM(games) AS games, COUNT(*) AS played
+            FROM (
+                SELECT player1_id AS player_id,
+                       CASE WHEN is_forfeit THEN 6 ELSE player1_games END AS games
+                FROM matches
+                UNION ALL
+                SELECT player2_id,
+                       CASE WHEN is_forfeit THEN 0 ELSE player2_games END
+                FROM matches
+            ) sides
+            WHERE player_id IS NOT NULL
+            GROUP BY player_id
+        )
+        UPDATE players p SET
+            total_games = COALESCE(t.games, 0),
+            matches_played = COALESCE(t.played, 0)
+        FROM players p2
+        LEFT JOIN totals t ON t.player_id = p2.id
+        WHERE p.id = p2.id;
+    END IF;
+
+    PERFORM rebuild_player_stats();
+    PERFORM rebuild_period_stats();
+    PERFORM recalculate_rankings();
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+SELECT rebuild_period_stats();
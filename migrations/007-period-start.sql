@@ -0,0 +1,69 @@
+-- =============================================================
+-- 007: Date-typed periods
+-- Run in Supabase SQL Editor after 006
+--
+-- period_label ("January 2025") stays for display; period_start is
+-- the first day of the period as a DATE, so period lookups are index
+-- equality/range reads ("everything before this month") instead of
+-- string comparisons that scan every old row. A trigger fills
+-- period_start from the label when a writer doesn't send it.
+-- =============================================================
+
+-- "January 2025" -> 2025-01-01, "Q2 2025" -> 2025-04-01, "Week 5 2025" -> Monday of ISO week 5.
+-- Month names are parsed with 'FMMonth', which is always English (no TM prefix).
+CREATE OR REPLACE FUNCTION period_label_start(label text)
+RETURNS date AS $$
+    SELECT CASE
+        WHEN label ~* '^\s*Q[1-4]\s+\d{4}\s*$' THEN
+            make_date(substring(label FROM '\d{4}')::int,
+                      (substring(label FROM '[Qq]([1-4])')::int - 1) * 3 + 1, 1)
+        WHEN label ~* '^\s*Week\s+\d{1,2}\s+\d{4}\s*$' THEN
+            to_date(substring(label FROM '(\d{4})\s*$') || '-' ||
+                    substring(label FROM '(?i)Week\s+(\d{1,2})') || '-1', 'IYYY-IW-ID')
+        WHEN label ~* '^\s*[A-Za-z]+\s+\d{4}\s*$' THEN
+            to_date(btrim(label), 'FMMonth YYYY')
+    END;
+$$ LANGUAGE sql STABLE;
+
+CREATE OR REPLACE FUNCTION set_period_start()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF NEW.period_start IS NULL
+       OR (TG_OP = 'UPDATE' AND NEW.period_label IS DISTINCT FROM OLD.period_label
+           AND NEW.period_start IS NOT DISTINCT FROM OLD.period_start) THEN
+        NEW.period_start := period_label_start(NEW.period_label);
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+DECLARE
+    t text;
+BEGIN
+    FOREACH t IN ARRAY ARRAY['matches', 'match_assignments', 'player_period_stats', 'legacy_monthly_games'] LOOP
+        EXECUTE format('ALTER TABLE %I ADD COLUMN IF NOT EXISTS period_start DATE', t);
+        EXECUTE format('UPDATE %I SET period_start = period_label_start(period_label) WHERE period_start IS NULL', t);
+        EXECUTE format('DROP TRIGGER IF EXISTS trigger_%s_period_start ON %I', t, t);
+        EXECUTE format('CREATE TRIGGER trigger_%s_period_start BEFORE INSERT OR UPDATE OF period_label, period_start ON %I
+                        FOR EACH ROW EXECUTE FUNCTION set_period_start()', t, t);
+    END LOOP;
+END $$;
+
+-- Assignments: this period's pairings / reminders, and outstanding (< this period)
+CREATE INDEX IF NOT EXISTS idx_assignments_league_period_start
+    ON match_assignments(league_id, period_start, status);
+CREATE INDEX IF NOT EXISTS idx_assignments_open_period_start
+    ON match_assignments(league_id, period_start)
+    WHERE status IN ('pending', 'accepted');
+DROP INDEX IF EXISTS idx_assignments_pending;
+DROP INDEX IF EXISTS idx_assignments_league_period;
+
+CREATE INDEX IF NOT EXISTS idx_matches_league_period_start ON matches(league_id, period_start);
+DROP INDEX IF EXISTS idx_matches_period;
+DROP INDEX IF EXISTS idx_matches_league_period;
+
+-- Standings: one league, one period, best first
+CREATE INDEX IF NOT EXISTS idx_period_stats_board_start
+    ON player_period_stats(league_id, period_start, games_won DESC);
+DROP INDEX IF EXISTS idx_period_stats_board;
@@ -0,0 +1,75 @@
+-- =============================================================
+-- 008: Indexes for the hot query predicates
+-- Run in Supabase SQL Editor after 007
+--
+-- Every index here matches one query the API runs on each request or
+-- cron job (RLS adds league_id = current_league_id() to all of them).
+-- scripts/check_query_plans.py EXPLAINs those queries on seeded data
+-- and fails if any of them falls back to a sequential scan.
+--
+-- Already covered by earlier migrations:
+--   recent matches (ORDER BY created_at DESC)  idx_matches_league_created (003)
+--   ladder (is_active, ORDER BY rank)          idx_players_league_rank (003)
+--   open assignments (status IN pending/accepted, by period_start)
+--                                              idx_assignments_open_period_start (007)
+-- =============================================================
+
+-- -------------------------------------------------------------
+-- Players by email (auth, profile, join)
+-- The API lowercases emails before looking them up, so store them
+-- lowercased too: then the plain (league_id, email) unique index is
+-- the lower(email) index, and PostgREST's eq filter can use it.
+-- -------------------------------------------------------------
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM players
+        GROUP BY league_id, lower(btrim(email))
+        HAVING COUNT(*) > 1
+    ) THEN
+        RAISE EXCEPTION 'Players differing only by email case exist - merge them before running 008';
+    END IF;
+END $$;
+
+UPDATE players SET email = lower(btrim(email)) WHERE email <> lower(btrim(email));
+
+CREATE OR REPLACE FUNCTION normalize_player_email()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.email := lower(btrim(NEW.email));
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_normalize_player_email ON players;
+CREATE TRIGGER trigger_normalize_player_email BEFORE INSERT OR UPDATE OF email ON players
+    FOR EACH ROW EXECUTE FUNCTION normalize_player_email();
+
+ALTER TABLE players DROP CONSTRAINT IF EXISTS players_email_lowercase;
+ALTER TABLE players ADD CONSTRAINT players_email_lowercase CHECK (email = lower(email));
+
+-- Superseded by idx_players_league_email (003)
+DROP INDEX IF EXISTS idx_players_email;
+
+-- -------------------------------------------------------------
+-- Blocked pairs for pairing (would_play_again = false, no player filter)
+-- Only the few "no" rows are indexed, with both ids included so the
+-- read is index-only.
+-- -------------------------------------------------------------
+CREATE INDEX IF NOT EXISTS idx_feedback_blocks
+    ON match_feedback(league_id) INCLUDE (from_player_id, about_player_id)
+    WHERE would_play_again = false;
+DROP INDEX IF EXISTS idx_feedback_league_blocks;
+
+-- -------------------------------------------------------------
+-- Availability lookup for the monthly cron (is_available = true)
+-- -------------------------------------------------------------
+CREATE INDEX IF NOT EXISTS idx_availability_available
+    ON player_availability(player_id) INCLUDE (day_of_week, time_slot)
+    WHERE is_available = true;
+
+-- -------------------------------------------------------------
+-- Active, non-admin roster for pairing and the monthly cron
+-- -------------------------------------------------------------
+CREATE INDEX IF NOT EXISTS idx_players_league_pairable
+    ON players(league_id) WHERE is_active = true AND is_admin = false;
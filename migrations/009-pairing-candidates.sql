@@ -0,0 +1,76 @@
+-- =============================================================
+-- 009: Server-side pairing candidates
+-- Run in Supabase SQL Editor after 008
+--
+-- pairing_candidates(k) scores every pair of pairable players in the
+-- caller's league inside the database and returns only each player's
+-- k best opponents, so POST /api/pairings no longer downloads the block
+-- list and match history. Blocked pairs are never returned.
+--
+-- The score is pair_score() in api/pairings.py; keep the two in step:
+--   50 - 25 * skill difference
+--   - min(10, rating gap / 20)
+--   + 15 if they haven't met in the last recent_limit matches,
+--     else - 5 per recent meeting
+-- =============================================================
+
+-- Same buckets as skill_to_numeric() in api/pairings.py
+CREATE OR REPLACE FUNCTION skill_numeric(skill_level text)
+RETURNS numeric AS $$
+    SELECT CASE
+        WHEN skill_level IS NULL OR skill_level = '' THEN 3.0
+        WHEN skill_level LIKE '%4.5%' THEN 4.5
+        WHEN skill_level LIKE '%4.0%' THEN 4.0
+        WHEN skill_level LIKE '%3.5+%' THEN 3.75
+        WHEN skill_level LIKE '%3.5%' THEN 3.5
+        WHEN skill_level LIKE '%3.0%' THEN 3.0
+        ELSE 2.5
+    END;
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION pairing_candidates(k integer DEFAULT 10, recent_limit integer DEFAULT 200)
+RETURNS TABLE (player_id uuid, candidate_id uuid, score numeric) AS $$
+    WITH pool AS (
+        -- idx_players_league_pairable (008)
+        SELECT id, skill_numeric(skill_level) AS skill, COALESCE(rating, 1500) AS rating
+        FROM players
+        WHERE league_id = current_league_id()
+          AND is_active = true AND is_admin = false
+          AND (unavailable_until IS NULL OR unavailable_until <= CURRENT_DATE)
+    ),
+    recent AS (
+        -- idx_matches_league_created (003)
+        SELECT LEAST(player1_id, player2_id) AS a, GREATEST(player1_id, player2_id) AS b, COUNT(*) AS times
+        FROM (
+            SELECT player1_id, player2_id FROM matches
+            WHERE league_id = current_league_id()
+            ORDER BY created_at DESC
+            LIMIT recent_limit
+        ) m
+        GROUP BY 1, 2
+    ),
+    blocked AS (
+        -- idx_feedback_blocks (008)
+        SELECT DISTINCT LEAST(from_player_id, about_player_id) AS a,
+                        GREATEST(from_player_id, about_player_id) AS b
+        FROM match_feedback
+        WHERE league_id = current_league_id() AND would_play_again = false
+    )
+    SELECT p1.id, c.id, c.score
+    FROM pool p1
+    CROSS JOIN LATERAL (
+        SELECT p2.id,
+               50 - ABS(p1.skill - p2.skill) * 25
+                  - LEAST(10, ABS(p1.rating - p2.rating) / 20)
+                  + CASE WHEN r.times IS NULL THEN 15 ELSE -5 * r.times END AS score
+        FROM pool p2
+        LEFT JOIN recent r ON r.a = LEAST(p1.id, p2.id) AND r.b = GREATEST(p1.id, p2.id)
+        WHERE p2.id <> p1.id
+          AND NOT EXISTS (
+              SELECT 1 FROM blocked bl
+              WHERE bl.a = LEAST(p1.id, p2.id) AND bl.b = GREATEST(p1.id, p2.id)
+          )
+        ORDER BY score DESC, p2.id
+        LIMIT k
+    ) c;
+$$ LANGUAGE sql STABLE;
@@ -0,0 +1,25 @@
+-- =============================================================
+-- 010: Memoized pairing runs
+-- Run in Supabase SQL Editor after 009
+--
+-- Every pairing run is stored under a hash of its inputs (roster,
+-- blocks / history or database candidates, seed, engine parameters -
+-- see api/_pairing_runs.py). A retry, preview or cron run with the
+-- same inputs reads the stored result instead of recomputing it.
+-- =============================================================
+
+CREATE TABLE IF NOT EXISTS pairing_runs (
+    id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+    league_id UUID NOT NULL DEFAULT current_league_id() REFERENCES league_settings(id) ON DELETE CASCADE,
+    input_hash CHAR(64) NOT NULL, -- sha256 hex
+    seed BIGINT,                  -- NULL = roster order breaks ties
+    params JSONB NOT NULL,        -- engine version + weights the result was computed with
+    result JSONB NOT NULL,        -- {"pairs": [[player1_id, player2_id, score], ...], "skipped": [player_id, ...]}
+    period_start DATE,            -- period it was first computed for (informational)
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    UNIQUE (league_id, input_hash)
+);
+
+ALTER TABLE pairing_runs ENABLE ROW LEVEL SECURITY;
+CREATE POLICY "Pairing runs in league" ON pairing_runs FOR SELECT USING (league_id = current_league_id());
+CREATE POLICY "Pairing runs insertable in league" ON pairing_runs FOR INSERT WITH CHECK (league_id = current_league_id());
@@ -0,0 +1,141 @@
+-- =============================================================
+-- 011: Maintained decline counts and engagement status
+-- Run in Supabase SQL Editor after 010
+--
+-- players.decline_count and players.engagement_status are kept current
+-- by a trigger on match_assignments.declined_by (set by POST
+-- /api/decline), so "who should we check in with" is a column lookup
+-- instead of the player_engagement view's OR-join over every
+-- assignment. Three or more declines = 'check_in' (same rule as the
+-- original view, which now reads the columns).
+--
+-- The trigger is skipped during a bulk load (002); finish_bulk_load()
+-- rebuilds the counts once instead.
+-- =============================================================
+
+ALTER TABLE players ADD COLUMN IF NOT EXISTS decline_count INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE players ADD COLUMN IF NOT EXISTS engagement_status VARCHAR(20) NOT NULL DEFAULT 'active';
+
+CREATE INDEX IF NOT EXISTS idx_players_league_check_in
+    ON players(league_id) WHERE engagement_status = 'check_in';
+
+-- Rematch lineage: every rematch points at the original assignment
+CREATE INDEX IF NOT EXISTS idx_assignments_original
+    ON match_assignments(original_assignment_id) WHERE original_assignment_id IS NOT NULL;
+
+CREATE OR REPLACE FUNCTION engagement_status_for(declines integer)
+RETURNS varchar AS $$
+    SELECT CASE WHEN declines >= 3 THEN 'check_in' ELSE 'active' END;
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION bump_decline_count(player uuid, delta integer)
+RETURNS void AS $$
+    UPDATE players SET
+        decline_count = GREATEST(0, decline_count + delta),
+        engagement_status = engagement_status_for(GREATEST(0, decline_count + delta))
+    WHERE id = player;
+$$ LANGUAGE sql SECURITY DEFINER;
+
+CREATE OR REPLACE FUNCTION update_decline_count()
+RETURNS TRIGGER AS $$
+DECLARE
+    old_decliner uuid;
+    new_decliner uuid;
+BEGIN
+    IF bulk_load_active() THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        old_decliner := OLD.declined_by;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        new_decliner := NEW.declined_by;
+    END IF;
+
+    IF old_decliner IS DISTINCT FROM new_decliner THEN
+        IF old_decliner IS NOT NULL THEN
+            PERFORM bump_decline_count(old_decliner, -1);
+        END IF;
+        IF new_decliner IS NOT NULL THEN
+            PERFORM bump_decline_count(new_decliner, 1);
+        END IF;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+DROP TRIGGER IF EXISTS trigger_update_decline_count ON match_assignments;
+CREATE TRIGGER trigger_update_decline_count
+    AFTER INSERT OR UPDATE OF declined_by OR DELETE ON match_assignments
+    FOR EACH ROW EXECUTE FUNCTION update_decline_count();
+
+CREATE OR REPLACE FUNCTION rebuild_decline_counts()
+RETURNS void AS $$
+BEGIN
+    UPDATE players p SET
+        decline_count = COALESCE(d.declines, 0),
+        engagement_status = engagement_status_for(COALESCE(d.declines, 0)::int)
+    FROM players p2
+    LEFT JOIN (
+        SELECT declined_by, COUNT(*) AS declines
+        FROM match_assignments
+        WHERE declined_by IS NOT NULL
+        GROUP BY declined_by
+    ) d ON d.declined_by = p2.id
+    WHERE p.id = p2.id;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- Same as 006, plus decline counts
+CREATE OR REPLACE FUNCTION finish_bulk_load(recompute_totals boolean DEFAULT false)
+RETURNS void AS $$
+BEGIN
+    UPDATE bulk_load_state SET active = false, started_at = NULL WHERE id;
+
+    IF recompute_totals THEN
+        WITH totals AS (
+            SELECT player_id, SUM(games) AS games, COUNT(*) AS played
+            FROM (
+                SELECT player1_id AS player_id,
+                       CASE WHEN is_forfeit THEN 6 ELSE player1_games END AS games
+                FROM matches
+                UNION ALL
+                SELECT player2_id,
+                       CASE WHEN is_forfeit THEN 0 ELSE player2_games END
+                FROM matches
+            ) sides
+            WHERE player_id IS NOT NULL
+            GROUP BY player_id
+        )
+        UPDATE players p SET
+            total_games = COALESCE(t.games, 0),
+            matches_played = COALESCE(t.played, 0)
+        FROM players p2
+        LEFT JOIN totals t ON t.player_id = p2.id
+        WHERE p.id = p2.id;
+    END IF;
+
+    PERFORM rebuild_player_stats();
+    PERFORM rebuild_period_stats();
+    PERFORM rebuild_decline_counts();
+    PERFORM recalculate_rankings();
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+SELECT rebuild_decline_counts();
+
+-- Same columns (and types) as before, read straight off players (no assignment join).
+-- total_assignments is two index counts instead of an OR join.
+CREATE INDEX IF NOT EXISTS idx_assignments_player2 ON match_assignments(player2_id);
+
+CREATE OR REPLACE VIEW player_engagement WITH (security_invoker = true) AS
+SELECT
+    p.id,
+    p.name,
+    (SELECT COUNT(*) FROM match_assignments WHERE player1_id = p.id)
+      + (SELECT COUNT(*) FROM match_assignments WHERE player2_id = p.id) AS total_assignments,
+    p.decline_count::bigint AS times_declined,
+    p.engagement_status::text AS engagement_status
+FROM players p
+WHERE p.is_admin = false;
@@ -0,0 +1,111 @@
+-- =============================================================
+-- 012: Numeric skill rating
+-- Run in Supabase SQL Editor after 011
+--
+-- skill_level stays as the free-text label players see ("3.5+
+-- Intermediate+"); skill_rating is its number (SKILL_RATINGS in
+-- api/config.py: 4.5, 4.0, 3.75, 3.5, 3.0, 2.5), filled by a trigger on
+-- every write so it can't drift. Pairing reads the column instead of
+-- parsing labels, and skill-band queries (monthly shards) are index
+-- range scans.
+-- =============================================================
+
+-- skill_numeric() (009) is the SQL twin of skill_to_numeric() / SKILL_RATINGS
+ALTER TABLE players ADD COLUMN IF NOT EXISTS skill_rating NUMERIC(3,2);
+
+CREATE OR REPLACE FUNCTION set_skill_rating()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.skill_rating := skill_numeric(NEW.skill_level);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_set_skill_rating ON players;
+CREATE TRIGGER trigger_set_skill_rating BEFORE INSERT OR UPDATE OF skill_level, skill_rating ON players
+    FOR EACH ROW EXECUTE FUNCTION set_skill_rating();
+
+UPDATE players SET skill_rating = skill_numeric(skill_level)
+WHERE skill_rating IS DISTINCT FROM skill_numeric(skill_level);
+
+ALTER TABLE players ALTER COLUMN skill_rating SET NOT NULL;
+
+-- Skill bands of the pairable roster (monthly shards: skill_rating BETWEEN tier bounds)
+CREATE INDEX IF NOT EXISTS idx_players_league_skill
+    ON players(league_id, skill_rating) WHERE is_active = true AND is_admin = false;
+
+-- Same as 009, reading skill_rating
+CREATE OR REPLACE FUNCTION pairing_candidates(k integer DEFAULT 10, recent_limit integer DEFAULT 200)
+RETURNS TABLE (player_id uuid, candidate_id uuid, score numeric) AS $$
+    WITH pool AS (
+        -- idx_players_league_pairable (008)
+        SELECT id, skill_rating AS skill, COALESCE(rating, 1500) AS rating
+        FROM players
+        WHERE league_id = current_league_id()
+          AND is_active = true AND is_admin = false
+          AND (unavailable_until IS NULL OR unavailable_until <= CURRENT_DATE)
+    ),
+    recent AS (
+        -- idx_matches_league_created (003)
+        SELECT LEAST(player1_id, player2_id) AS a, GREATEST(player1_id, player2_id) AS b, COUNT(*) AS times
+        FROM (
+            SELECT player1_id, player2_id FROM matches
+            WHERE league_id = current_league_id()
+            ORDER BY created_at DESC
+            LIMIT recent_limit
+        ) m
+        GROUP BY 1, 2
+    ),
+    blocked AS (
+        -- idx_feedback_blocks (008)
+        SELECT DISTINCT LEAST(from_player_id, about_player_id) AS a,
+                        GREATEST(from_player_id, about_player_id) AS b
+        FROM match_feedback
+        WHERE league_id = current_league_id() AND would_play_again = false
+    )
+    SELECT p1.id, c.id, c.score
+    FROM pool p1
+    CROSS JOIN LATERAL (
+        SELECT p2.id,
+               50 - ABS(p1.skill - p2.skill) * 25
+                  - LEAST(10, ABS(p1.rating - p2.rating) / 20)
+                  + CASE WHEN r.times IS NULL THEN 15 ELSE -5 * r.times END AS score
+        FROM pool p2
+        LEFT JOIN recent r ON r.a = LEAST(p1.id, p2.id) AND r.b = GREATEST(p1.id, p2.id)
+        WHERE p2.id <> p1.id
+          AND NOT EXISTS (
+              SELECT 1 FROM blocked bl
+              WHERE bl.a = LEAST(p1.id, p2.id) AND bl.b = GREATEST(p1.id, p2.id)
+          )
+        ORDER BY score DESC, p2.id
+        LIMIT k
+    ) c;
+$$ LANGUAGE sql STABLE;
+
+-- Same columns as before; skill_diff from the column instead of two LIKE chains
+-- (which also disagreed with the app on 3.0 vs 2.5)
+CREATE OR REPLACE VIEW player_match_compatibility WITH (security_invoker = true) AS
+SELECT
+    p1.id as player1_id,
+    p1.name as player1_name,
+    p2.id as player2_id,
+    p2.name as player2_name,
+    -- Skill difference (lower = better match)
+    ABS(p1.skill_rating - p2.skill_rating)::numeric as skill_diff,
+    -- How many times they've played
+    (SELECT COUNT(*) FROM matches m
+     WHERE (m.player1_id = p1.id AND m.player2_id = p2.id)
+        OR (m.player1_id = p2.id AND m.player2_id = p1.id)
+    ) as times_played,
+    -- Is this pair blocked?
+    EXISTS (
+        SELECT 1 FROM blocked_pairs bp
+        WHERE (bp.player_a = LEAST(p1.id, p2.id) AND bp.player_b = GREATEST(p1.id, p2.id))
+    ) as is_blocked
+FROM players p1
+CROSS JOIN players p2
+WHERE p1.id < p2.id  -- Avoid duplicates
+  AND p1.is_active = true
+  AND p2.is_active = true
+  AND p1.is_admin = false
+  AND p2.is_admin = false;
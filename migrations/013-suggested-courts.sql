@@ -0,0 +1,11 @@
+-- =============================================================
+-- 013: Court suggestions on assignments
+-- Run in Supabase SQL Editor after 012
+--
+-- suggested_courts holds the courts api/_courts.py ranked for the pair
+-- from both players' player_court_preferences, best first, e.g.
+-- ["Vermont Canyon", "Echo Park", "Hermon Park"]. Courts either player
+-- marked "never" (preference_level 5) are never suggested.
+-- =============================================================
+
+ALTER TABLE match_assignments ADD COLUMN IF NOT EXISTS suggested_courts JSONB NOT NULL DEFAULT '[]'::jsonb;
@@ -0,0 +1,11 @@
+-- =============================================================
+-- 014: Suggested match slot on assignments
+-- Run in Supabase SQL Editor after 013
+--
+-- suggested_slot is the one (court, day, time slot) api/_scheduling.py
+-- picked for the pair, e.g. {"court": "Echo Park", "day": 0, "time":
+-- "evening"} (day 0 = Sunday, as in player_availability). NULL when the
+-- players share no available slot or every option was at capacity.
+-- =============================================================
+
+ALTER TABLE match_assignments ADD COLUMN IF NOT EXISTS suggested_slot JSONB;
@@ -0,0 +1,12 @@
+-- =============================================================
+-- 015: Indexes for one player's assignments and matches
+-- Run in Supabase SQL Editor after 014
+--
+-- /api/dashboard loads a player's open assignments and recent matches
+-- with player1_id = me OR player2_id = me. The player1 side is covered
+-- by the (player1_id, player2_id) indexes from the base schema and
+-- idx_assignments_player2 (011) covers assignments; matches had no
+-- index on player2_id, so half of that OR read the whole table.
+-- =============================================================
+
+CREATE INDEX IF NOT EXISTS idx_matches_player2 ON matches(player2_id);
@@ -0,0 +1,111 @@
+-- =============================================================
+-- 016: Change feed
+-- Run in Supabase SQL Editor after 015
+--
+-- Every insert, update and delete on players, matches and
+-- match_assignments - from the API, cron jobs or the Supabase
+-- dashboard - appends one row to change_events. Consumers keep the
+-- last seq they processed and read what came after it (/api/changes,
+-- api/_changes.py): the shared cache retires the affected tags, the
+-- ladder snapshot skips rebuilds when no ladder column changed, and
+-- backups record deletions.
+--
+-- Updates that change nothing but updated_at (recalculate_rankings()
+-- rewrites every rank) are not recorded.
+--
+-- seq must only ever grow in commit order, or a consumer could pass a
+-- seq whose transaction commits later. Appends take a per-league
+-- transaction lock, so a league's events are numbered one transaction
+-- at a time. Writes to these tables are a few per minute, and the lock
+-- is released as soon as the writing transaction commits.
+-- =============================================================
+
+CREATE TABLE IF NOT EXISTS change_events (
+    seq BIGSERIAL PRIMARY KEY,
+    league_id UUID NOT NULL REFERENCES league_settings(id) ON DELETE CASCADE,
+    table_name TEXT NOT NULL,         -- players / matches / match_assignments
+    op CHAR(1) NOT NULL,              -- I(nsert) / U(pdate) / D(elete)
+    row_id UUID NOT NULL,
+    changed_columns TEXT[],           -- updates only
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+);
+
+-- Consumers read one league's events after a cursor
+CREATE INDEX IF NOT EXISTS idx_change_events_league_seq ON change_events(league_id, seq);
+
+ALTER TABLE change_events ENABLE ROW LEVEL SECURITY;
+DROP POLICY IF EXISTS "Change events in league" ON change_events;
+CREATE POLICY "Change events in league" ON change_events FOR SELECT USING (league_id = current_league_id());
+
+-- Highest seq removed by prune_change_events(); a consumer whose cursor
+-- is below it has missed events and must refresh everything
+CREATE TABLE IF NOT EXISTS change_feed_state (
+    id BOOLEAN PRIMARY KEY DEFAULT true CHECK (id), -- single row
+    pruned_through BIGINT NOT NULL DEFAULT 0
+);
+INSERT INTO change_feed_state (id) VALUES (true) ON CONFLICT (id) DO NOTHING;
+
+ALTER TABLE change_feed_state ENABLE ROW LEVEL SECURITY;
+DROP POLICY IF EXISTS "Change feed state viewable" ON change_feed_state;
+CREATE POLICY "Change feed state viewable" ON change_feed_state FOR SELECT USING (true);
+
+CREATE OR REPLACE FUNCTION record_change_event()
+RETURNS TRIGGER AS $$
+DECLARE
+    changed TEXT[];
+    league UUID;
+    changed_id UUID;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        league := OLD.league_id;
+        changed_id := OLD.id;
+    ELSE
+        league := NEW.league_id;
+        changed_id := NEW.id;
+    END IF;
+
+    IF TG_OP = 'UPDATE' THEN
+        SELECT array_agg(n.key ORDER BY n.key) INTO changed
+        FROM jsonb_each(to_jsonb(NEW)) n
+        WHERE n.key <> 'updated_at' AND n.value IS DISTINCT FROM to_jsonb(OLD) -> n.key;
+        IF changed IS NULL THEN
+            RETURN NULL;
+        END IF;
+    END IF;
+
+    -- Number this league's events one transaction at a time (see header)
+    PERFORM pg_advisory_xact_lock(hashtext('change_events'), hashtext(league::text));
+    INSERT INTO change_events (league_id, table_name, op, row_id, changed_columns)
+    VALUES (league, TG_TABLE_NAME, left(TG_OP, 1), changed_id, changed);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+DROP TRIGGER IF EXISTS trigger_players_change_event ON players;
+CREATE TRIGGER trigger_players_change_event AFTER INSERT OR UPDATE OR DELETE ON players
+    FOR EACH ROW EXECUTE FUNCTION record_change_event();
+
+DROP TRIGGER IF EXISTS trigger_matches_change_event ON matches;
+CREATE TRIGGER trigger_matches_change_event AFTER INSERT OR UPDATE OR DELETE ON matches
+    FOR EACH ROW EXECUTE FUNCTION record_change_event();
+
+DROP TRIGGER IF EXISTS trigger_assignments_change_event ON match_assignments;
+CREATE TRIGGER trigger_assignments_change_event AFTER INSERT OR UPDATE OR DELETE ON match_assignments
+    FOR EACH ROW EXECUTE FUNCTION record_change_event();
+
+-- Drop events older than keep_days (run from the SQL editor or a scheduled job)
+CREATE OR REPLACE FUNCTION prune_change_events(keep_days integer DEFAULT 30)
+RETURNS bigint AS $$
+DECLARE
+    horizon BIGINT;
+BEGIN
+    SELECT MAX(seq) INTO horizon FROM change_events
+    WHERE created_at < NOW() - make_interval(days => keep_days);
+    IF horizon IS NULL THEN
+        RETURN 0;
+    END IF;
+    DELETE FROM change_events WHERE seq <= horizon;
+    UPDATE change_feed_state SET pruned_through = GREATEST(pruned_through, horizon) WHERE id;
+    RETURN horizon;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
@@ -0,0 +1,123 @@
+-- =============================================================
+-- 017: Transaction-scoped bulk loads, maintenance RPCs for the
+--      service role only
+-- Run in Supabase SQL Editor after 016
+--
+-- Postgres lets PUBLIC execute new functions, so every SECURITY
+-- DEFINER function below was callable through /rpc/ with the public
+-- anon key. begin_bulk_load() in particular switched off the totals,
+-- ranking, stats and decline triggers for every league until someone
+-- called finish_bulk_load(), and matches reported meanwhile were never
+-- counted.
+--
+-- The bypass is now a transaction-local setting: bulk_upsert() sets
+-- networth.bulk_load for its own transaction, so only the rows it
+-- writes skip the per-row triggers and a live match report in another
+-- transaction is counted as usual. scripts/restore.py sends each batch
+-- through bulk_upsert() and calls finish_bulk_load() once at the end;
+-- both need the service role key.
+-- =============================================================
+
+CREATE OR REPLACE FUNCTION bulk_load_active()
+RETURNS boolean AS $$
+    SELECT COALESCE(current_setting('networth.bulk_load', true), '') = 'on';
+$$ LANGUAGE sql STABLE;
+
+DROP FUNCTION IF EXISTS begin_bulk_load();
+DROP TABLE IF EXISTS bulk_load_state;
+
+-- Upsert a batch of rows (a JSON array of objects with the same keys)
+-- into target with the per-row triggers skipped. conflict: the
+-- comma-separated conflict columns. with_rows: return the stored rows.
+CREATE OR REPLACE FUNCTION bulk_upsert(target text, batch jsonb, conflict text DEFAULT 'id',
+                                       with_rows boolean DEFAULT false)
+RETURNS SETOF jsonb AS $$
+DECLARE
+    keys text[] := ARRAY(SELECT jsonb_object_keys(batch -> 0) ORDER BY 1);
+    conflict_cols text[] := string_to_array(replace(conflict, ' ', ''), ',');
+    cols text;
+    updates text;
+    upsert text;
+BEGIN
+    IF target NOT IN ('league_settings', 'players', 'player_availability', 'player_court_preferences',
+                      'matches', 'match_assignments', 'match_feedback', 'legacy_monthly_games') THEN
+        RAISE EXCEPTION 'bulk_upsert: unsupported table %', target;
+    END IF;
+    IF jsonb_array_length(batch) = 0 THEN
+        RETURN;
+    END IF;
+
+    PERFORM set_config('networth.bulk_load', 'on', true);
+
+    SELECT string_agg(quote_ident(k), ', ') INTO cols FROM unnest(keys) k;
+    SELECT string_agg(format('%1$I = EXCLUDED.%1$I', k), ', ') INTO updates
+    FROM unnest(keys) k WHERE k <> ALL (conflict_cols);
+
+    upsert := format('INSERT INTO %1$I (%2$s) SELECT %2$s FROM jsonb_populate_recordset(NULL::%1$I, $1) '
+                     'ON CONFLICT (%3$s) DO %4$s',
+                     target, cols, (SELECT string_agg(quote_ident(c), ', ') FROM unnest(conflict_cols) c),
+                     CASE WHEN updates IS NULL THEN 'NOTHING' ELSE 'UPDATE SET ' || updates END);
+    IF with_rows THEN
+        RETURN QUERY EXECUTE upsert || format(' RETURNING to_jsonb(%I.*)', target) USING batch;
+    ELSE
+        EXECUTE upsert USING batch;
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Same as 011, without the shared bulk_load_state flag
+CREATE OR REPLACE FUNCTION finish_bulk_load(recompute_totals boolean DEFAULT false)
+RETURNS void AS $$
+BEGIN
+    IF recompute_totals THEN
+        WITH totals AS (
+            SELECT player_id, SUM(games) AS games, COUNT(*) AS played
+            FROM (
+                SELECT player1_id AS player_id,
+                       CASE WHEN is_forfeit THEN 6 ELSE player1_games END AS games
+                FROM matches
+                UNION ALL
+                SELECT player2_id,
+                       CASE WHEN is_forfeit THEN 0 ELSE player2_games END
+                FROM matches
+            ) sides
+            WHERE player_id IS NOT NULL
+            GROUP BY player_id
+        )
+        UPDATE players p SET
+            total_games = COALESCE(t.games, 0),
+            matches_played = COALESCE(t.played, 0)
+        FROM players p2
+        LEFT JOIN totals t ON t.player_id = p2.id
+        WHERE p.id = p2.id;
+    END IF;
+
+    PERFORM rebuild_player_stats();
+    PERFORM rebuild_period_stats();
+    PERFORM rebuild_decline_counts();
+    PERFORM recalculate_rankings();
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+REVOKE EXECUTE ON FUNCTION bulk_upsert(text, jsonb, text, boolean) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION bulk_upsert(text, jsonb, text, boolean) TO service_role;
+REVOKE EXECUTE ON FUNCTION finish_bulk_load(boolean) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION finish_bulk_load(boolean) TO service_role;
+
+-- Full rebuild of player_stats (005): only finish_bulk_load() and the SQL editor
+REVOKE EXECUTE ON FUNCTION rebuild_player_stats() FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION rebuild_player_stats() TO service_role;
+
+-- Full rebuild of player_period_stats (006)
+REVOKE EXECUTE ON FUNCTION rebuild_period_stats() FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION rebuild_period_stats() TO service_role;
+
+-- Decline counters (011): bump_decline_count() is only called by the
+-- match_assignments trigger, which runs it with its owner's rights
+REVOKE EXECUTE ON FUNCTION bump_decline_count(uuid, integer) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION rebuild_decline_counts() FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION rebuild_decline_counts() TO service_role;
+
+-- Change feed pruning (016): keep_days => 0 would force every consumer into a reset
+REVOKE EXECUTE ON FUNCTION prune_change_events(integer) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION prune_change_events(integer) TO service_role;
@@ -0,0 +1,83 @@
+-- =============================================================
+-- 018: Elo update on match insert
+-- Run in Supabase SQL Editor after 017
+--
+-- api/matches.py used to read both players' rating, rated_matches and
+-- totals, work out the new values and write them back, so two matches
+-- reported at the same time for one player lost one of the updates
+-- (and the totals were added a second time on top of
+-- update_player_games()). The rating now moves in the same transaction
+-- as the insert: the trigger locks both player rows, in id order, and
+-- applies the delta in one UPDATE.
+--
+-- match_score_p1() and the constants below are the SQL twin of
+-- api/_ratings.py (match_score, rate_match); replay_ratings.py still
+-- rebuilds everything with apply_ratings(). Bulk loads skip the
+-- trigger: restored players rows already carry their ratings.
+-- =============================================================
+
+-- Player 1's actual score in [0, 1]; NULL if there's nothing to rate
+CREATE OR REPLACE FUNCTION match_score_p1(m matches)
+RETURNS double precision AS $$
+    SELECT CASE
+        WHEN m.is_forfeit THEN 1.0
+        WHEN g1 + g2 = 0 THEN NULL
+        ELSE 0.7 * (CASE WHEN s1 > s2 THEN 1.0 WHEN s2 > s1 THEN 0.0 ELSE 0.5 END)
+             + 0.3 * g1 / (g1 + g2)
+    END
+    FROM (
+        SELECT COALESCE(m.set1_p1, 0) + COALESCE(m.set2_p1, 0) + COALESCE(m.set3_p1, 0) AS g1,
+               COALESCE(m.set1_p2, 0) + COALESCE(m.set2_p2, 0) + COALESCE(m.set3_p2, 0) AS g2,
+               (COALESCE(m.set1_p1, 0) > COALESCE(m.set1_p2, 0))::int
+                 + (COALESCE(m.set2_p1, 0) > COALESCE(m.set2_p2, 0))::int
+                 + (COALESCE(m.set3_p1, 0) > COALESCE(m.set3_p2, 0))::int AS s1,
+               (COALESCE(m.set1_p2, 0) > COALESCE(m.set1_p1, 0))::int
+                 + (COALESCE(m.set2_p2, 0) > COALESCE(m.set2_p1, 0))::int
+                 + (COALESCE(m.set3_p2, 0) > COALESCE(m.set3_p1, 0))::int AS s2
+    ) t;
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION rate_new_match()
+RETURNS TRIGGER AS $$
+DECLARE
+    score double precision;
+    r1 double precision;
+    r2 double precision;
+    n1 integer;
+    n2 integer;
+    delta double precision;
+BEGIN
+    IF bulk_load_active() OR NEW.player1_id IS NULL OR NEW.player2_id IS NULL
+       OR NEW.player1_id = NEW.player2_id THEN
+        RETURN NEW;
+    END IF;
+    score := match_score_p1(NEW);
+    IF score IS NULL THEN
+        RETURN NEW;
+    END IF;
+
+    -- Lock both rows in a fixed order so concurrent reports queue up
+    PERFORM 1 FROM players WHERE id IN (NEW.player1_id, NEW.player2_id) ORDER BY id FOR UPDATE;
+    SELECT rating, rated_matches INTO r1, n1 FROM players WHERE id = NEW.player1_id;
+    SELECT rating, rated_matches INTO r2, n2 FROM players WHERE id = NEW.player2_id;
+    IF r1 IS NULL OR r2 IS NULL THEN
+        RETURN NEW;
+    END IF;
+
+    -- K: 40 while provisional (< 10 rated matches), then 20; scale 400
+    delta := score - 1.0 / (1.0 + power(10.0, (r2 - r1) / 400.0));
+    UPDATE players SET
+        rating = CASE WHEN id = NEW.player1_id
+                      THEN round((r1 + CASE WHEN n1 < 10 THEN 40 ELSE 20 END * delta)::numeric, 2)
+                      ELSE round((r2 - CASE WHEN n2 < 10 THEN 40 ELSE 20 END * delta)::numeric, 2) END,
+        rated_matches = rated_matches + 1
+    WHERE id IN (NEW.player1_id, NEW.player2_id);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Fires before trigger_update_games (names sort), so the row locks are
+-- taken in id order before the totals update touches either player
+DROP TRIGGER IF EXISTS trigger_rate_new_match ON matches;
+CREATE TRIGGER trigger_rate_new_match AFTER INSERT ON matches
+    FOR EACH ROW EXECUTE FUNCTION rate_new_match();
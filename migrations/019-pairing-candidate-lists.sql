@@ -0,0 +1,18 @@
+-- =============================================================
+-- 019: Pairing candidates, one row per player
+-- Run in Supabase SQL Editor after 018
+--
+-- pairing_candidates() (009/012) returns players x k rows, and
+-- PostgREST cuts every response at db-max-rows (1000 on Supabase):
+-- with k = 10 a league of more than 100 pairable players silently lost
+-- the rest of its candidates. pairing_candidate_lists() returns the
+-- same pairs folded into one row per player, which api/pairings.py
+-- pages through in player_id order.
+-- =============================================================
+
+CREATE OR REPLACE FUNCTION pairing_candidate_lists(k integer DEFAULT 10, recent_limit integer DEFAULT 200)
+RETURNS TABLE (player_id uuid, candidates jsonb) AS $$
+    SELECT c.player_id, jsonb_object_agg(c.candidate_id, c.score)
+    FROM pairing_candidates(k, recent_limit) c
+    GROUP BY c.player_id;
+$$ LANGUAGE sql STABLE;
@@ -0,0 +1,19 @@
+-- =============================================================
+-- 020: Pairing runs written by the service role only
+-- Run in Supabase SQL Editor after 019
+--
+-- 010 let anyone with the public anon key insert into pairing_runs,
+-- so a made-up result stored under the next run's input hash would
+-- be served (and committed) as if it had been computed. Only
+-- api/_pairing_runs.py writes the table, with SUPABASE_SERVICE_ROLE_KEY,
+-- which bypasses RLS; the anon key keeps read access to its league.
+--
+-- Stored runs are only a memo, so existing rows - which can't be told
+-- apart from planted ones - are dropped and recomputed on demand.
+-- Previews made before this migration have to be run again.
+-- =============================================================
+
+DROP POLICY IF EXISTS "Pairing runs insertable in league" ON pairing_runs;
+REVOKE INSERT, UPDATE, DELETE ON pairing_runs FROM anon, authenticated;
+
+DELETE FROM pairing_runs;
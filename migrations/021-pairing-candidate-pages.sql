@@ -0,0 +1,74 @@
+-- =============================================================
+-- 021: Pairing candidates by keyset page
+-- Run in Supabase SQL Editor after 020
+--
+-- 019 folded pairing_candidates() into one row per player, but paging
+-- it with offset/limit ran the whole players x players scoring again
+-- for every page. pairing_candidate_lists() now takes a keyset:
+-- the players after after_player_id (by id), at most page_size of
+-- them, and scores only those players against the pool. api/pairings.py
+-- passes the last player_id of each page as the next after_player_id.
+--
+-- The score is pairing_candidates() (012) / pair_score() in
+-- api/pairings.py; keep all three in step.
+-- =============================================================
+
+DROP FUNCTION IF EXISTS pairing_candidate_lists(integer, integer);
+
+CREATE OR REPLACE FUNCTION pairing_candidate_lists(k integer DEFAULT 10, recent_limit integer DEFAULT 200,
+                                                   after_player_id uuid DEFAULT NULL,
+                                                   page_size integer DEFAULT 500)
+RETURNS TABLE (player_id uuid, candidates jsonb) AS $$
+    WITH pool AS (
+        -- idx_players_league_pairable (008)
+        SELECT id, skill_rating AS skill, COALESCE(rating, 1500) AS rating
+        FROM players
+        WHERE league_id = current_league_id()
+          AND is_active = true AND is_admin = false
+          AND (unavailable_until IS NULL OR unavailable_until <= CURRENT_DATE)
+    ),
+    page AS (
+        SELECT * FROM pool
+        WHERE after_player_id IS NULL OR id > after_player_id
+        ORDER BY id
+        LIMIT page_size
+    ),
+    recent AS (
+        -- idx_matches_league_created (003)
+        SELECT LEAST(player1_id, player2_id) AS a, GREATEST(player1_id, player2_id) AS b, COUNT(*) AS times
+        FROM (
+            SELECT player1_id, player2_id FROM matches
+            WHERE league_id = current_league_id()
+            ORDER BY created_at DESC
+            LIMIT recent_limit
+        ) m
+        GROUP BY 1, 2
+    ),
+    blocked AS (
+        -- idx_feedback_blocks (008)
+        SELECT DISTINCT LEAST(from_player_id, about_player_id) AS a,
+                        GREATEST(from_player_id, about_player_id) AS b
+        FROM match_feedback
+        WHERE league_id = current_league_id() AND would_play_again = false
+    )
+    SELECT p1.id, COALESCE((
+        SELECT jsonb_object_agg(c.id, c.score)
+        FROM (
+            SELECT p2.id,
+                   50 - ABS(p1.skill - p2.skill) * 25
+                      - LEAST(10, ABS(p1.rating - p2.rating) / 20)
+                      + CASE WHEN r.times IS NULL THEN 15 ELSE -5 * r.times END AS score
+            FROM pool p2
+            LEFT JOIN recent r ON r.a = LEAST(p1.id, p2.id) AND r.b = GREATEST(p1.id, p2.id)
+            WHERE p2.id <> p1.id
+              AND NOT EXISTS (
+                  SELECT 1 FROM blocked bl
+                  WHERE bl.a = LEAST(p1.id, p2.id) AND bl.b = GREATEST(p1.id, p2.id)
+              )
+            ORDER BY score DESC, p2.id
+            LIMIT k
+        ) c
+    ), '{}'::jsonb)
+    FROM page p1
+    ORDER BY p1.id;
+$$ LANGUAGE sql STABLE;
@@ -0,0 +1,57 @@
+-- =============================================================
+-- 022: One open assignment per player and period
+-- Run in Supabase SQL Editor after 021
+--
+-- api/decline.py re-pairs the period's waiting players after every
+-- decline: it reads who is waiting, pairs them and inserts the new
+-- rows. Two declines landing together both saw the same waiting
+-- players, so each inserted its own rematch for them and a player
+-- ended up with two pending matches in one month.
+--
+-- A unique index can't express "neither player1_id nor player2_id is
+-- already open in the period" (the player can be in either column),
+-- so a trigger checks it instead. It takes a transaction-scoped
+-- advisory lock per (league, period) first: concurrent inserts for
+-- the same period queue up, and each one sees the rows the previous
+-- one committed. A conflicting row fails the whole insert with
+-- unique_violation (HTTP 409 from PostgREST); rematch_period() then
+-- starts over from the stored assignments. Open means pending,
+-- accepted or completed, as in decline.OPEN_STATUSES. Bulk loads
+-- skip the check: restored rows were already written once.
+-- =============================================================
+
+CREATE OR REPLACE FUNCTION check_single_open_assignment()
+RETURNS TRIGGER AS $$
+DECLARE
+    taken uuid;
+BEGIN
+    IF bulk_load_active() OR NEW.status NOT IN ('pending', 'accepted', 'completed')
+       OR NEW.period_start IS NULL THEN
+        RETURN NEW;
+    END IF;
+
+    PERFORM pg_advisory_xact_lock(hashtext('match_assignments:' || NEW.league_id || ':' || NEW.period_start));
+
+    SELECT p INTO taken
+    FROM match_assignments a,
+         LATERAL (VALUES (a.player1_id), (a.player2_id)) AS v(p)
+    WHERE a.league_id = NEW.league_id
+      AND a.period_start = NEW.period_start
+      AND a.status IN ('pending', 'accepted', 'completed')
+      AND a.id <> NEW.id
+      AND p IN (NEW.player1_id, NEW.player2_id)
+    LIMIT 1;
+
+    IF taken IS NOT NULL THEN
+        RAISE EXCEPTION 'Player % already has an open assignment for %', taken, NEW.period_label
+            USING ERRCODE = 'unique_violation';
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- Named to fire after trigger_match_assignments_period_start (007),
+-- which fills in period_start
+DROP TRIGGER IF EXISTS trigger_match_assignments_single_open ON match_assignments;
+CREATE TRIGGER trigger_match_assignments_single_open BEFORE INSERT ON match_assignments
+    FOR EACH ROW EXECUTE FUNCTION check_single_open_assignment();
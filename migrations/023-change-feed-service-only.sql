@@ -0,0 +1,28 @@
+-- =============================================================
+-- 023: Change feed readable by the service role only
+-- Run in Supabase SQL Editor after 022
+--
+-- 016 let anyone with the public anon key select change_events for
+-- their league, so the CRON_SECRET check on /api/changes guarded
+-- nothing: the same rows (who was edited, when, which columns) came
+-- straight from PostgREST. The table is now closed to anon and
+-- authenticated, and per-league readers go through
+-- league_change_events, which only the service role may select.
+--
+-- The service role bypasses RLS, so the view does the league scoping
+-- itself. api/_changes.py reads it with SUPABASE_SERVICE_ROLE_KEY;
+-- without the key the cache falls back to TTL expiry and
+-- build_snapshot.py to fetch-and-compare. scripts/backup.py reads
+-- change_events directly, every league at once.
+-- =============================================================
+
+DROP POLICY IF EXISTS "Change events in league" ON change_events;
+REVOKE ALL ON change_events FROM anon, authenticated;
+
+CREATE OR REPLACE VIEW league_change_events AS
+    SELECT seq, table_name, op, row_id, changed_columns, created_at
+    FROM change_events
+    WHERE league_id = current_league_id();
+
+REVOKE ALL ON league_change_events FROM PUBLIC, anon, authenticated;
+GRANT SELECT ON league_change_events TO service_role;
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+NET WORTH Tennis - Incremental Database Backup
+Pages through every table with a keyset cursor on (updated_at, id) and
+streams rows to gzip-compressed NDJSON, one file per table. Nothing is
+held in memory beyond the current page.
+
+Incremental runs export only rows changed since the previous backup's
+high-water mark (kept in backups/state.json), re-reading a short overlap
+window so rows from late-committing transactions aren't lost. A full
+snapshot is taken on the first run, with --full, or when the last full
+is older than FULL_EVERY_DAYS - restores start from a full and replay
+the incrementals after it (see scripts/restore.py).
+
+With the change feed (migrations/016), incrementals also record the ids
+deleted from players, matches and match_assignments since the previous
+run - a keyset scan can't see a row that is gone - and skip scanning
+those tables when the feed shows no writes to them. If the feed was
+pruned past the stored cursor, a full snapshot is taken instead. The
+feed needs the service role key (migrations/023); with the anon key
+every run is a full snapshot.
+
+Requires migrations/001-updated-at-columns.sql. Set SUPABASE_SERVICE_ROLE_KEY
+to back up every league (the anon key only sees the default league).
+
+Usage:
+    SUPABASE_URL=... SUPABASE_ANON_KEY=... python scripts/backup.py [--full]
+
+Output:
+    backups/<timestamp>-full/players.ndjson.gz ... manifest.json
+    backups/<timestamp>-incremental/...
+    backups/state.json
+"""
+import argparse
+import gzip
+import json
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from api._changes import ALL_LEAGUES_FEED, fetch_changes, latest_cursor  # noqa: E402
+from api._db import APIError, get_admin_client  # noqa: E402
+
+BACKUP_DIR = ROOT / 'backups'
+STATE_FILE = BACKUP_DIR / 'state.json'
+
+# Parents before children, so restore.py can load them in this order
+TABLES = [
+    'league_settings',
+    'players',
+    'player_availability',
+    'player_court_preferences',
+    'matches',
+    'match_assignments',
+    'match_feedback',
+]
+
+# Tables with change-feed triggers (migrations/016)
+FEED_TABLES = {'players', 'matches', 'match_assignments'}
+
+PAGE_SIZE = 1000
+FULL_EVERY_DAYS = 28
+
+# Re-read window behind the high-water mark (see export_table); a write
+# transaction open longer than this while a backup runs can still be missed
+OVERLAP = timedelta(minutes=10)
+NIL_UUID = '00000000-0000-0000-0000-000000000000'
+
+
+def load_state():
+    try:
+        return json.loads(STATE_FILE.read_text())
+    except (OSError, ValueError):
+        return {'tables': {}, 'last_full': None, 'last_full_dir': None}
+
+
+def needs_full(state, now):
+    if not state.get('last_full'):
+        return True
+    last_full = datetime.fromisoformat(state['last_full'])
+    return now - last_full >= timedelta(days=FULL_EVERY_DAYS)
+
+
+def read_feed(supabase, cursor):
+    """
+    (tables written since cursor, {table: [deleted ids]}, new cursor), or
+    None when the feed is missing or was pruned past cursor
+    """
+    try:
+        written, last_op = set(), {}
+        while True:
+            page = fetch_changes(supabase, cursor, feed=ALL_LEAGUES_FEED)
+            if page['reset']:
+                return None
+            for e in page['events']:
+                written.add(e['table_name'])
+                last_op[(e['table_name'], e['row_id'])] = e['op']
+            cursor = page['cursor']
+            if not page['has_more']:
+                break
+    except APIError:
+        return None
+
+    deleted = {}
+    for (table, row_id), op in last_op.items():
+        if op == 'D':
+            deleted.setdefault(table, []).append(row_id)
+    return written, deleted, cursor
+
+
+def parse_ts(value):
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+def iter_pages(supabase, table, cursor):
+    """Yield pages of rows ordered by (updated_at, id), starting after cursor"""
+    while True:
+        query = supabase.table(table).select('*')
+        if cursor:
+            ts, row_id = cursor['updated_at'], cursor['id']
+            query = query.or_(f'updated_at.gt."{ts}",and(updated_at.eq."{ts}",id.gt.{row_id})')
+        rows = query.order('updated_at').order('id').limit(PAGE_SIZE).execute().data
+        if not rows:
+            return
+        yield rows
+        last = rows[-1]
+        cursor = {'updated_at': last['updated_at'], 'id': last['id']}
+        if len(rows) < PAGE_SIZE:
+            return
+
+
+def export_table(supabase, table, cursor, path):
+    """
+    Stream a table to gzip NDJSON; returns (row_count, new_cursor).
+
+    updated_at is the writing transaction's start time, so a row can
+    commit after a backup has already read past its timestamp. Each run
+    therefore re-reads OVERLAP before the high-water mark and skips the
+    row versions the previous run exported (cursor['seen']: id ->
+    updated_at for the rows in that window).
+    """
+    start, seen = None, {}
+    if cursor:
+        since = parse_ts(cursor['updated_at']) - OVERLAP
+        start = {'updated_at': since.isoformat(), 'id': NIL_UUID}
+        seen = cursor.get('seen', {})
+
+    count, recent = 0, {}
+    with gzip.open(path, 'wt', encoding='utf-8') as f:
+        for rows in iter_pages(supabase, table, start):
+            for row in rows:
+                recent[row['id']] = row['updated_at']
+                if seen.get(row['id']) == row['updated_at']:
+                    continue
+                f.write(json.dumps(row, separators=(',', ':')))
+                f.write('\n')
+                count += 1
+            # Only the tail window is needed next run
+            horizon = parse_ts(rows[-1]['updated_at']) - OVERLAP
+            recent = {i: ts for i, ts in recent.items() if parse_ts(ts) >= horizon}
+            cursor = {'updated_at': rows[-1]['updated_at'], 'id': rows[-1]['id'], 'seen': recent}
+    if count == 0:
+        path.unlink()
+    return count, cursor
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Incremental NDJSON backup of the ladder database')
+    parser.add_argument('--full', action='store_true', help='force a full snapshot')
+    args = parser.parse_args()
+
+    supabase = get_admin_client()
+    if not supabase:
+        print('SUPABASE_URL / SUPABASE_ANON_KEY not set')
+        return 1
+
+    now = datetime.now(timezone.utc)
+    state = load_state()
+    full = args.full or needs_full(state, now)
+
+    # Feed tables written since the last backup (None = unknown: scan them all)
+    written, deleted, change_cursor = None, {}, None
+    if not full and state.get('change_cursor') is not None:
+        feed = read_feed(supabase, state['change_cursor'])
+        if feed is None:
+            print('Change feed unavailable or pruned past the last backup, taking a full snapshot')
+            full = True
+        else:
+            written, deleted, change_cursor = feed
+    if change_cursor is None:
+        # Start following the feed; taken before the export, so later writes land in the next run
+        try:
+            change_cursor = latest_cursor(supabase, ALL_LEAGUES_FEED)
+        except APIError:
+            pass
+    mode = 'full' if full else 'incremental'
+
+    out_dir = BACKUP_DIR / f"{now.strftime('%Y%m%dT%H%M%SZ')}-{mode}"
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    manifest = {
+        'mode': mode,
+        'exported_at': now.isoformat(),
+        'base': None if full else state.get('last_full_dir'),
+        'tables': {},
+        'deleted': deleted,
+    }
+    new_cursors = dict(state.get('tables', {}))
+
+    for table in TABLES:
+        if written is not None and table in FEED_TABLES and table not in written:
+            manifest['tables'][table] = {'rows': 0, 'file': None}
+            print(f'{table}: unchanged')
+            continue
+        cursor = None if full else state.get('tables', {}).get(table)
+        path = out_dir / f'{table}.ndjson.gz'
+        count, cursor = export_table(supabase, table, cursor, path)
+        manifest['tables'][table] = {'rows': count, 'file': path.name if count else None}
+        if cursor:
+            new_cursors[table] = cursor
+        print(f'{table}: {count} rows')
+
+    (out_dir / 'manifest.json').write_text(json.dumps(manifest, indent=2) + '\n')
+
+    # Only advance the high-water marks once every table exported cleanly
+    state['tables'] = new_cursors
+    if change_cursor is not None:
+        state['change_cursor'] = change_cursor
+    if full:
+        state['last_full'] = now.isoformat()
+        state['last_full_dir'] = out_dir.name
+    STATE_FILE.write_text(json.dumps(state, indent=2) + '\n')
+
+    total = sum(t['rows'] for t in manifest['tables'].values())
+    deleted = sum(len(ids) for ids in manifest['deleted'].values())
+    print(f'{mode} backup: {total} rows, {deleted} deletions -> {out_dir.relative_to(ROOT)}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+NET WORTH Tennis - Cold Start Benchmark
+Measures, per endpoint, the time a fresh interpreter spends importing the
+handler module and creating its database client. Each measurement runs in
+its own subprocess so nothing is shared between samples.
+
+Usage:
+    python scripts/bench_cold_start.py              # current tree
+    python scripts/bench_cold_start.py --baseline   # also time supabase.create_client
+    python scripts/bench_cold_start.py --runs 10
+
+Run it on the commit before and after a change to compare. --baseline
+times the supabase-py import + create_client() that every handler used to
+pay on its first database call.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+ENDPOINTS = [
+    'api.auth',
+    'api.changes',
+    'api.dashboard',
+    'api.decline',
+    'api.email',
+    'api.health',
+    'api.join',
+    'api.matches',
+    'api.pairings',
+    'api.players',
+    'api.profile',
+    'api.standings',
+    'api.cron.monthly',
+]
+
+# Runs inside the child interpreter; prints {"import_ms": .., "client_ms": ..}
+PROBE = """
+import importlib, json, sys, time
+t0 = time.perf_counter()
+mod = importlib.import_module(sys.argv[1])
+t1 = time.perf_counter()
+getattr(mod, 'get_supabase_client', lambda: None)()
+t2 = time.perf_counter()
+print(json.dumps({"import_ms": (t1 - t0) * 1000, "client_ms": (t2 - t1) * 1000}))
+"""
+
+BASELINE_PROBE = """
+import json, time
+t0 = time.perf_counter()
+from supabase import create_client
+t1 = time.perf_counter()
+create_client("https://example.supabase.co", "anon-key")
+t2 = time.perf_counter()
+print(json.dumps({"import_ms": (t1 - t0) * 1000, "client_ms": (t2 - t1) * 1000}))
+"""
+
+
+def run_probe(code, *args):
+    env = {
+        **os.environ,
+        'SUPABASE_URL': os.environ.get('SUPABASE_URL', 'https://example.supabase.co'),
+        'SUPABASE_ANON_KEY': os.environ.get('SUPABASE_ANON_KEY', 'anon-key'),
+        'PYTHONDONTWRITEBYTECODE': '1',
+    }
+    out = subprocess.run(
+        [sys.executable, '-c', code, *args],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    if out.returncode != 0:
+        raise RuntimeError(out.stderr.strip().splitlines()[-1] if out.stderr else 'probe failed')
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def measure(code, args, runs):
+    samples = [run_probe(code, *args) for _ in range(runs)]
+    return {
+        'import_ms': statistics.median(s['import_ms'] for s in samples),
+        'client_ms': statistics.median(s['client_ms'] for s in samples),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5, help='samples per endpoint (median reported)')
+    parser.add_argument('--baseline', action='store_true', help='also time supabase-py create_client')
+    parser.add_argument('--json', action='store_true', help='print raw results as JSON')
+    args = parser.parse_args()
+
+    results = {}
+    for module in ENDPOINTS:
+        try:
+            results[module] = measure(PROBE, [module], args.runs)
+        except RuntimeError as e:
+            results[module] = {'error': str(e)}
+
+    if args.baseline:
+        try:
+            results['supabase.create_client'] = measure(BASELINE_PROBE, [], args.runs)
+        except RuntimeError as e:
+            results['supabase.create_client'] = {'error': str(e)}
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'endpoint':<26} {'import ms':>10} {'client ms':>10} {'total ms':>10}")
+    print('-' * 59)
+    for name, r in results.items():
+        if 'error' in r:
+            print(f"{name:<26} error: {r['error']}")
+            continue
+        total = r['import_ms'] + r['client_ms']
+        print(f"{name:<26} {r['import_ms']:>10.1f} {r['client_ms']:>10.1f} {total:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+NET WORTH Tennis - Engine Benchmarks
+Times the pure-Python engines on synthetic data, no database needed.
+
+- ratings: full replay of N matches (api/_ratings.replay)
+- pairing: generate_pairings() bucketed search vs scoring every remaining
+  player (the original loop), checking both give identical pairings
+- scheduling: min-cost slot assignment (api/_scheduling) for a roster's
+  worth of pairs, checking court/slot capacity is respected
+
+Usage:
+    python scripts/bench_engines.py                  # all benchmarks
+    python scripts/bench_engines.py ratings --matches 50000 --runs 5
+    python scripts/bench_engines.py pairing --roster 2000
+    python scripts/bench_engines.py scheduling --roster 1000
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from api._courts import court_weight  # noqa: E402
+from api._ratings import replay  # noqa: E402
+from api._scheduling import schedule_pairs  # noqa: E402
+from api.config import APPROVED_COURTS, COURT_SLOT_CAPACITY, TIME_SLOTS  # noqa: E402
+from api.pairings import generate_pairings, get_availability_text, pair_score, player_skill, skill_to_numeric  # noqa: E402
+
+SKILL_LEVELS = ['3.0 Beginner', '3.5 Intermediate', '3.5+ Intermediate', '4.0 Advanced', '4.5 Advanced+']
+
+
+def synthetic_matches(count, players, seed=1):
+    """Random best-of-three matches between `players` ids, spread over a few years"""
+    rng = random.Random(seed)
+    strength = [rng.gauss(0, 1) for _ in range(players)]
+    start = date(2022, 1, 1)
+    matches = []
+    for i in range(count):
+        a, b = rng.sample(range(players), 2)
+        row = {'id': i, 'player1_id': a, 'player2_id': b, 'is_forfeit': False,
+               'match_date': (start + timedelta(days=i * 1000 // count)).isoformat(), 'created_at': None}
+        sets_a = sets_b = 0
+        for n in (1, 2, 3):
+            if n == 3 and (sets_a == 2 or sets_b == 2):
+                break
+            a_wins = rng.random() < 1 / (1 + 10 ** (strength[b] - strength[a]))
+            loser = rng.randint(0, 4)
+            row[f'set{n}_p1'], row[f'set{n}_p2'] = (6, loser) if a_wins else (loser, 6)
+            sets_a += a_wins
+            sets_b += not a_wins
+        matches.append(row)
+    return matches
+
+
+def synthetic_roster(size, seed=1):
+    """Players with skill levels and ratings, plus ~2% blocked pairs and recent matches"""
+    rng = random.Random(seed)
+    players = [{'id': f'p{i:05d}', 'name': f'Player {i}', 'email': f'p{i}@example.com',
+                'skill_level': rng.choice(SKILL_LEVELS), 'rating': round(rng.gauss(1500, 120), 2)}
+               for i in range(size)]
+    for p in players:
+        p['skill_rating'] = skill_to_numeric(p['skill_level'])
+    ids = [p['id'] for p in players]
+    blocked = []
+    for _ in range(size // 50):
+        a, b = rng.sample(ids, 2)
+        blocked.append({'player_a': min(a, b), 'player_b': max(a, b)})
+    recent = [dict(zip(('player1_id', 'player2_id'), rng.sample(ids, 2))) for _ in range(200)]
+    return players, blocked, recent
+
+
+def exhaustive_pairings(players, blocked_pairs, recent_matches):
+    """The original generate_pairings loop: score every remaining player for every pick"""
+    blocked_set = set()
+    for bp in blocked_pairs:
+        blocked_set.add((bp['player_a'], bp['player_b']))
+        blocked_set.add((bp['player_b'], bp['player_a']))
+    recent_count = {}
+    for m in recent_matches:
+        key = tuple(sorted([m['player1_id'], m['player2_id']]))
+        recent_count[key] = recent_count.get(key, 0) + 1
+
+    unpaired = sorted(players, key=player_skill, reverse=True)
+    pairings, skipped = [], []
+    while len(unpaired) >= 2:
+        player1 = unpaired.pop(0)
+        best_match, best_score = None, -999
+        for i, player2 in enumerate(unpaired):
+            if (player1['id'], player2['id']) in blocked_set:
+                continue
+            score = pair_score(player1, player2, recent_count)
+            if score > best_score:
+                best_score, best_match = score, (i, player2)
+        if best_match:
+            idx, player2 = best_match
+            pairings.append({'player1': player1, 'player2': player2,
+                             'player1_availability': get_availability_text(player1),
+                             'player2_availability': get_availability_text(player2),
+                             'score': best_score})
+            unpaired.pop(idx)
+        else:
+            skipped.append(player1)
+    skipped.extend(unpaired)
+    return pairings, skipped
+
+
+def synthetic_schedule_inputs(pairs, seed=1):
+    """Pairs plus random availability (~8 of 21 slots each) and court preferences"""
+    rng = random.Random(seed)
+    slots = [(day, slot) for day in range(7) for slot in TIME_SLOTS]
+    players = [f'p{i:05d}' for i in range(pairs * 2)]
+    availability = {
+        p: [{'day': day, 'time': slot} for day, slot in rng.sample(slots, 8)]
+        for p in players
+    }
+    vectors = {
+        p: [court_weight(rng.choice([1, 2, 3, 3, 3, 4, 5])) for _ in APPROVED_COURTS]
+        for p in players
+    }
+    return list(zip(players[::2], players[1::2])), availability, vectors
+
+
+def timed(fn, runs):
+    samples = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples), max(samples)
+
+
+def bench_ratings(args):
+    matches = synthetic_matches(args.matches, args.players)
+    median, worst = timed(lambda: replay(matches), args.runs)
+    print(f'ratings: replay {args.matches} matches / {args.players} players  '
+          f'median {median:.0f}ms  max {worst:.0f}ms')
+
+
+def bench_pairing(args):
+    players, blocked, recent = synthetic_roster(args.roster)
+    fast, _ = timed(lambda: generate_pairings(players, blocked, recent), args.runs)
+    slow, _ = timed(lambda: exhaustive_pairings(players, blocked, recent), max(1, args.runs // 2))
+    same = generate_pairings(players, blocked, recent) == exhaustive_pairings(players, blocked, recent)
+    print(f'pairing: {args.roster} players  bucketed {fast:.0f}ms  exhaustive {slow:.0f}ms  '
+          f'identical: {"yes" if same else "NO"}')
+    if not same:
+        raise SystemExit(1)
+
+
+def bench_scheduling(args):
+    pairs, availability, vectors = synthetic_schedule_inputs(args.roster // 2)
+    courts = list(APPROVED_COURTS)
+    median, worst = timed(lambda: schedule_pairs(pairs, availability, vectors, courts), args.runs)
+    chosen = schedule_pairs(pairs, availability, vectors, courts)
+    load = {}
+    for slot in filter(None, chosen):
+        key = (slot['court'], slot['day'], slot['time'])
+        load[key] = load.get(key, 0) + 1
+    within = all(n <= COURT_SLOT_CAPACITY for n in load.values())
+    print(f'scheduling: {len(pairs)} pairs / {len(courts)} courts  median {median:.0f}ms  max {worst:.0f}ms  '
+          f'placed {sum(1 for c in chosen if c)}  within capacity: {"yes" if within else "NO"}')
+    if not within:
+        raise SystemExit(1)
+
+
+BENCHMARKS = {
+    'ratings': bench_ratings,
+    'pairing': bench_pairing,
+    'scheduling': bench_scheduling,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the ladder engines on synthetic data')
+    parser.add_argument('names', nargs='*', help=f"benchmarks to run: {', '.join(BENCHMARKS)} (default: all)")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--matches', type=int, default=50000)
+    parser.add_argument('--players', type=int, default=400)
+    parser.add_argument('--roster', type=int, default=1000, help='players for the pairing and scheduling benchmarks')
+    args = parser.parse_args()
+    unknown = [n for n in args.names if n not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark: {', '.join(unknown)}")
+
+    for name in args.names or BENCHMARKS:
+        BENCHMARKS[name](args)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
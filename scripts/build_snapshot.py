@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+NET WORTH Tennis - Static Ladder Snapshot
+Regenerates public/ladder.json from the players table. The file is only
+rewritten when the ladder actually changed, so scheduled runs don't
+produce empty commits.
+
+ladder.json records the change-feed cursor (migrations/016) it was built
+at. When the feed shows no ladder column changed since then, the run
+stops without reading the players table; without the feed (it needs
+SUPABASE_SERVICE_ROLE_KEY, see migrations/023) it falls back to fetching
+and comparing.
+
+Usage:
+    SUPABASE_URL=... SUPABASE_ANON_KEY=... python scripts/build_snapshot.py
+"""
+import json
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from api._changes import fetch_changes, latest_cursor, touches_ladder  # noqa: E402
+from api._db import APIError, get_service_client, get_supabase_client  # noqa: E402
+from api._snapshot import build_ladder_snapshot, fetch_ladder_players  # noqa: E402
+
+LADDER_JSON = ROOT / 'public' / 'ladder.json'
+
+
+def load_current():
+    """The existing snapshot, or {}"""
+    try:
+        return json.loads(LADDER_JSON.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def ladder_changed_since(supabase, cursor):
+    """False only when the change feed shows no ladder edits after cursor"""
+    if cursor is None:
+        return True
+    page = fetch_changes(supabase, cursor)
+    return page['reset'] or page['has_more'] or any(touches_ladder(e) for e in page['events'])
+
+
+def main():
+    supabase = get_supabase_client()
+    if not supabase:
+        print('SUPABASE_URL / SUPABASE_ANON_KEY not set')
+        return 1
+
+    current = load_current()
+    feed = get_service_client()
+    cursor = None  # no feed (migrations/016 / 023, or no key): fetch and compare
+    if feed:
+        try:
+            # Taken before the read, so edits made during it are seen next run
+            cursor = latest_cursor(feed)
+            if not ladder_changed_since(feed, current.get('change_cursor')):
+                print(f"No ladder changes since seq {current['change_cursor']}")
+                return 0
+        except APIError:
+            cursor = None
+
+    players = fetch_ladder_players(supabase)
+    if not players:
+        # Never replace a good snapshot with an empty one
+        print('No players returned, keeping existing snapshot')
+        return 1
+
+    # Compare ignoring generated_at (and the cursor, so feed-only moves don't commit)
+    if current.get('players') == players:
+        print(f'Ladder unchanged ({len(players)} players)')
+        return 0
+
+    snapshot = build_ladder_snapshot(players)
+    if cursor is not None:
+        snapshot['change_cursor'] = cursor
+    LADDER_JSON.write_text(json.dumps(snapshot, separators=(',', ':')) + '\n')
+    print(f'Wrote snapshot for {len(players)} players')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
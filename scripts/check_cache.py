@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+NET WORTH Tennis - Cache Self-Check
+Exercises api/_cache.py without a database: tag invalidation, the
+backend-down fallback, an invalidate() landing while a read is loading,
+and the TTL cap on per-instance backends. Fails if any check does.
+
+Runs against MemoryRedis, plus fakeredis when it is installed, and a
+real Redis with --redis (keys go under a throwaway prefix):
+
+    python scripts/check_cache.py [--redis redis://localhost:6379/0]
+"""
+import argparse
+import sys
+import time
+import uuid
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import api._cache as cache_module  # noqa: E402
+from api._cache import Cache, MemoryRedis  # noqa: E402
+from api._singleflight import MICRO_TTL_SECONDS  # noqa: E402
+
+
+class Loader:
+    """load() callable that counts its calls and returns the current value"""
+
+    def __init__(self, value):
+        self.value = value
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.value
+
+
+class DownRedis:
+    """Backend whose every command fails, counting the attempts"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __getattr__(self, name):
+        def fail(*args, **kwargs):
+            self.calls += 1
+            raise ConnectionError('backend down')
+        return fail
+
+
+def check_tag_invalidation(make_client):
+    cache = Cache(make_client())
+    ladder, pairings = Loader(['a']), Loader(['p'])
+    assert cache.cached('ladder', ladder, 60, ['ladder']) == ['a']
+    assert cache.cached('ladder', ladder, 60, ['ladder']) == ['a'] and ladder.calls == 1, 'second read not cached'
+    cache.cached('pairings', pairings, 60, ['pairings'])
+
+    ladder.value = ['b']
+    cache.invalidate('ladder')
+    assert cache.cached('ladder', ladder, 60, ['ladder']) == ['b'], 'invalidate() did not retire the entry'
+    cache.cached('pairings', pairings, 60, ['pairings'])
+    assert pairings.calls == 1, 'invalidating one tag retired another'
+
+    both = Loader(1)
+    cache.cached('both', both, 60, ['ladder', 'pairings'])
+    cache.invalidate('pairings')
+    cache.cached('both', both, 60, ['ladder', 'pairings'])
+    assert both.calls == 2, 'an entry must be retired by any of its tags'
+
+
+def check_none_not_stored(make_client):
+    cache = Cache(make_client())
+    missing = Loader(None)
+    cache.cached('missing', missing, 60)
+    cache.cached('missing', missing, 60)
+    assert missing.calls == 2, 'None was cached'
+
+
+def check_backend_down(make_client):
+    client = DownRedis()
+    cache = Cache(client)
+    load = Loader(['live'])
+    assert cache.cached('ladder', load, 60, ['ladder']) == ['live'], 'read failed with the backend down'
+    attempts = client.calls
+    cache.cached('ladder', load, 60, ['ladder'])
+    cache.invalidate('ladder')
+    cache.set('cursor', 1)
+    assert cache.get('cursor') is None
+    assert client.calls == attempts, 'backend retried before RETRY_SECONDS'
+    assert load.calls == 2
+
+    cache._down_until = time.monotonic() - 1  # RETRY_SECONDS later
+    cache.cached('ladder', load, 60, ['ladder'])
+    assert client.calls > attempts, 'backend never retried'
+
+
+def check_invalidate_during_load(make_client):
+    """A write (and its invalidate) lands after the read took its tag versions"""
+    cache = Cache(make_client())
+    rows = {'value': 'old'}
+
+    def slow_read():
+        value = rows['value']
+        rows['value'] = 'new'
+        cache.invalidate('ladder')
+        return value
+
+    assert cache.cached('ladder', slow_read, 60, ['ladder']) == 'old'
+    fresh = Loader(rows['value'])
+    assert cache.cached('ladder', fresh, 60, ['ladder']) == 'new', 'the pre-write value outlived the invalidation'
+
+
+def check_ttl_cap(make_client):
+    cache = Cache(make_client(), max_ttl=1)
+    load = Loader('v')
+    cache.cached('capped', load, 3600, ['ladder'])
+    time.sleep(1.1)
+    cache.cached('capped', load, 3600, ['ladder'])
+    assert load.calls == 2, 'entry outlived max_ttl'
+
+
+def check_default_backend(make_client):
+    if cache_module.REDIS_URL:
+        return
+    default = cache_module._connect()
+    assert isinstance(default.client, MemoryRedis)
+    assert default.max_ttl == MICRO_TTL_SECONDS, 'per-instance backend without the micro-TTL cap'
+
+
+CHECKS = {
+    'tag invalidation': check_tag_invalidation,
+    'None is never stored': check_none_not_stored,
+    'backend down falls back to load()': check_backend_down,
+    'invalidate during a load': check_invalidate_during_load,
+    'max_ttl caps entries': check_ttl_cap,
+    'in-memory backend is capped': check_default_backend,
+}
+
+
+def backends(redis_url):
+    """(name, zero-argument client factory) for every backend available here"""
+    found = [('memory', MemoryRedis)]
+    try:
+        import fakeredis
+        found.append(('fakeredis', fakeredis.FakeRedis))
+    except ImportError:
+        pass
+    if redis_url:
+        import redis
+        server = redis.Redis.from_url(redis_url)
+        found.append(('redis', lambda: server))
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Self-check of the shared cache tier')
+    parser.add_argument('--redis', help='also run against this Redis URL')
+    args = parser.parse_args()
+
+    failures = []
+    for backend, make_client in backends(args.redis):
+        for name, check in CHECKS.items():
+            # A fresh prefix per check, so earlier tag versions don't matter
+            cache_module.KEY_PREFIX = f'networth-check-{uuid.uuid4().hex[:8]}:'
+            try:
+                check(make_client)
+                status, detail = 'ok', ''
+            except AssertionError as e:
+                status, detail = 'FAIL', f'  ({e})' if str(e) else ''
+                failures.append(f'{backend}: {name}')
+            print(f'{status:4}  {backend:9} {name}{detail}')
+
+    if failures:
+        print(f'{len(failures)} check{"" if len(failures) == 1 else "s"} failed')
+        return 1
+    print('All cache checks passed')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
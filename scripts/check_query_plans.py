@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+NET WORTH Tennis - Query Plan Regression Check
+Seeds a realistic amount of data, EXPLAINs every hot query the API runs
+and fails if any of them reads a hot table with a sequential scan. The
+seed runs inside a transaction that is always rolled back, so it's safe
+against a dev or staging database (not production - the seed briefly
+holds row locks on the new rows).
+
+Each query carries league_id = current_league_id(), like the RLS policy
+PostgREST applies to API requests.
+
+Needs a direct Postgres connection (Supabase: Settings -> Database ->
+Connection string) and psycopg or psycopg2, which are not part of the
+deployed functions:
+
+    pip install "psycopg[binary]"
+    DATABASE_URL=postgresql://... python scripts/check_query_plans.py [-v]
+
+Requires migrations 001-017.
+"""
+import argparse
+import json
+import os
+import sys
+
+try:
+    import psycopg as pg
+except ImportError:
+    try:
+        import psycopg2 as pg
+    except ImportError:
+        pg = None
+
+LEAGUES = 20
+PLAYERS_PER_LEAGUE = 200
+MONTHS = 24
+SEED_PREFIX = 'zz-plan-check-'
+
+HOT_TABLES = {'players', 'matches', 'match_assignments', 'match_feedback', 'player_period_stats', 'change_events'}
+
+SEED_SQL = [
+    # Leagues; the last one is the league the queries run as
+    f"""INSERT INTO league_settings (league_name, slug)
+        SELECT 'Plan check ' || g, '{SEED_PREFIX}' || g FROM generate_series(1, {LEAGUES}) g""",
+    f"""INSERT INTO players (league_id, email, name, skill_level, rank, is_active, is_admin)
+        SELECT l.id, 'player-' || g || '@' || l.slug || '.example.com', 'Player ' || g,
+               (ARRAY['3.0 Beginner', '3.5 Intermediate', '3.5+ Intermediate', '4.0 Advanced', '4.5 Advanced+'])[1 + g % 5],
+               g, g % 10 <> 0, g = 1
+        FROM league_settings l, generate_series(1, {PLAYERS_PER_LEAGUE}) g
+        WHERE l.slug LIKE '{SEED_PREFIX}%'""",
+    # Everyone plays their neighbour once a month for MONTHS months
+    f"""CREATE TEMP TABLE seed_pairs ON COMMIT DROP AS
+        WITH p AS (
+            SELECT id, league_id, ROW_NUMBER() OVER (PARTITION BY league_id ORDER BY id) AS n
+            FROM players WHERE league_id IN (SELECT id FROM league_settings WHERE slug LIKE '{SEED_PREFIX}%')
+        )
+        SELECT a.league_id, a.n, a.id AS player1_id, b.id AS player2_id, m AS months_ago,
+               date_trunc('month', NOW()) - make_interval(months => m) AS period
+        FROM p a
+        JOIN p b ON b.league_id = a.league_id AND b.n = a.n % {PLAYERS_PER_LEAGUE} + 1
+        CROSS JOIN generate_series(0, {MONTHS - 1}) m""",
+    """INSERT INTO matches (league_id, player1_id, player2_id, player1_games, player2_games,
+                            set1_p1, set1_p2, set2_p1, set2_p2, period_label, created_at)
+        SELECT league_id, player1_id, player2_id, 12, 7, 6, 4, 6, 3,
+               to_char(period, 'FMMonth YYYY'), period + interval '10 days' + make_interval(mins => n::int)
+        FROM seed_pairs WHERE months_ago > 0""",
+    # Almost every past assignment is completed; this month's are open
+    """INSERT INTO match_assignments (league_id, player1_id, player2_id, period_label, status)
+        SELECT league_id, player1_id, player2_id, to_char(period, 'FMMonth YYYY'),
+               CASE WHEN months_ago = 0 OR n % 40 = 0 THEN 'pending' ELSE 'completed' END
+        FROM seed_pairs""",
+    # About 3% of feedback is "would not play again"
+    f"""INSERT INTO match_feedback (league_id, match_id, from_player_id, about_player_id, would_play_again)
+        SELECT league_id, id, player1_id, player2_id, (hashtext(id::text) % 33) <> 0
+        FROM matches WHERE league_id IN (SELECT id FROM league_settings WHERE slug LIKE '{SEED_PREFIX}%')""",
+    """INSERT INTO player_period_stats (player_id, league_id, period_label, games_won, games_lost, wins, losses, matches_played)
+        SELECT player1_id, league_id, to_char(period, 'FMMonth YYYY'), (n % 13)::int, 7, 1, 0, 1
+        FROM seed_pairs""",
+    # change_events was filled by the migrations/016 triggers as the rows went in
+    "ANALYZE league_settings, players, matches, match_assignments, match_feedback, player_period_stats, change_events",
+]
+
+# The league the queries run as (current_league_id() reads this header)
+SCOPE_SQL = f"""SELECT set_config('request.headers', json_build_object('x-league', '{SEED_PREFIX}{LEAGUES}')::text, true)"""
+
+THIS_MONTH = "date_trunc('month', NOW())::date"
+
+# One player of that league (dashboard queries)
+ME = f"""(SELECT id FROM players
+         WHERE league_id = current_league_id() AND email = 'player-7@{SEED_PREFIX}{LEAGUES}.example.com')"""
+
+HOT_QUERIES = {
+    'player by email (auth, profile, join)': f"""
+        SELECT * FROM players
+        WHERE league_id = current_league_id() AND email = 'player-7@{SEED_PREFIX}{LEAGUES}.example.com'""",
+    'ladder (players)': """
+        SELECT * FROM players
+        WHERE league_id = current_league_id() AND is_active = true ORDER BY rank""",
+    'pairable roster (pairings, cron)': """
+        SELECT id, name, email, skill_level, skill_rating, rank, rating FROM players
+        WHERE league_id = current_league_id() AND is_active = true AND is_admin = false""",
+    'skill band (monthly shards)': """
+        SELECT id, name, email, skill_level, skill_rating, rank, rating FROM players
+        WHERE league_id = current_league_id() AND is_active = true AND is_admin = false
+          AND skill_rating >= 3.5 AND skill_rating <= 3.75""",
+    'recent matches (matches GET)': """
+        SELECT * FROM matches
+        WHERE league_id = current_league_id() ORDER BY created_at DESC LIMIT 20""",
+    'blocked pairs (pairings, cron)': """
+        SELECT from_player_id, about_player_id FROM match_feedback
+        WHERE league_id = current_league_id() AND would_play_again = false""",
+    'this period pairings (pairings GET)': f"""
+        SELECT * FROM match_assignments
+        WHERE league_id = current_league_id() AND period_start = {THIS_MONTH}""",
+    'open this period (reminder, last chance)': f"""
+        SELECT * FROM match_assignments
+        WHERE league_id = current_league_id() AND period_start = {THIS_MONTH}
+          AND status IN ('pending', 'accepted')""",
+    'outstanding (outstanding emails)': f"""
+        SELECT * FROM match_assignments
+        WHERE league_id = current_league_id() AND status IN ('pending', 'accepted')
+          AND period_start < {THIS_MONTH}""",
+    'my open assignments (dashboard)': f"""
+        SELECT * FROM match_assignments
+        WHERE league_id = current_league_id() AND status IN ('pending', 'accepted')
+          AND (player1_id = {ME} OR player2_id = {ME})
+        ORDER BY period_start DESC""",
+    'my matches (dashboard)': f"""
+        SELECT * FROM matches
+        WHERE league_id = current_league_id() AND (player1_id = {ME} OR player2_id = {ME})
+        ORDER BY created_at DESC LIMIT 10""",
+    'standings (standings GET)': f"""
+        SELECT * FROM player_period_stats
+        WHERE league_id = current_league_id() AND period_start = ({THIS_MONTH} - interval '1 month')::date
+        ORDER BY games_won DESC LIMIT 200""",
+    'changes after cursor (change feed)': """
+        SELECT seq, table_name, op, row_id, changed_columns, created_at FROM change_events
+        WHERE league_id = current_league_id() AND seq > (SELECT MAX(seq) - 1000 FROM change_events)
+        ORDER BY seq LIMIT 501""",
+    'latest cursor (change feed)': """
+        SELECT seq FROM change_events
+        WHERE league_id = current_league_id() ORDER BY seq DESC LIMIT 1""",
+}
+
+
+def plan_nodes(node):
+    yield node
+    for child in node.get('Plans', []):
+        yield from plan_nodes(child)
+
+
+def seq_scans(plan):
+    """Hot tables read with a sequential scan anywhere in the plan"""
+    return sorted({
+        node['Relation Name']
+        for node in plan_nodes(plan)
+        if node['Node Type'] == 'Seq Scan' and node.get('Relation Name') in HOT_TABLES
+    })
+
+
+def explain(cur, sql):
+    cur.execute(f'EXPLAIN (FORMAT JSON) {sql}')
+    result = cur.fetchone()[0]
+    if isinstance(result, str):
+        result = json.loads(result)
+    return result[0]['Plan']
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fail if a hot query plans a sequential scan')
+    parser.add_argument('-v', '--verbose', action='store_true', help='print every plan')
+    args = parser.parse_args()
+
+    if pg is None:
+        print('psycopg (or psycopg2) is not installed: pip install "psycopg[binary]"')
+        return 2
+    dsn = os.environ.get('DATABASE_URL')
+    if not dsn:
+        print('DATABASE_URL not set')
+        return 2
+
+    conn = pg.connect(dsn)
+    failures = []
+    try:
+        cur = conn.cursor()
+        # Skip the per-row stats/ranking triggers while seeding (this transaction only)
+        cur.execute("SELECT set_config('networth.bulk_load', 'on', true)")
+        for sql in SEED_SQL:
+            cur.execute(sql)
+        cur.execute(SCOPE_SQL)
+
+        for name, sql in HOT_QUERIES.items():
+            plan = explain(cur, sql)
+            scans = seq_scans(plan)
+            status = 'FAIL' if scans else 'ok'
+            print(f"{status:4}  {name}" + (f"  (seq scan on {', '.join(scans)})" if scans else ''))
+            if args.verbose or scans:
+                print(json.dumps(plan, indent=2))
+            if scans:
+                failures.append(name)
+    finally:
+        conn.rollback()
+        conn.close()
+
+    if failures:
+        print(f'{len(failures)} hot quer{"y" if len(failures) == 1 else "ies"} fell back to a sequential scan')
+        return 1
+    print(f'All {len(HOT_QUERIES)} hot queries use an index')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+NET WORTH Tennis - Rating Replay
+Rebuilds every player's Elo rating from the full match history, oldest
+match first (see api/_ratings.py), and writes the results back in one
+apply_ratings() call. Run it after a restore, after editing old scores,
+or after changing the rating constants.
+
+Requires migrations/004-player-ratings.sql. With SUPABASE_SERVICE_ROLE_KEY
+every league is replayed at once (players only ever meet within their
+league); with the anon key only the default league is visible.
+
+Usage:
+    python scripts/replay_ratings.py [--dry-run]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from api._db import get_admin_client  # noqa: E402
+from api._ratings import MATCH_FIELDS, replay  # noqa: E402
+
+PAGE_SIZE = 1000
+
+
+def fetch_matches(supabase):
+    """Every match, paged by id"""
+    matches = []
+    last_id = None
+    while True:
+        query = supabase.table('matches').select(MATCH_FIELDS)
+        if last_id:
+            query = query.gt('id', last_id)
+        rows = query.order('id').limit(PAGE_SIZE).execute().data
+        matches.extend(rows)
+        if len(rows) < PAGE_SIZE:
+            return matches
+        last_id = rows[-1]['id']
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rebuild Elo ratings from match history')
+    parser.add_argument('--dry-run', action='store_true', help='print the top ratings, write nothing')
+    args = parser.parse_args()
+
+    supabase = get_admin_client()
+    if not supabase:
+        print('SUPABASE_URL and a Supabase key must be set')
+        return 1
+
+    matches = fetch_matches(supabase)
+    t0 = time.perf_counter()
+    ratings = replay(matches)
+    elapsed_ms = (time.perf_counter() - t0) * 1000
+    print(f'Replayed {len(matches)} matches for {len(ratings)} players in {elapsed_ms:.0f}ms')
+
+    if args.dry_run:
+        top = sorted(ratings.items(), key=lambda item: -item[1]['rating'])[:10]
+        for player_id, r in top:
+            print(f"  {r['rating']:8.2f}  ({r['rated_matches']} matches)  {player_id}")
+        return 0
+
+    payload = [{'id': pid, **r} for pid, r in ratings.items()]
+    updated = supabase.rpc('apply_ratings', {'ratings': payload, 'reset': True}).execute().data
+    print(f'Updated {updated} players')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
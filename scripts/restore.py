@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+NET WORTH Tennis - Restore & Bulk Import
+Reloads data in large batched upserts instead of one request per row.
+Each batch goes through bulk_upsert() (migrations/017), which skips the
+per-row trigger work (total_games, rankings, stats) for that batch's own
+transaction only; finish_bulk_load() does it once at the end. Matches
+reported while a restore runs are counted as usual.
+
+Usage:
+    # Latest full backup + every incremental taken after it
+    python scripts/restore.py backup backups/
+
+    # A single backup directory
+    python scripts/restore.py backup backups/20250105T110000Z-full
+
+    # Legacy spreadsheet (players + games per month) into one league
+    python scripts/restore.py csv "Net Worth ladder 2025 - Net Worth.csv" --season 2025 --league networth
+
+Needs SUPABASE_SERVICE_ROLE_KEY: bulk_upsert() and finish_bulk_load()
+are not executable with the anon key. Requires migrations 001-017.
+Deletions recorded by incremental backups (migrations/016) are applied
+after the upserts.
+"""
+import argparse
+import csv
+import gzip
+import json
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from api._db import get_admin_client  # noqa: E402
+from api._periods import MONTHS  # noqa: E402
+
+sys.path.insert(0, str(ROOT / 'scripts'))
+from backup import TABLES  # noqa: E402
+
+BATCH_SIZE = 1000
+DELETE_BATCH_SIZE = 100  # ids go in the URL
+
+
+def batched(rows, size=BATCH_SIZE):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def upsert_all(supabase, table, rows, on_conflict='id'):
+    """Upsert an iterable of rows in BATCH_SIZE chunks with triggers skipped; returns (rows, requests)"""
+    count = requests = 0
+    for batch in batched(rows):
+        supabase.rpc('bulk_upsert', {'target': table, 'batch': batch, 'conflict': on_conflict}).execute()
+        count += len(batch)
+        requests += 1
+    return count, requests
+
+
+# =============================================================================
+# NDJSON BACKUPS
+# =============================================================================
+
+def resolve_backup_chain(path):
+    """A single backup dir, or for the backups root: latest full + its incrementals"""
+    path = Path(path)
+    if (path / 'manifest.json').exists():
+        return [path]
+
+    dirs = sorted(d for d in path.iterdir() if (d / 'manifest.json').exists())
+    fulls = [d for d in dirs if d.name.endswith('-full')]
+    if not fulls:
+        raise SystemExit(f'No full backup found in {path}')
+    base = fulls[-1]
+    chain = [base]
+    for d in dirs:
+        if d.name > base.name:
+            manifest = json.loads((d / 'manifest.json').read_text())
+            if manifest.get('base') == base.name:
+                chain.append(d)
+    return chain
+
+
+def read_ndjson(path):
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def assignment_rows(path, rematches):
+    """Stream match_assignments, holding back rematches until their originals exist"""
+    for row in read_ndjson(path):
+        if row.get('original_assignment_id'):
+            rematches.append(row)
+        else:
+            yield row
+
+
+def delete_all(supabase, table, ids):
+    """Delete rows by id in DELETE_BATCH_SIZE chunks; returns requests made"""
+    requests = 0
+    for batch in batched(ids, DELETE_BATCH_SIZE):
+        supabase.table(table).delete(returning='minimal').in_('id', batch).execute()
+        requests += 1
+    return requests
+
+
+def restore_backup(supabase, path):
+    chain = resolve_backup_chain(path)
+    print('Restoring: ' + ' -> '.join(d.name for d in chain))
+    totals = {}
+    requests = 0
+
+    for table in TABLES:
+        rematches = []
+        for backup_dir in chain:
+            file = backup_dir / f'{table}.ndjson.gz'
+            if not file.exists():
+                continue
+            if table == 'match_assignments':
+                rows = assignment_rows(file, rematches)
+            else:
+                rows = read_ndjson(file)
+            count, reqs = upsert_all(supabase, table, rows)
+            totals[table] = totals.get(table, 0) + count
+            requests += reqs
+        if rematches:
+            count, reqs = upsert_all(supabase, table, rematches)
+            totals[table] = totals.get(table, 0) + count
+            requests += reqs
+
+    # Rows deleted after the full (change feed, see backup.py); children first
+    deleted = {}
+    for backup_dir in chain:
+        manifest = json.loads((backup_dir / 'manifest.json').read_text())
+        for table, ids in manifest.get('deleted', {}).items():
+            deleted.setdefault(table, set()).update(ids)
+    for table in reversed(TABLES):
+        if deleted.get(table):
+            requests += delete_all(supabase, table, sorted(deleted[table]))
+
+    for table, count in totals.items():
+        print(f'{table}: {count} rows')
+    for table, ids in deleted.items():
+        print(f'{table}: {len(ids)} deleted')
+    return requests
+
+
+# =============================================================================
+# LEGACY CSV
+# =============================================================================
+
+def clean(value):
+    """Strip whitespace and invisible characters (the sheet has U+202C in phones)"""
+    return ''.join(c for c in (value or '') if c.isprintable()).strip()
+
+
+def parse_legacy_csv(path, season):
+    """Returns [(player_row, {period_label: games})]"""
+    parsed = []
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        reader = csv.DictReader(f)
+        months = [m for m in reader.fieldnames if clean(m) in MONTHS]
+        for row in reader:
+            email = clean(row.get('Email')).lower()
+            name = clean(row.get('Name'))
+            if not email or not name:
+                continue
+
+            monthly = {}
+            for month in months:
+                value = clean(row.get(month))
+                if value:
+                    monthly[f'{clean(month)} {season}'] = int(value)
+
+            total = clean(row.get('Total Score To Date'))
+            parsed.append(({
+                'email': email,
+                'name': name,
+                'phone': clean(row.get('Phone')) or None,
+                'total_games': int(total) if total else sum(monthly.values()),
+                'matches_played': len(monthly),
+            }, monthly))
+    return parsed
+
+
+def import_csv(supabase, path, season):
+    parsed = parse_legacy_csv(path, season)
+    player_rows = [p for p, _ in parsed]
+
+    # One upsert for the roster (league_id from its default); returns ids for the monthly rows
+    saved = supabase.rpc('bulk_upsert', {
+        'target': 'players', 'batch': player_rows, 'conflict': 'league_id,email', 'with_rows': True,
+    }).execute().data
+    ids = {p['email'].lower(): p['id'] for p in saved}
+    requests = 1
+
+    monthly_rows = (
+        {'player_id': ids[p['email']], 'period_label': label, 'games': games}
+        for p, monthly in parsed
+        for label, games in monthly.items()
+    )
+    count, reqs = upsert_all(supabase, 'legacy_monthly_games', monthly_rows, on_conflict='player_id,period_label')
+    requests += reqs
+
+    print(f'players: {len(player_rows)} rows')
+    print(f'legacy_monthly_games: {count} rows')
+    return requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Bulk restore from backups or the legacy CSV')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p_backup = sub.add_parser('backup', help='restore gzip NDJSON backups')
+    p_backup.add_argument('path', help='backup directory, or the backups/ root')
+    p_backup.add_argument('--recompute-totals', action='store_true',
+                          help='rebuild total_games/matches_played from matches')
+
+    p_csv = sub.add_parser('csv', help='import the legacy month-by-month spreadsheet')
+    p_csv.add_argument('path')
+    p_csv.add_argument('--season', default='2025', help='year for the month columns')
+    p_csv.add_argument('--league', help='league slug (default: the default league)')
+
+    args = parser.parse_args()
+
+    supabase = get_admin_client(getattr(args, 'league', None))
+    if not supabase:
+        print('SUPABASE_URL and a Supabase key must be set')
+        return 1
+
+    recompute = args.command == 'backup' and args.recompute_totals
+
+    try:
+        if args.command == 'backup':
+            requests = restore_backup(supabase, args.path)
+        else:
+            requests = import_csv(supabase, args.path, args.season)
+    finally:
+        # Totals, stats and ranks for whatever was loaded, once
+        supabase.rpc('finish_bulk_load', {'recompute_totals': recompute}).execute()
+
+    print(f'Done in {requests + 1} requests')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())